@@ -1,9 +1,24 @@
-from flask import Flask, render_template, request, jsonify
-from baseball_name_generator import BaseballNameGenerator
-from census_name_generator import CensusNameGenerator
+from flask import Flask, Response, render_template, request, jsonify
+from baseball_name_generator import BaseballNameGenerator, NAME_DATA_FILE, COUNT_FILES, COMPILED_FILES as BASEBALL_COMPILED_FILES
+from census_name_generator import CensusNameGenerator, FIRST_NAMES_FILE, LAST_NAMES_FILE
 from generators.funny_generator import FunnyNameGenerator
+from utils.rng import stream
+from utils.generator_registry import GeneratorRegistry
+from utils.startup_profiler import startup_profiler, report_path
+from utils.data_watcher import DataWatcher
+from utils.admission import AdmissionController, AdmissionRejected, CostModel, DEFAULT_COSTS
+from utils.name_pool import NamePool, NamePools
+from utils.metrics import metrics, CONTENT_TYPE, SIZE_BUCKETS
+from functools import partial
+import csv
+import gc
+import io
+from json.encoder import encode_basestring_ascii
 import logging
 import os
+import sys
+import threading
+import time
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,15 +27,155 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')  # Use environment variable in production
 
-# Initialize name generators
-try:
-    baseball_generator = BaseballNameGenerator()
-    census_generator = CensusNameGenerator()
-    funny_generator = FunnyNameGenerator()
+# Name generators are built on first use. GENERATOR_WARMUP controls building them ahead of time:
+#   background - build them on a background thread at startup (default)
+#   eager      - build them before serving; use with gunicorn --preload so workers share the tables
+#   off        - only build a generator when a request needs it
+GENERATOR_WARMUP = os.environ.get('GENERATOR_WARMUP', 'background')
+
+generators = GeneratorRegistry({
+    'baseball': BaseballNameGenerator,
+    'census': CensusNameGenerator,
+    'funny': FunnyNameGenerator,
+})
+
+def generate(generator_type, count, rng=None, gender=None, top_n=CensusNameGenerator.DEFAULT_TOP_N):
+    """Generate a list of names of one of the /generate types."""
+    if gender is not None and generator_type in ('baseball', 'funny'):
+        raise ValueError(f"The {generator_type} generator can't filter by gender")
+    
+    if generator_type == 'baseball':
+        return generators.get('baseball').generate_multiple(count, rng=rng)
+    elif generator_type == 'unique_census':
+        return generators.get('census').generate_multiple_unique(count, top_n, rng=rng, gender=gender)
+    elif generator_type == 'weighted_unique_census':
+        return generators.get('census').generate_multiple_weighted_unique(count, rng=rng, gender=gender)
+    elif generator_type == 'funny':
+        return generators.get('funny').generate_multiple(count, rng=rng)
+    else:
+        return generators.get('census').generate_multiple(count, rng=rng, gender=gender)
+
+def generator_name(generator_type):
+    """Name of the registered generator that serves a request type."""
+    return generator_type if generator_type in ('baseball', 'funny') else 'census'
+
+# Admission control: each request's cost is estimated from its type and count.
+#   GENERATE_COST_BUDGET     - most estimated seconds for one /generate request (default 1.0);
+#                              larger requests get a 413 pointing at /generate/stream
+#   GENERATE_EXPENSIVE_COST  - requests estimated above this many seconds are expensive (default 0.1)
+#   GENERATE_MAX_EXPENSIVE   - expensive requests (or streams) a worker runs at once (default 1);
+#                              more get a 429, while cheap requests are never held up
+#   GENERATE_CALIBRATE       - measure the per-name costs after warm-up (default on unless warm-up is off)
+cost_model = CostModel()
+admission = AdmissionController(
+    cost_model,
+    budget_seconds=float(os.environ.get('GENERATE_COST_BUDGET', 1.0)),
+    expensive_seconds=float(os.environ.get('GENERATE_EXPENSIVE_COST', 0.1)),
+    max_expensive=int(os.environ.get('GENERATE_MAX_EXPENSIVE', 1)),
+)
+GENERATE_CALIBRATE = os.environ.get('GENERATE_CALIBRATE', 'off' if GENERATOR_WARMUP == 'off' else 'on').lower() in ('1', 'true', 'yes', 'on')
+
+def calibrate_costs(after=None):
+    """Measure each request type's cost with the loaded generators, once the warm-up thread (if any) is done."""
+    if after is not None:
+        after.join()
+    try:
+        # Funny names only stay unique up to the pools' capacity; past it the generator pads with repeats
+        limits = {'funny': generators.get('funny').unique_name_capacity()}
+        cost_model.calibrate({kind: partial(generate, kind) for kind in DEFAULT_COSTS}, limits=limits)
+        logger.info(f"Request costs calibrated: {cost_model.status()['costs']}")
+    except Exception as e:
+        logger.error(f"Error calibrating request costs, keeping the defaults: {str(e)}")
+
+# Small unseeded /generate requests are served from pools of names generated ahead of time
+# on a background thread, which tops a pool up when it falls below half full.
+#   NAME_POOL_SIZE       - names kept per request type (default 1000, 0 turns the pools off)
+#   NAME_POOL_MAX_COUNT  - largest request served from a pool (default 20, the web interface's maximum)
+# Requests with a seed, shard, gender or top_n always generate their names.
+NAME_POOL_SIZE = int(os.environ.get('NAME_POOL_SIZE', 1000))
+NAME_POOL_MAX_COUNT = int(os.environ.get('NAME_POOL_MAX_COUNT', 20))
+NAME_POOL_BLOCK_SIZE = 100
+
+def make_name_pool(generator_type):
+    """Pool for one request type; funny and baseball sets don't repeat names, so each is served from one block."""
+    whole_sets = generator_type in ('baseball', 'funny')
+    block_size = NAME_POOL_MAX_COUNT if whole_sets else NAME_POOL_BLOCK_SIZE
+    return NamePool(partial(generate, generator_type), capacity=NAME_POOL_SIZE,
+                    block_size=max(1, min(block_size, NAME_POOL_SIZE)), split_blocks=not whole_sets)
+
+name_pools = NamePools({kind: make_name_pool(kind) for kind in DEFAULT_COSTS} if NAME_POOL_SIZE > 0 else {})
+
+def pooled_names(generator_type, count, rng=None, gender=None, top_n=CensusNameGenerator.DEFAULT_TOP_N):
+    """Take names from the pre-generated pool, or None when the request needs its own."""
+    if rng is not None or gender is not None or top_n != CensusNameGenerator.DEFAULT_TOP_N or count > NAME_POOL_MAX_COUNT:
+        return None
+    return name_pools.take(generator_type, count)
+
+def clear_name_pools(name):
+    """Drop pooled names made by a generator that has just been reloaded."""
+    name_pools.clear(kind for kind in name_pools.pools if generator_name(kind) == name)
+
+# Request metrics, served at /metrics along with those the generators record
+REQUESTS = metrics.counter('namegen_requests_total', 'Name generation requests', ('endpoint', 'type', 'status'))
+REQUEST_SECONDS = metrics.histogram('namegen_request_duration_seconds', 'Time to answer a successful request',
+                                    ('endpoint', 'type'))
+REQUEST_NAMES = metrics.histogram('namegen_request_names', 'Names asked for by a successful request',
+                                  ('endpoint', 'type'), buckets=SIZE_BUCKETS)
+NAMES_SERVED = metrics.counter('namegen_names_served_total', 'Names sent to clients, by where they came from',
+                               ('type', 'source'))
+metrics.gauge('namegen_name_pool_names', 'Pre-generated names waiting in each pool', ('type',),
+              lambda: {(kind,): len(pool) for kind, pool in name_pools.pools.items()})
+
+def metric_type(generator_type):
+    """Type label of a request; unknown types are generated as census names, which keeps the label values bounded."""
+    return generator_type if generator_type in DEFAULT_COSTS else 'census'
+
+def record_request(endpoint, generator_type, status, started, count=None):
+    """Count a request, and the latency and size of successful ones."""
+    kind = metric_type(generator_type)
+    REQUESTS.labels(endpoint, kind, status).inc()
+    if status == 200:
+        REQUEST_SECONDS.labels(endpoint, kind).observe(time.perf_counter() - started)
+        REQUEST_NAMES.labels(endpoint, kind).observe(count)
+
+# Startup profiling (PROFILE_STARTUP=<report.json>, or --profile-startup [report.json] when run
+# directly) builds every generator up front and writes the time and memory of each load phase
+PROFILE_STARTUP = report_path(sys.argv[1:] if __name__ == '__main__' else None)
+if PROFILE_STARTUP:
+    startup_profiler.enable()
+    generators.warm_up(background=False)
+    startup_profiler.write(PROFILE_STARTUP)
+    startup_profiler.disable()
+    logger.info(f"Startup profile written to {PROFILE_STARTUP}")
+
+if GENERATOR_WARMUP == 'eager':
+    generators.warm_up(background=False)
+    if not generators.ready():
+        logger.error(f"Error initializing name generators: {generators.status()}")
+        raise RuntimeError("Name generators failed to initialize")
     logger.info("Name generators initialized successfully")
-except Exception as e:
-    logger.error(f"Error initializing name generators: {str(e)}")
-    raise
+    if GENERATE_CALIBRATE:
+        calibrate_costs()
+    # The name tables live in shared buffers; freezing the remaining objects keeps
+    # the garbage collector from touching (and copying) their pages in forked workers
+    gc.freeze()
+elif GENERATOR_WARMUP == 'background':
+    warm_up_thread = generators.warm_up()
+    if GENERATE_CALIBRATE:
+        threading.Thread(target=calibrate_costs, args=(warm_up_thread,), name="cost-calibration", daemon=True).start()
+
+# GENERATOR_HOT_RELOAD=1 watches the data files and rebuilds a generator when its files change.
+# The new generator is swapped in once it is built; requests in flight finish on the old one.
+GENERATOR_HOT_RELOAD = os.environ.get('GENERATOR_HOT_RELOAD', '').lower() in ('1', 'true', 'yes', 'on')
+# Every file a generator may be built from; baseball names come from the count tables or their compiled copies
+HOT_RELOAD_FILES = {
+    'baseball': [NAME_DATA_FILE, *COUNT_FILES, *BASEBALL_COMPILED_FILES],
+    'census': [FIRST_NAMES_FILE, LAST_NAMES_FILE],
+    'funny': [FIRST_NAMES_FILE, LAST_NAMES_FILE],
+}
+if GENERATOR_HOT_RELOAD:
+    data_watcher = DataWatcher(generators, HOT_RELOAD_FILES, on_reload=clear_name_pools)
+    data_watcher.start()
 
 @app.route('/')
 def index():
@@ -29,32 +184,201 @@ def index():
 
 @app.route('/generate', methods=['POST'])
 def generate_names():
+    started = time.perf_counter()
     data = request.get_json()
     generator_type = data.get('type', 'baseball')
+    # Census first names can be limited to one gender ("male" or "female")
+    gender = data.get('gender') or None
+    status = 500
+    count = None
+    
+    try:
+        count = request_count(data)
+        top_n = int(data.get('top_n', CensusNameGenerator.DEFAULT_TOP_N))
+        rng = request_rng(data)
+
+        names = pooled_names(generator_type, count, rng, gender, top_n)
+        source = 'pool'
+        if names is None:
+            source = 'generated'
+            # Turn away requests over the cost budget, or expensive ones while the worker is busy
+            with admission.admit(generator_type, count):
+                names = generate(generator_type, count, rng, gender, top_n)
+        
+        NAMES_SERVED.labels(metric_type(generator_type), source).inc(len(names))
+        status = 200
+        return jsonify({
+            'success': True,
+            'names': names
+        })
+    except AdmissionRejected as e:
+        status = e.status
+        return rejection_response(e)
+    except ValueError as e:
+        # Bad request parameters, such as an unknown gender
+        status = 400
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error generating names: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    finally:
+        record_request('generate', generator_type, status, started, count)
+
+# Output formats of /generate/stream
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def request_count(data):
+    """Read the number of names to generate."""
     count = int(data.get('count', 10))
+    if count < 0:
+        raise ValueError("count can't be negative")
+    return count
+
+def rejection_response(rejection):
+    """Answer a request that admission control turned away."""
+    response = jsonify({
+        'success': False,
+        'error': str(rejection),
+        **rejection.details
+    })
+    response.status_code = rejection.status
+    if rejection.retry_after is not None:
+        response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+def request_rng(data):
+    """A seed replays the same names; a shard picks an independent stream of that seed."""
+    if data.get('seed') is None:
+        return None
+    shard = data.get('shard')
+    return stream(int(data['seed']), None if shard is None else int(shard))
+
+def format_chunk(names, output_format):
+    """Encode a chunk of names as NDJSON lines ({"name": ...}) or CSV rows."""
+    if output_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([name] for name in names)
+        return buffer.getvalue()
+    # Same output as json.dumps({'name': name}), without building a dict per name
+    return ''.join(['{"name": %s}\n' % encode_basestring_ascii(name) for name in names])
+
+@app.route('/generate/stream', methods=['GET', 'POST'])
+def stream_names():
+    """
+    Stream any number of names as newline-delimited JSON or CSV.
+    
+    Takes the same parameters as /generate, as JSON or a query string, plus
+    format ("ndjson" or "csv"). Names are generated and sent a chunk at a
+    time, so memory stays flat however large count is. Baseball and funny
+    names are drawn in vectorized batches, so nicknames and funny first and
+    last names may repeat.
+    """
+    started = time.perf_counter()
+    data = request.get_json(silent=True) or request.args
+    generator_type = data.get('type', 'baseball')
+    output_format = data.get('format', 'ndjson')
+    gender = data.get('gender') or None
+    
+    try:
+        count = request_count(data)
+        if output_format not in STREAM_FORMATS:
+            raise ValueError(f"Unknown format: {output_format!r}, expected one of {list(STREAM_FORMATS)}")
+        if gender is not None and generator_type in ('baseball', 'funny'):
+            raise ValueError(f"The {generator_type} generator can't filter by gender")
+        rng = request_rng(data)
+        # Streams have no cost budget, but large ones take an expensive-work slot until they finish
+        stream_admission = admission.admit(generator_type, count, enforce_budget=False)
+    except AdmissionRejected as e:
+        record_request('stream', generator_type, e.status, started)
+        return rejection_response(e)
+    except ValueError as e:
+        record_request('stream', generator_type, 400, started)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     
     try:
         if generator_type == 'baseball':
-            names = baseball_generator.generate_multiple(count)
+            chunks = generators.get('baseball').iter_names(count, rng=rng)
         elif generator_type == 'unique_census':
-            names = census_generator.generate_multiple_unique(count)
+            top_n = int(data.get('top_n', CensusNameGenerator.DEFAULT_TOP_N))
+            chunks = generators.get('census').iter_unique_names(count, top_n, rng=rng, gender=gender)
         elif generator_type == 'weighted_unique_census':
-            names = census_generator.generate_multiple_weighted_unique(count)
+            chunks = generators.get('census').iter_weighted_unique_names(count, rng=rng, gender=gender)
         elif generator_type == 'funny':
-            names = funny_generator.generate_multiple(count)
+            chunks = generators.get('funny').iter_names(count, rng=rng)
         else:
-            names = census_generator.generate_multiple(count)
+            chunks = generators.get('census').iter_names(count, rng=rng, gender=gender)
         
+        # Generate the first chunk before answering, so bad parameters still get an error status
+        first_chunk = next(chunks, [])
+    except ValueError as e:
+        stream_admission.release()
+        record_request('stream', generator_type, 400, started)
         return jsonify({
-            'success': True,
-            'names': names
-        })
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
+        stream_admission.release()
+        record_request('stream', generator_type, 500, started)
         logger.error(f"Error generating names: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+    
+    names_streamed = NAMES_SERVED.labels(metric_type(generator_type), 'stream')
+    # Status recorded when the stream closes; a client going away isn't an error
+    outcome = {'status': 200}
+    
+    def body():
+        if output_format == 'csv':
+            yield format_chunk(['name'], output_format)
+        names_streamed.inc(len(first_chunk))
+        yield format_chunk(first_chunk, output_format)
+        try:
+            for names in chunks:
+                names_streamed.inc(len(names))
+                yield format_chunk(names, output_format)
+        except Exception as e:
+            # The status has been sent already, so the client sees a truncated stream
+            outcome['status'] = 500
+            logger.error(f"Error streaming names: {str(e)}")
+            raise
+    
+    response = Response(body(), mimetype=STREAM_FORMATS[output_format])
+    # Called when the stream finishes or the client goes away
+    response.call_on_close(stream_admission.release)
+    response.call_on_close(lambda: record_request('stream', generator_type, outcome['status'], started, count))
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Serve this worker's metrics in the Prometheus text format."""
+    return Response(metrics.exposition(), content_type=CONTENT_TYPE)
+
+@app.route('/ready')
+def ready():
+    """Report each generator's load state; 503 until warm-up has built all of them."""
+    is_ready = GENERATOR_WARMUP == 'off' or generators.ready()
+    return jsonify({
+        'ready': is_ready,
+        'warmup': GENERATOR_WARMUP,
+        'generators': generators.status(),
+        'admission': admission.status(),
+        'name_pools': name_pools.status()
+    }), 200 if is_ready else 503
 
 if __name__ == '__main__':
     logger.info("Starting Flask server...")
@@ -0,0 +1,235 @@
+"""
+Async (ASGI) entry point for the name generator.
+
+Serves the same /, /generate, /ready and /metrics contract as the Flask app, on an
+asyncio event loop. Name generation is CPU-bound, so anything bigger than a
+handful of names runs on a bounded executor and the loop stays free to
+accept and answer many small requests at once.
+
+Run it with an ASGI server, e.g.:
+
+    GENERATOR_WARMUP=eager gunicorn --preload -k uvicorn.workers.UvicornWorker asgi:app
+    uvicorn asgi:app
+
+Settings (besides those of app.py, which this reuses):
+    GENERATE_EXECUTOR          thread (default) or process. Process workers are
+                               forked once the generators are loaded, so they
+                               share the name tables and run in parallel
+    GENERATE_EXECUTOR_WORKERS  executor size (default: CPU count)
+    GENERATE_INLINE_COST       requests estimated below this many seconds run
+                               on the event loop, skipping the executor hop
+                               (default 0.001)
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+import app as flask_app
+from app import admission, generate, name_pools, pooled_names, request_count, request_rng, generators, GENERATOR_WARMUP
+from app import NAMES_SERVED, generator_name, metric_type, record_request
+from utils.metrics import metrics, CONTENT_TYPE
+from utils.admission import AdmissionRejected
+from census_name_generator import CensusNameGenerator
+
+logger = logging.getLogger(__name__)
+
+GENERATE_EXECUTOR = os.environ.get('GENERATE_EXECUTOR', 'thread')
+GENERATE_EXECUTOR_WORKERS = int(os.environ.get('GENERATE_EXECUTOR_WORKERS', os.cpu_count() or 1))
+GENERATE_INLINE_COST = float(os.environ.get('GENERATE_INLINE_COST', 0.001))
+# Largest request body read, /generate only takes a few parameters
+MAX_BODY_SIZE = 64 * 1024
+
+_executor: Optional[Executor] = None
+
+def get_executor() -> Executor:
+    """
+    Get the generation executor, starting it on first use.
+
+    Returns:
+        Executor: Thread or process pool, see GENERATE_EXECUTOR
+    """
+    global _executor
+    if _executor is None:
+        if GENERATE_EXECUTOR == 'process':
+            # Forked workers inherit the loaded generators instead of building their own
+            _executor = ProcessPoolExecutor(GENERATE_EXECUTOR_WORKERS, mp_context=multiprocessing.get_context('fork'))
+        else:
+            _executor = ThreadPoolExecutor(GENERATE_EXECUTOR_WORKERS, thread_name_prefix='generate')
+    return _executor
+
+def shutdown_executor():
+    """Stop the executor, letting running jobs finish."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+async def run_generation(cost: float, generator: str, func, *args) -> Any:
+    """
+    Run a generation job, on the event loop when it is cheap and on the executor otherwise.
+
+    A generator that isn't built yet would be built (or waited for) by the
+    job, so until it is ready every job using it goes to the executor.
+
+    Args:
+        cost (float): Estimated seconds, from the admission cost model
+        generator (str): Name of the registered generator the job uses
+        func: Picklable generation function
+        *args: Its arguments
+
+    Returns:
+        Any: What func returned
+    """
+    if cost < GENERATE_INLINE_COST and generators.ready([generator]):
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), partial(func, *args))
+
+async def read_body(receive) -> bytes:
+    """
+    Read a request body.
+
+    Raises:
+        ValueError: The body is larger than MAX_BODY_SIZE
+    """
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_SIZE:
+            raise ValueError("Request body is too large")
+        more_body = message.get('more_body', False)
+    return body
+
+async def send_response(send, status: int, body: bytes, content_type: str,
+                        headers: Tuple[Tuple[bytes, bytes], ...] = ()):
+    """
+    Send a complete HTTP response.
+    """
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type.encode()), (b'content-length', str(len(body)).encode()),
+                    *headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def send_json(send, status: int, payload: Dict[str, Any], headers: Tuple[Tuple[bytes, bytes], ...] = ()):
+    """
+    Send a JSON response.
+    """
+    await send_response(send, status, json.dumps(payload).encode(), 'application/json', headers)
+
+async def index(scope, receive, send):
+    """Serve the web interface."""
+    html = flask_app.app.jinja_env.get_template('index.html').render()
+    await send_response(send, 200, html.encode(), 'text/html; charset=utf-8')
+
+async def generate_names(scope, receive, send):
+    """
+    Generate names, with the same parameters and responses as the Flask /generate.
+    """
+    started = time.perf_counter()
+    generator_type = 'baseball'
+    status = 500
+    count = None
+    try:
+        data = json.loads(await read_body(receive) or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        generator_type = data.get('type', 'baseball')
+        # Census first names can be limited to one gender ("male" or "female")
+        gender = data.get('gender') or None
+        count = request_count(data)
+        top_n = int(data.get('top_n', CensusNameGenerator.DEFAULT_TOP_N))
+        rng = request_rng(data)
+
+        names = pooled_names(generator_type, count, rng, gender, top_n)
+        source = 'pool'
+        if names is None:
+            source = 'generated'
+            # Turn away requests over the cost budget, or expensive ones while the worker is busy
+            with admission.admit(generator_type, count) as admitted:
+                names = await run_generation(admitted.cost, generator_name(generator_type), generate,
+                                             generator_type, count, rng, gender, top_n)
+
+        NAMES_SERVED.labels(metric_type(generator_type), source).inc(len(names))
+        status = 200
+        await send_json(send, 200, {'success': True, 'names': names})
+    except AdmissionRejected as e:
+        status = e.status
+        headers = () if e.retry_after is None else ((b'retry-after', str(e.retry_after).encode()),)
+        await send_json(send, e.status, {'success': False, 'error': str(e), **e.details}, headers)
+    except ValueError as e:
+        # Bad request parameters, such as an unknown gender
+        status = 400
+        await send_json(send, 400, {'success': False, 'error': str(e)})
+    except Exception as e:
+        logger.error(f"Error generating names: {str(e)}")
+        await send_json(send, 500, {'success': False, 'error': str(e)})
+    finally:
+        record_request('generate', generator_type, status, started, count)
+
+async def ready(scope, receive, send):
+    """Report each generator's load state; 503 until warm-up has built all of them."""
+    is_ready = GENERATOR_WARMUP == 'off' or generators.ready()
+    await send_json(send, 200 if is_ready else 503, {
+        'ready': is_ready,
+        'warmup': GENERATOR_WARMUP,
+        'executor': {'kind': GENERATE_EXECUTOR, 'workers': GENERATE_EXECUTOR_WORKERS},
+        'generators': generators.status(),
+        'admission': admission.status(),
+        'name_pools': name_pools.status()
+    })
+
+async def metrics_endpoint(scope, receive, send):
+    """Serve this worker's metrics in the Prometheus text format."""
+    await send_response(send, 200, metrics.exposition().encode(), CONTENT_TYPE)
+
+ROUTES = {
+    ('GET', '/'): index,
+    ('POST', '/generate'): generate_names,
+    ('GET', '/ready'): ready,
+    ('GET', '/metrics'): metrics_endpoint,
+}
+
+async def lifespan(receive, send):
+    """
+    Start the executor with the server and drain it on shutdown.
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            get_executor()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            shutdown_executor()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """
+    The ASGI application.
+    """
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        allowed = [method for method, path in ROUTES if path == scope['path']]
+        if allowed:
+            await send_json(send, 405, {'success': False, 'error': 'Method not allowed'},
+                            ((b'allow', ', '.join(allowed).encode()),))
+        else:
+            await send_json(send, 404, {'success': False, 'error': 'Not found'})
+        return
+    await handler(scope, receive, send)
@@ -7,6 +7,7 @@ import time
 import os
 import sys
 from datetime import datetime
+from clean_baseball_data import clean_baseball_data
 
 # Configure the years to scrape
 START_YEAR = 1845
@@ -383,6 +384,9 @@ def save_final_output(players):
     pd.DataFrame(players).to_csv(players_csv, index=False)
     print(f"Saved all players to {players_csv}")
     
+    # Rebuild the name count tables and compiled tables the name generator loads at startup
+    clean_baseball_data()
+    
     # Print statistics
     print("\nFinal Statistics:")
     for key, value in meta.items():
@@ -1,12 +1,26 @@
 import os
-import json
 import random
-import re
-from collections import Counter
+import sys
+import numpy as np
+from utils.samplers import AliasSampler, FenwickSampler
+from utils.name_batch import NameBatch, format_column, chunk_sizes, STREAM_CHUNK_SIZE
+from utils.name_table import NameTable, load_compiled_table
+from utils.rng import get_random, get_numpy_rng
+from utils.startup_profiler import startup_profiler
+from utils.memory_report import memory_report
+from utils.metrics import timed_generation
+from utils.dataset_registry import built_from, file_digests, write_source_digests
+from utils.baseball_etl import PLAYER_FILE, COUNT_FILES, clean_name, is_valid_name, load_count_tables
 
 # Data directory
 DATA_DIR = "baseball_data"
-NAME_DATA_FILE = os.path.join(DATA_DIR, "all_baseball_players.json")
+NAME_DATA_FILE = PLAYER_FILE
+
+# Compiled name tables built from the name count tables by compile_baseball_data()
+COMPILED_FIRST_NAMES_FILE = os.path.join(DATA_DIR, "baseball_first_names.bin")
+COMPILED_LAST_NAMES_FILE = os.path.join(DATA_DIR, "baseball_last_names.bin")
+COMPILED_NICKNAMES_FILE = os.path.join(DATA_DIR, "baseball_nicknames.bin")
+COMPILED_FILES = (COMPILED_FIRST_NAMES_FILE, COMPILED_LAST_NAMES_FILE, COMPILED_NICKNAMES_FILE)
 
 class BaseballNameGenerator:
     """
@@ -18,10 +32,15 @@ class BaseballNameGenerator:
         self.first_names = []
         self.last_names = []
         self.nicknames = []
-        self.weighted_first_names = []
-        self.weighted_last_names = []
-        self.weighted_nicknames = []
+        self.first_name_sampler = AliasSampler([], [])
+        self.last_name_sampler = AliasSampler([], [])
+        self.nickname_sampler = AliasSampler([], [])
+        self.nickname_pool = FenwickSampler([], [])
         self.nickname_frequency = 0.35  # Custom ratio for better name variety
+        # Name columns formatted for batches, built on first use
+        self.formatted_first_names = None
+        self.formatted_last_names = None
+        self.formatted_nicknames = None
         
         # Make sure we have data
         self.load_data()
@@ -30,28 +49,15 @@ class BaseballNameGenerator:
         """
         Clean a name by removing invalid characters or fixing formatting issues.
         
+        Uses the shared baseball name rules in utils/baseball_etl.py.
+        
         Args:
             name (str): The name to clean
             
         Returns:
             str: The cleaned name or empty string if name can't be salvaged
         """
-        if not name or len(name) < 2:
-            return ""
-            
-        # Reject names with @ symbol completely
-        if '@' in name:
-            return ""
-            
-        # Remove trailing parenthesis
-        if name.endswith(')'):
-            # If it's likely just a trailing parenthesis issue, remove it
-            if name.count(')') > name.count('('):
-                name = name.rstrip(')')
-        
-        # For balanced parentheses in nicknames (like descriptive text), keep as is
-        
-        return name
+        return clean_name(name)
     
     def is_valid_name(self, name):
         """
@@ -63,157 +69,202 @@ class BaseballNameGenerator:
         Returns:
             bool: True if the name is valid, False otherwise
         """
-        name = self.clean_name(name)
-        return name != "" and len(name) >= 2
+        return is_valid_name(name)
     
     def load_data(self):
-        """Load name data from the data file."""
-        if not os.path.exists(NAME_DATA_FILE):
-            print(f"Data file not found: {NAME_DATA_FILE}")
-            print("Please run the baseball scraper first.")
-            return
+        """
+        Load name data, mapping the compiled tables when they were built from
+        the current player file and count tables, and loading the name count
+        tables otherwise.
+        """
+        with startup_profiler.phase("read_compiled"):
+            player_digests = file_digests(NAME_DATA_FILE)
+            tables = []
+            for path, counts_path in zip(COMPILED_FILES, COUNT_FILES):
+                sources = {**player_digests, **file_digests(counts_path)}
+                tables.append(load_compiled_table(path) if built_from(path, sources) else None)
+        if None in tables:
+            try:
+                tables = load_count_tables(NAME_DATA_FILE)
+            except Exception as e:
+                print(f"Error loading data: {e}")
+                return
+            if tables is None:
+                print("Please run the baseball scraper first.")
+                return
         
-        try:
-            with open(NAME_DATA_FILE, 'r') as f:
-                players = json.load(f)
-            
-            print(f"Loaded {len(players)} players from {NAME_DATA_FILE}")
-            
-            # Extract names and count frequencies
-            first_counter = Counter()
-            last_counter = Counter()
-            nickname_counter = Counter()
-            
-            total_players = len(players)
-            players_with_nickname = 0
-            
-            for player in players:
-                # First names
-                first = player.get("first_name", "")
-                cleaned_first = self.clean_name(first)
-                if cleaned_first:
-                    first_counter[cleaned_first] += 1
-                
-                # Last names
-                last = player.get("last_name", "")
-                cleaned_last = self.clean_name(last)
-                if cleaned_last:
-                    last_counter[cleaned_last] += 1
-                
-                # Nicknames
-                nick = player.get("nickname", "")
-                if nick and nick != "None" and nick.lower() != "none":
-                    players_with_nickname += 1
-                    cleaned_nick = self.clean_name(nick)
-                    if cleaned_nick:
-                        # Some nicknames have "or" in them, split those
-                        if " or " in cleaned_nick.lower():
-                            parts = cleaned_nick.split(" or ")
-                            for part in parts:
-                                cleaned_part = self.clean_name(part.strip())
-                                if cleaned_part:
-                                    nickname_counter[cleaned_part] += 1
-                        else:
-                            nickname_counter[cleaned_nick] += 1
-            
-            # Calculate actual nickname frequency in the dataset (for reference only)
-            actual_frequency = players_with_nickname / total_players if total_players > 0 else 0
-            print(f"Actual nickname frequency in dataset: {actual_frequency:.2%} (using {self.nickname_frequency:.2%} for generation)")
-            
-            # Convert to lists and sort by frequency
-            self.first_names = sorted([(name, count) for name, count in first_counter.items()], 
-                                     key=lambda x: x[1], reverse=True)
-            
-            self.last_names = sorted([(name, count) for name, count in last_counter.items()], 
-                                    key=lambda x: x[1], reverse=True)
-            
-            self.nicknames = sorted([(name, count) for name, count in nickname_counter.items()], 
-                                   key=lambda x: x[1], reverse=True)
-            
-            # Create weighted lists for random selection
-            self.weighted_first_names = []
-            for name, count in self.first_names:
-                self.weighted_first_names.extend([name] * count)
-            
-            self.weighted_last_names = []
-            for name, count in self.last_names:
-                self.weighted_last_names.extend([name] * count)
-            
-            self.weighted_nicknames = []
-            for name, count in self.nicknames:
-                self.weighted_nicknames.extend([name] * count)
-            
-            print(f"Processed {len(self.first_names)} unique first names")
-            print(f"Processed {len(self.last_names)} unique last names")
-            print(f"Processed {len(self.nicknames)} unique nicknames")
-            
-        except Exception as e:
-            print(f"Error loading data: {e}")
+        self._set_tables(*tables)
+        print(f"Processed {len(self.first_names)} unique first names")
+        print(f"Processed {len(self.last_names)} unique last names")
+        print(f"Processed {len(self.nicknames)} unique nicknames")
     
-    def generate_name(self, use_nickname=True):
+    def compile_data(self):
+        """
+        Save the name count tables in the compiled format so later loads can map them.
+        
+        Returns:
+            list: Paths of the compiled tables
+        """
+        player_digests = file_digests(NAME_DATA_FILE)
+        tables = load_count_tables(NAME_DATA_FILE)
+        if tables is None:
+            return []
+        for table, path, counts_path in zip(tables, COMPILED_FILES, COUNT_FILES):
+            table.save(path)
+            write_source_digests(path, {**player_digests, **file_digests(counts_path)})
+            print(f"Compiled {len(table)} names to {path} ({table.nbytes:,} bytes)")
+        self._set_tables(*tables)
+        return list(COMPILED_FILES)
+    
+    def _set_tables(self, first_name_table, last_name_table, nickname_table):
+        """
+        Build the samplers over a set of name tables.
+        """
+        with startup_profiler.phase("index_build"):
+            # (name, count) views, most common first
+            self.first_names = first_name_table.pairs
+            self.last_names = last_name_table.pairs
+            self.nicknames = nickname_table.pairs
+        
+            # Create weighted samplers for random selection
+            self.first_name_sampler = AliasSampler.from_table(first_name_table)
+            self.last_name_sampler = AliasSampler.from_table(last_name_table)
+            self.nickname_sampler = AliasSampler.from_table(nickname_table)
+        
+            # Removable pool so a batch can draw nicknames without replacement
+            self.nickname_pool = FenwickSampler(nickname_table, nickname_table.weights)
+            self.formatted_first_names = None
+            self.formatted_last_names = None
+            self.formatted_nicknames = None
+    
+    def generate_name(self, use_nickname=True, rng=None):
         """
         Generate a random baseball name.
         
         Args:
             use_nickname (bool): Whether to include a nickname
+            rng: random.Random or seed, the global random stream by default
             
         Returns:
             str: A generated name
         """
-        if not self.weighted_first_names or not self.weighted_last_names:
+        if not self.first_name_sampler or not self.last_name_sampler:
             return "No data available"
         
-        first = random.choice(self.weighted_first_names)
-        last = random.choice(self.weighted_last_names)
+        rng = get_random(rng)
+        first = self.first_name_sampler.sample(rng)
+        last = self.last_name_sampler.sample(rng)
         
-        if use_nickname and self.weighted_nicknames and random.random() < self.nickname_frequency:  # Use actual nickname frequency
-            nickname = random.choice(self.weighted_nicknames)
+        if use_nickname and self.nickname_sampler and rng.random() < self.nickname_frequency:  # Use actual nickname frequency
+            nickname = self.nickname_sampler.sample(rng)
             return f"{first} \"{nickname}\" {last}"
         else:
             return f"{first} {last}"
     
-    def generate_multiple(self, count=10, use_nickname=True):
+    @timed_generation
+    def generate_multiple(self, count=10, use_nickname=True, rng=None):
         """
         Generate multiple random baseball names.
         
         Args:
             count (int): Number of names to generate
             use_nickname (bool): Whether to include nicknames
+            rng: random.Random or seed, the global random stream by default
             
         Returns:
             list: List of generated names
         """
+        rng = get_random(rng)
         if not use_nickname:
-            return [self.generate_name(False) for _ in range(count)]
+            return [self.generate_name(False, rng) for _ in range(count)]
         
-        # Keep track of used nicknames to avoid duplicates in the set
-        used_nicknames = set()
+        # Draw nicknames from a copy of the pool so each one is used once per set
+        available_nicknames = self.nickname_pool.copy()
         result = []
         
         for _ in range(count):
             # For nickname generation
-            if use_nickname and self.weighted_nicknames and random.random() < self.nickname_frequency:  # Use actual nickname frequency
-                # Get a nickname that hasn't been used yet, if possible
-                available_nicknames = [nick for nick in self.weighted_nicknames if nick not in used_nicknames]
-                
-                # If we've used all nicknames or there are very few left, allow reuse to maintain diversity
-                if len(available_nicknames) < 3:
-                    nickname = random.choice(self.weighted_nicknames)
+            if use_nickname and self.nickname_sampler and rng.random() < self.nickname_frequency:  # Use actual nickname frequency
+                # If we've used all nicknames or there are very few left, allow reuse to maintain diversity.
+                # "Few" counts each nickname as often as it occurs, as the old weighted list did
+                if available_nicknames.total() < 3:
+                    nickname = self.nickname_sampler.sample(rng)
                 else:
-                    nickname = random.choice(available_nicknames)
-                    used_nicknames.add(nickname)
+                    nickname = available_nicknames.pop(rng)
                 
-                first = random.choice(self.weighted_first_names)
-                last = random.choice(self.weighted_last_names)
+                first = self.first_name_sampler.sample(rng)
+                last = self.last_name_sampler.sample(rng)
                 result.append(f"{first} \"{nickname}\" {last}")
             else:
                 # No nickname
-                first = random.choice(self.weighted_first_names)
-                last = random.choice(self.weighted_last_names)
+                first = self.first_name_sampler.sample(rng)
+                last = self.last_name_sampler.sample(rng)
                 result.append(f"{first} {last}")
         
         return result
     
+    @timed_generation
+    def generate_batch(self, count=10, rng=None, lazy=False, use_nickname=True):
+        """
+        Generate many baseball names at once by drawing index arrays with NumPy.
+        
+        Nicknames may repeat within a batch; use generate_multiple when every
+        nickname in the set should be different.
+        
+        Args:
+            count (int): Number of names to generate
+            rng: NumPy Generator, random.Random or seed, a fresh Generator by default
+            lazy (bool): Return a NameBatch that formats names on access
+            use_nickname (bool): Whether to include nicknames
+            
+        Returns:
+            list or NameBatch: Generated names
+        """
+        if not self.first_name_sampler or not self.last_name_sampler:
+            return ["No data available"] * count
+        
+        if self.formatted_first_names is None or self.formatted_last_names is None or self.formatted_nicknames is None:
+            self.formatted_first_names = format_column(self.first_name_sampler.items)
+            self.formatted_last_names = format_column(self.last_name_sampler.items)
+            self.formatted_nicknames = format_column(self.nickname_sampler.items)
+        
+        rng = get_numpy_rng(rng)
+        first_idx = self.first_name_sampler.sample_indices(count, rng)
+        last_idx = self.last_name_sampler.sample_indices(count, rng)
+        
+        nicknames = None
+        nickname_idx = None
+        if use_nickname and self.nickname_sampler:
+            nicknames = self.formatted_nicknames
+            nickname_idx = self.nickname_sampler.sample_indices(count, rng)
+            nickname_idx[rng.random(count) >= self.nickname_frequency] = -1
+        
+        batch = NameBatch(
+            self.formatted_first_names, self.formatted_last_names,
+            first_idx, last_idx, nicknames, nickname_idx
+        )
+        return batch if lazy else batch.tolist()
+    
+    def iter_names(self, count, rng=None, use_nickname=True, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Generate any number of baseball names a chunk at a time, so memory
+        stays the same however many names are streamed.
+        
+        Nicknames may repeat, as in generate_batch.
+        
+        Args:
+            count (int): Number of names to generate
+            rng: NumPy Generator, random.Random or seed, shared by every chunk
+            use_nickname (bool): Whether to include nicknames
+            chunk_size (int): Most names in one chunk
+            
+        Returns:
+            Iterator of lists of generated names
+        """
+        rng = get_numpy_rng(rng)
+        for size in chunk_sizes(count, chunk_size):
+            yield self.generate_batch(size, rng, use_nickname=use_nickname)
+    
     def search_nicknames(self, query):
         """
         Search for nicknames containing the query.
@@ -262,9 +313,34 @@ class BaseballNameGenerator:
         long_nicknames = [(name, count) for name, count in self.nicknames 
                          if len(name) >= min_length]
         return sorted(long_nicknames, key=lambda x: x[1], reverse=True)[:limit]
+    
+    def memory_report(self):
+        """
+        Break down the generator's memory by structure.
+        
+        Returns:
+            dict: Private and shared bytes for each attribute, see utils/memory_report.py
+        """
+        return memory_report(self)
+
+def compile_baseball_data():
+    """
+    Compile the baseball name counts into tables the generator can map without parsing.
+    
+    Returns:
+        list: Paths of the compiled tables
+    """
+    if not os.path.exists(NAME_DATA_FILE) and not all(os.path.exists(path) for path in COUNT_FILES):
+        print(f"Data file not found, skipping: {NAME_DATA_FILE}")
+        return []
+    return BaseballNameGenerator().compile_data()
 
 def main():
     """Main function to demonstrate the name generator."""
+    if "--compile" in sys.argv[1:]:
+        compile_baseball_data()
+        return
+    
     generator = BaseballNameGenerator()
     
     print("\n=== Baseball Name Generator ===\n")
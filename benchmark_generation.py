@@ -0,0 +1,252 @@
+"""
+Benchmark name generation.
+
+Suites:
+    throughput  Compares the per-name generate_multiple loops against the
+                vectorized generate_batch API for each generator.
+    startup     Compares the FunnyNameGenerator pattern indexer against the
+                original one-regex-per-pattern indexer.
+    load        Times loading the census name files as CSV, JSON and
+                compiled tables.
+    costs       Calibrates the per-request cost model the web app uses
+                for admission control (utils/admission.py).
+
+Usage:
+    python benchmark_generation.py
+    python benchmark_generation.py throughput --sizes 1000,100000 --max-loop-size 100000
+    python benchmark_generation.py startup
+    python benchmark_generation.py load
+    python benchmark_generation.py costs --budget 1.0
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import tempfile
+import time
+
+from baseball_name_generator import BaseballNameGenerator
+from census_name_generator import CensusNameGenerator, FIRST_NAMES_FILE, LAST_NAMES_FILE
+from generators.baseball_generator import BaseballNameGenerator as PackageBaseballNameGenerator
+from generators.census_generator import CensusNameGenerator as PackageCensusNameGenerator
+from generators.funny_generator import FunnyNameGenerator
+from utils.pattern_matcher import MultiPatternMatcher
+from utils.data_loader import find_data_file, load_name_columns
+from utils.name_table import NameTable
+from utils.admission import CostModel
+
+DEFAULT_SIZES = "1000,10000,100000,1000000,10000000"
+
+def time_call(func, *args, **kwargs):
+    """
+    Time a single call.
+
+    Returns:
+        float: Elapsed seconds
+    """
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+def format_rate(count, seconds):
+    """Format a names-per-second rate."""
+    if seconds <= 0:
+        return "n/a"
+    return f"{count / seconds:,.0f}/s"
+
+def benchmark_throughput(sizes, max_loop_size):
+    """
+    Benchmark generate_multiple against generate_batch for each generator.
+
+    Args:
+        sizes (list): Batch sizes to run
+        max_loop_size (int): Largest size to run through the per-name loop
+    """
+    generators = {
+        "census (app)": CensusNameGenerator(),
+        "baseball (app)": BaseballNameGenerator(),
+        "census (generators/)": PackageCensusNameGenerator(),
+        "baseball (generators/)": PackageBaseballNameGenerator(),
+    }
+
+    print("\n=== Generation Throughput ===\n")
+    print(f"{'generator':<24}{'count':>12}{'loop':>16}{'batch':>16}{'lazy batch':>16}{'speedup':>10}")
+
+    for label, generator in generators.items():
+        # Warm up any per-generator caches before timing
+        generator.generate_batch(1, rng=0)
+        for count in sizes:
+            if count <= max_loop_size:
+                loop_seconds = time_call(generator.generate_multiple, count)
+                loop_rate = format_rate(count, loop_seconds)
+            else:
+                loop_seconds = None
+                loop_rate = "skipped"
+
+            batch_seconds = time_call(generator.generate_batch, count, rng=0)
+            lazy_seconds = time_call(generator.generate_batch, count, rng=0, lazy=True)
+            speedup = f"{loop_seconds / batch_seconds:.1f}x" if loop_seconds and batch_seconds else "-"
+
+            print(f"{label:<24}{count:>12,}{loop_rate:>16}{format_rate(count, batch_seconds):>16}"
+                  f"{format_rate(count, lazy_seconds):>16}{speedup:>10}")
+
+def legacy_index_names_by_patterns(names, patterns):
+    """
+    The original pattern indexer: one re.search per name and pattern.
+    """
+    result = {pattern: set() for pattern in patterns}
+    for name in names:
+        for pattern_name, pattern in patterns.items():
+            if re.search(pattern, name, re.IGNORECASE):
+                result[pattern_name].add(name)
+    return result
+
+def legacy_weighted_list(names):
+    """
+    The original expanded weighted list that the indexer used to scan.
+    """
+    weighted_list = []
+    for name, freq in names:
+        weighted_list.extend([name] * int(float(freq) * 1000))
+    return weighted_list
+
+def benchmark_startup():
+    """
+    Benchmark building the FunnyNameGenerator pattern indexes.
+    """
+    generator = FunnyNameGenerator()
+    columns = {
+        "first names": generator.first_names,
+        "last names": generator.last_names,
+    }
+    pattern_sets = {
+        "silly": generator.silly_sound_patterns,
+        "crude": generator.crude_patterns,
+    }
+
+    print("\n=== Pattern Index Build Time ===\n")
+    print(f"{'index':<20}{'names':>10}{'legacy (expanded)':>20}{'legacy (distinct)':>20}{'matcher':>12}{'speedup':>10}")
+
+    for column_label, pairs in columns.items():
+        distinct = [name for name, _ in pairs]
+        expanded = legacy_weighted_list(pairs)
+        for pattern_label, patterns in pattern_sets.items():
+            expanded_seconds = time_call(legacy_index_names_by_patterns, expanded, patterns)
+            distinct_seconds = time_call(legacy_index_names_by_patterns, distinct, patterns)
+
+            start = time.perf_counter()
+            matcher = MultiPatternMatcher(patterns)
+            masks = matcher.match_masks(distinct)
+            generator._index_names_by_patterns(distinct, masks, matcher)
+            matcher_seconds = time.perf_counter() - start
+
+            speedup = f"{expanded_seconds / matcher_seconds:.1f}x" if matcher_seconds else "-"
+            print(f"{pattern_label + ' ' + column_label:<20}{len(distinct):>10,}{expanded_seconds:>19.3f}s"
+                  f"{distinct_seconds:>19.3f}s{matcher_seconds:>11.3f}s{speedup:>10}")
+
+def write_format_copies(directory, names, weights, name_key):
+    """
+    Write the same name rows as CSV, JSON and a compiled table.
+    
+    Returns:
+        dict: Format to file path
+    """
+    paths = {fmt: os.path.join(directory, f"{name_key}.{fmt}") for fmt in ("csv", "json", "bin")}
+    with open(paths["csv"], "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([name_key, "frequency"])
+        writer.writerows(zip(names, weights))
+    with open(paths["json"], "w") as f:
+        # Pretty-printed like census_data_processor.py writes it
+        json.dump([{name_key: name, "frequency": weight} for name, weight in zip(names, weights)], f, indent=2)
+    NameTable.from_columns(names, weights).save(paths["bin"])
+    return paths
+
+def benchmark_load(repeat=3):
+    """
+    Benchmark loading the census name files in each format.
+    
+    Args:
+        repeat (int): Runs per format, the fastest is reported
+    """
+    sources = {
+        "first names": (FIRST_NAMES_FILE, "firstname"),
+        "last names": (LAST_NAMES_FILE, "surname"),
+    }
+    loaders = {
+        "csv": lambda path, key: load_name_columns(path, key),
+        "json": lambda path, key: load_name_columns(path, key),
+        "bin": lambda path, key: NameTable.load(path),
+    }
+    
+    print("\n=== Name File Load Time ===\n")
+    print(f"{'file':<14}{'format':>8}{'rows':>10}{'size':>14}{'load':>12}{'rate':>16}")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for label, (path, name_key) in sources.items():
+            source = find_data_file(path)
+            if source is None:
+                print(f"{label:<14}  data file not found: {path}")
+                continue
+            names, weights = load_name_columns(source, name_key)
+            paths = write_format_copies(directory, names, weights, name_key)
+            
+            for fmt, loader in loaders.items():
+                seconds = min(time_call(loader, paths[fmt], name_key) for _ in range(repeat))
+                size = os.path.getsize(paths[fmt])
+                print(f"{label:<14}{fmt:>8}{len(names):>10,}{size:>14,}{seconds:>11.4f}s"
+                      f"{format_rate(len(names), seconds):>16}")
+
+def benchmark_costs(budget):
+    """
+    Calibrate the cost of each /generate request type, as the web app does after warm-up.
+
+    Args:
+        budget (float): Per-request budget in seconds, to show the largest count each type gets
+    """
+    census = CensusNameGenerator()
+    baseball = BaseballNameGenerator()
+    funny = FunnyNameGenerator()
+    runners = {
+        "baseball": baseball.generate_multiple,
+        "census": census.generate_multiple,
+        "unique_census": census.generate_multiple_unique,
+        "weighted_unique_census": census.generate_multiple_weighted_unique,
+        "funny": funny.generate_multiple,
+    }
+
+    model = CostModel()
+    model.calibrate(runners, limits={"funny": funny.unique_name_capacity()})
+
+    print("\n=== Request Costs ===\n")
+    print(f"{'type':<26}{'overhead':>12}{'per name':>14}{'max count':>14}")
+    for kind, (overhead, per_name) in model.costs.items():
+        print(f"{kind:<26}{overhead * 1e3:>10.3f}ms{per_name * 1e6:>12.3f}us{model.max_count(kind, budget):>14,}")
+
+def main():
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark name generation")
+    parser.add_argument("suite", nargs="?", default="throughput", choices=["throughput", "startup", "load", "costs"],
+                        help="Benchmark suite to run (default: %(default)s)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="Comma-separated batch sizes (default: %(default)s)")
+    parser.add_argument("--max-loop-size", type=int, default=1000000,
+                        help="Skip the per-name loop above this size (default: %(default)s)")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="Per-request budget in seconds for the costs suite (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.suite == "startup":
+        benchmark_startup()
+    elif args.suite == "load":
+        benchmark_load()
+    elif args.suite == "costs":
+        benchmark_costs(args.budget)
+    else:
+        sizes = [int(float(size)) for size in args.sizes.split(",")]
+        benchmark_throughput(sizes, args.max_loop_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Load test the sync and async deployments of the web app.
+
+    sync   Flask under gunicorn sync workers, as in the Procfile (app:app)
+    async  the ASGI entry point under uvicorn (asgi:app)
+
+Each server is started on a local port with the same number of worker
+processes. Once /ready answers, a mixed load runs:
+    small  clients send /generate requests for a few names, back to back
+    bulk   clients send large /generate requests at the same time
+
+The report gives throughput and latency percentiles of the small
+requests, which is what interactive users feel, plus how the bulk
+requests fared.
+
+Usage:
+    python benchmark_serving.py
+    python benchmark_serving.py --servers sync,async --clients 32 --bulk-clients 2 --duration 10
+    python benchmark_serving.py --url http://localhost:5000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+SMALL_REQUEST = {"type": "census", "count": 10}
+BULK_REQUEST = {"type": "unique_census", "count": 50000}
+
+def server_command(server, port, workers):
+    """
+    Get the command that starts a server.
+
+    Args:
+        server (str): "sync" or "async"
+        port (int): Port to listen on
+        workers (int): Worker processes
+
+    Returns:
+        list: Command line
+    """
+    if server == "sync":
+        return [sys.executable, "-m", "gunicorn", "--preload", "--workers", str(workers),
+                "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"]
+    return [sys.executable, "-m", "uvicorn", "asgi:app", "--workers", str(workers),
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+
+def wait_until_ready(url, timeout=120):
+    """
+    Poll /ready until the server has built its generators.
+
+    Returns:
+        bool: True once ready, False on timeout
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            status, _ = request(url, "GET", "/ready")
+            if status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+def request(url, method, path, payload=None):
+    """
+    Send one request on a new connection.
+
+    Returns:
+        tuple: Status code and response body
+    """
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+    try:
+        body = None if payload is None else json.dumps(payload)
+        headers = {} if payload is None else {"Content-Type": "application/json"}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+def client_loop(url, payload, stop, results):
+    """
+    Send requests back to back until stop is set, recording (status, seconds) for each.
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            status, _ = request(url, "POST", "/generate", payload)
+        except OSError:
+            status = "error"
+        results.append((status, time.perf_counter() - start))
+
+def percentile(values, fraction):
+    """Get a percentile of a sorted list."""
+    if not values:
+        return float("nan")
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def run_load(url, clients, bulk_clients, duration):
+    """
+    Run the mixed load against a server.
+
+    Returns:
+        dict: Results for the small and bulk requests
+    """
+    stop = threading.Event()
+    small, bulk = [], []
+    threads = [threading.Thread(target=client_loop, args=(url, SMALL_REQUEST, stop, small)) for _ in range(clients)]
+    threads += [threading.Thread(target=client_loop, args=(url, BULK_REQUEST, stop, bulk)) for _ in range(bulk_clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    ok = sorted(seconds for status, seconds in small if status == 200)
+    return {
+        "small_rate": len(ok) / duration,
+        "p50": percentile(ok, 0.50),
+        "p95": percentile(ok, 0.95),
+        "p99": percentile(ok, 0.99),
+        "small_statuses": Counter(status for status, _ in small),
+        "bulk_statuses": Counter(status for status, _ in bulk),
+    }
+
+def print_results(label, results):
+    """Print one server's results."""
+    print(f"{label:<8}{results['small_rate']:>12,.0f}{results['p50'] * 1e3:>10.1f}{results['p95'] * 1e3:>10.1f}"
+          f"{results['p99'] * 1e3:>10.1f}   small {dict(results['small_statuses'])}  bulk {dict(results['bulk_statuses'])}")
+
+def main():
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description="Load test the sync and async deployments")
+    parser.add_argument("--servers", default="sync,async", help="Servers to start (default: %(default)s)")
+    parser.add_argument("--url", help="Test an already running server instead of starting them")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes per server (default: %(default)s)")
+    parser.add_argument("--clients", type=int, default=16, help="Clients sending small requests (default: %(default)s)")
+    parser.add_argument("--bulk-clients", type=int, default=2, help="Clients sending bulk requests (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per server (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the started servers (default: %(default)s)")
+    args = parser.parse_args()
+
+    print(f"\n=== Serving: {args.clients} small clients {SMALL_REQUEST}, "
+          f"{args.bulk_clients} bulk clients {BULK_REQUEST}, {args.duration:g}s ===\n")
+    print(f"{'server':<8}{'small req/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+
+    if args.url:
+        if not wait_until_ready(args.url):
+            print(f"{args.url} did not become ready")
+            return
+        print_results("url", run_load(args.url, args.clients, args.bulk_clients, args.duration))
+        return
+
+    env = dict(os.environ, GENERATOR_WARMUP="eager")
+    for server in args.servers.split(","):
+        url = f"http://127.0.0.1:{args.port}"
+        process = subprocess.Popen(server_command(server, args.port, args.workers), env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not wait_until_ready(url):
+                print(f"{server:<8}did not become ready")
+                continue
+            print_results(server, run_load(url, args.clients, args.bulk_clients, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import re
 import os
 import time
 from datetime import datetime
+from census_name_generator import compile_census_data
 
 # Define directory structure
 BASE_DIR = "census_data"
@@ -351,12 +352,18 @@ def main():
     parser.add_argument('--male-names', action='store_true', help='Process male first name data')
     parser.add_argument('--female-names', action='store_true', help='Process female first name data')
     parser.add_argument('--all', action='store_true', help='Process all data types')
+    parser.add_argument('--compile', action='store_true', help='Only compile the final data files into binary name tables')
     parser.add_argument('--firstname-url', type=str, help='URL for first name data')
     parser.add_argument('--male-url', type=str, help='URL for male first name data')
     parser.add_argument('--female-url', type=str, help='URL for female first name data')
     parser.add_argument('--surname-url', type=str, help='URL for surname data')
     args = parser.parse_args()
     
+    if args.compile:
+        print("\nCompiling name tables...")
+        compile_census_data()
+        return
+    
     # Default to processing surnames if no specific args given
     if not (args.surnames or args.firstnames or args.male_names or args.female_names or args.all):
         args.surnames = True
@@ -378,6 +385,11 @@ def main():
         print("\nProcessing female first name data...")
         process_census_firstnames(gender="female", url=args.female_url, test_mode=args.test)
     
+    # Rebuild the compiled tables the generator maps at startup
+    if not args.test:
+        print("\nCompiling name tables...")
+        compile_census_data()
+    
     print("\nCensus data processing complete!")
 
 if __name__ == "__main__":
@@ -1,66 +1,169 @@
 import os
-import json
 import random
 import math
+import sys
+from array import array
 from collections import Counter
+from itertools import accumulate
+from utils import samplers
+from utils.samplers import AliasSampler, PrefixSumSampler
+from utils.name_batch import NameBatch, format_column, chunk_sizes, STREAM_CHUNK_SIZE
+from utils.data_loader import find_data_file, load_name_columns
+from utils.dataset_registry import dataset_registry, file_digest, rank_column_table, rank_name_table
+from utils.name_table import NameSubset
+from utils.rng import get_random, get_numpy_rng
+from utils.startup_profiler import startup_profiler
+from utils.snapshot import snapshot_key, restore_or_build
+from utils.memory_report import memory_report
+from utils.metrics import timed_generation
+
+# Data files (JSON or CSV), and the compiled tables built from them by compile_census_data()
+CENSUS_DIR = os.path.join("census_data", "final")
+FIRST_NAMES_FILE = os.path.join(CENSUS_DIR, "census_firstnames_combined")
+LAST_NAMES_FILE = os.path.join(CENSUS_DIR, "census_surnames")
+COMPILED_FIRST_NAMES_FILE = os.path.join(CENSUS_DIR, "census_firstnames_combined.bin")
+COMPILED_LAST_NAMES_FILE = os.path.join(CENSUS_DIR, "census_surnames.bin")
+COMPILED_FIRST_NAME_GENDERS_FILE = os.path.join(CENSUS_DIR, "census_firstnames_combined.gender.bin")
 
 class CensusNameGenerator:
     """
     Generator for names based on US Census data.
     """
     
+    # Name tiers based on frequency percentiles, used for weighted unique names
+    # Tier 1: Very common (top 10%)
+    # Tier 2: Common (10-30%)
+    # Tier 3: Moderately common (30-60%)
+    # Tier 4: Uncommon (60-90%)
+    # Tier 5: Rare (bottom 10%)
+    TIER_PERCENTILES = {
+        1: (0.0, 0.1),
+        2: (0.1, 0.3),
+        3: (0.3, 0.6),
+        4: (0.6, 0.9),
+        5: (0.9, 1.0)
+    }
+    
+    # Tier selection probabilities (favoring uncommon/rare names)
+    # The more unique tiers (4, 5) get higher probabilities
+    TIER_PROBABILITIES = {
+        1: 0.05,  # Very common (5% chance)
+        2: 0.10,  # Common (10% chance)
+        3: 0.20,  # Moderately common (20% chance)
+        4: 0.30,  # Uncommon (30% chance)
+        5: 0.35   # Rare (35% chance)
+    }
+    TIERS = list(TIER_PROBABILITIES)
+    TIER_CUM_WEIGHTS = list(accumulate(TIER_PROBABILITIES.values()))
+    
+    # Unique names never combine a top N first name with a top N last name
+    DEFAULT_TOP_N = 100
+    
+    # Derived by _build_rank_tables() and kept in the warm-start snapshot
+    SNAPSHOT_ATTRIBUTES = ("first_name_ranks", "first_name_tiers", "last_name_tiers", "last_name_windows",
+                           "first_name_samplers_by_gender", "first_name_tiers_by_gender")
+    
     def __init__(self):
         """Initialize the name generator."""
+        # Names are kept most common first, so a name's index is also its frequency rank
         self.first_names = []
         self.last_names = []
-        self.weighted_first_names = []
-        self.weighted_last_names = []
+        self.first_name_sampler = AliasSampler([], [])
+        self.last_name_sampler = AliasSampler([], [])
+        self.first_name_ranks = array('q')
+        # Capitalized names for batches, built on the first batch
+        self.formatted_first_names = None
+        self.formatted_last_names = None
+        self.first_name_tiers = PrefixSumSampler([], [])
+        self.last_name_tiers = PrefixSumSampler([], [])
+        # Last names by frequency in rank order, so any rank window can be drawn from
+        self.last_name_windows = PrefixSumSampler([], [])
+        # Per-gender samplers over the same first name table, from its gender column
+        self.first_name_samplers_by_gender = {}
+        self.first_name_tiers_by_gender = {}
         
         # Make sure we have data
         self.load_data()
     
     def load_data(self):
-        """Load name data from the census data files."""
-        census_dir = "census_data/final"
-        
-        # Load first names
-        first_names_file = os.path.join(census_dir, "census_firstnames_combined.json")
-        if os.path.exists(first_names_file):
-            with open(first_names_file, 'r') as f:
-                first_names_data = json.load(f)
-                self.first_names = [(item["firstname"], item["frequency"]) 
-                                  for item in first_names_data]
-                # Create weighted list for random selection
-                self.weighted_first_names = []
-                for name, freq in self.first_names:
-                    # Convert frequency to integer weight (multiply by 1000 to preserve decimals)
-                    weight = int(float(freq) * 1000)
-                    self.weighted_first_names.extend([name] * weight)
-        
-        # Load last names
-        last_names_file = os.path.join(census_dir, "census_surnames.json")
-        if os.path.exists(last_names_file):
-            with open(last_names_file, 'r') as f:
-                last_names_data = json.load(f)
-                self.last_names = [(item["surname"], item["frequency"]) 
-                                 for item in last_names_data]
-                # Create weighted list for random selection
-                self.weighted_last_names = []
-                for name, freq in self.last_names:
-                    # Convert frequency to integer weight (multiply by 1000 to preserve decimals)
-                    weight = int(float(freq) * 1000)
-                    self.weighted_last_names.extend([name] * weight)
+        """
+        Load name data, mapping the compiled tables when they are up to date
+        and parsing the census data files otherwise.
+        
+        Tables come from the shared dataset registry, so every generator
+        over the same census files uses one copy of them.
+        """
+        # Load first names, most common first
+        first_name_table = dataset_registry.name_table(FIRST_NAMES_FILE, "firstname",
+                                                       compiled_path=COMPILED_FIRST_NAMES_FILE)
+        self.first_names = first_name_table.pairs
+        # Create weighted sampler for random selection
+        self.first_name_sampler = AliasSampler.from_table(first_name_table)
+        
+        # Load last names, most common first
+        last_name_table = dataset_registry.name_table(LAST_NAMES_FILE, "surname",
+                                                      compiled_path=COMPILED_LAST_NAMES_FILE)
+        self.last_names = last_name_table.pairs
+        # Create weighted sampler for random selection
+        self.last_name_sampler = AliasSampler.from_table(last_name_table)
+        
+        # Precompute the frequency tiers and rank windows, or map them from the last run's snapshot
+        with startup_profiler.phase("index_build"):
+            self._load_rank_tables(first_name_table, last_name_table)
         
         print(f"Loaded {len(self.first_names)} first names")
         print(f"Loaded {len(self.last_names)} last names")
     
-    def generate_name(self):
-        """Generate a random name from census data."""
-        if not self.weighted_first_names or not self.weighted_last_names:
+    @property
+    def genders(self):
+        """Genders that first names can be filtered by, e.g. ("male", "female")."""
+        return tuple(self.first_name_samplers_by_gender)
+    
+    def _for_gender(self, by_gender, gender):
+        """
+        Look up a gender's sampler.
+        
+        Args:
+            by_gender (dict): Sampler for each gender
+            gender (str): Gender to look up, in any case
+            
+        Returns:
+            The gender's sampler
+        """
+        sampler = by_gender.get(gender.lower())
+        if sampler is None:
+            raise ValueError(f"Unknown gender: {gender!r}, expected one of {list(self.genders)}")
+        return sampler
+    
+    def _first_name_sampler(self, gender=None):
+        """Get the first name sampler for a gender, or over every first name if gender is None."""
+        if gender is None:
+            return self.first_name_sampler
+        return self._for_gender(self.first_name_samplers_by_gender, gender)
+    
+    def _first_name_tiers(self, gender=None):
+        """Get the first name tiers for a gender, or over every first name if gender is None."""
+        if gender is None:
+            return self.first_name_tiers
+        return self._for_gender(self.first_name_tiers_by_gender, gender)
+    
+    def generate_name(self, rng=None, gender=None):
+        """
+        Generate a random name from census data.
+        
+        Args:
+            rng: random.Random or seed, the global random stream by default
+            gender (str): Only use first names of this gender, e.g. "female"
+            
+        Returns:
+            str: A generated name
+        """
+        if not self.first_name_sampler or not self.last_name_sampler:
             return "No data available"
         
-        first = random.choice(self.weighted_first_names)
-        last = random.choice(self.weighted_last_names)
+        rng = get_random(rng)
+        first = self._first_name_sampler(gender).sample(rng)
+        last = self.last_name_sampler.sample(rng)
         
         # Properly capitalize the names
         first = first.capitalize()
@@ -68,35 +171,37 @@ class CensusNameGenerator:
         
         return f"{first} {last}"
     
-    def generate_unique_name(self):
+    def generate_unique_name(self, top_n=DEFAULT_TOP_N, rng=None, gender=None):
         """
         Generate a more unique name by avoiding combinations of the most common names.
-        Strategy: Never combine a top 100 first name with a top 100 last name.
+        Strategy: Never combine a top N first name with a top N last name.
+        
+        Args:
+            top_n (int): How many of the most common names count as common (default 100)
+            rng: random.Random or seed, the global random stream by default
+            gender (str): Only use first names of this gender, e.g. "female"
+            
+        Returns:
+            str: A generated name
         """
-        if not self.first_names or not self.last_names:
+        if not self.first_name_sampler or not self.last_name_sampler:
             return "No data available"
+        if not 0 <= top_n < len(self.last_name_sampler):
+            raise ValueError(f"top_n must be at least 0 and less than {len(self.last_name_sampler)}, got {top_n}")
         
-        # Get top 100 first and last names by sorting based on frequency
-        top_first_names = {name for name, _ in sorted(self.first_names, key=lambda x: x[1], reverse=True)[:100]}
-        top_last_names = {name for name, _ in sorted(self.last_names, key=lambda x: x[1], reverse=True)[:100]}
+        rng = get_random(rng)
         
         # Select a first name
-        first_name_candidate = random.choice(self.weighted_first_names)
-        
-        # If first name is in top 100, ensure last name is NOT in top 100
-        if first_name_candidate in top_first_names:
-            # Filter out top 100 last names
-            available_last_names = [(name, freq) for name, freq in self.last_names if name not in top_last_names]
-            # Select a random last name weighted by frequency
-            last_name_weights = [freq for _, freq in available_last_names]
-            last_name_candidate = random.choices(
-                [name for name, _ in available_last_names], 
-                weights=last_name_weights, 
-                k=1
-            )[0]
+        first_index = self._first_name_sampler(gender).sample_index(rng)
+        first_name_candidate = self.first_name_sampler.items[first_index]
+        
+        # If first name is in top N, ensure last name is NOT in top N
+        if self.first_name_ranks[first_index] < top_n:
+            # Every last name ranked below the top N, weighted by frequency
+            last_name_candidate = self.last_name_windows.sample(top_n, rng=rng)
         else:
             # If first name is not common, we can use any last name
-            last_name_candidate = random.choice(self.weighted_last_names)
+            last_name_candidate = self.last_name_sampler.sample(rng)
         
         # Properly capitalize the names
         first_name_candidate = first_name_candidate.capitalize()
@@ -104,7 +209,7 @@ class CensusNameGenerator:
         
         return f"{first_name_candidate} {last_name_candidate}"
     
-    def generate_weighted_unique_name(self):
+    def generate_weighted_unique_name(self, rng=None, gender=None):
         """
         Generate a highly unique name using a weighted probability system.
         Strategy:
@@ -112,101 +217,31 @@ class CensusNameGenerator:
         2. Apply logarithmic scaling to further favor uncommon names
         3. Create tiers of uniqueness with different selection probabilities
         4. Ensure realistic combinations while still prioritizing uniqueness
+        
+        The tiers and weights are built once in load_data, so each name is
+        two O(log n) prefix-sum lookups.
+        
+        Args:
+            rng: random.Random or seed, the global random stream by default
+            gender (str): Only use first names of this gender, e.g. "female"
         """
-        if not self.first_names or not self.last_names:
+        if not self.first_name_tiers or not self.last_name_tiers:
             return "No data available"
         
-        # Define name tiers based on frequency percentiles
-        # Tier 1: Very common (top 10%)
-        # Tier 2: Common (10-30%)
-        # Tier 3: Moderately common (30-60%)
-        # Tier 4: Uncommon (60-90%)
-        # Tier 5: Rare (bottom 10%)
-        
-        # Sort names by frequency
-        sorted_first_names = sorted(self.first_names, key=lambda x: x[1], reverse=True)
-        sorted_last_names = sorted(self.last_names, key=lambda x: x[1], reverse=True)
-        
-        # Calculate tier boundaries
-        first_name_count = len(sorted_first_names)
-        last_name_count = len(sorted_last_names)
-        
-        first_name_tiers = {
-            1: sorted_first_names[:int(first_name_count * 0.1)],
-            2: sorted_first_names[int(first_name_count * 0.1):int(first_name_count * 0.3)],
-            3: sorted_first_names[int(first_name_count * 0.3):int(first_name_count * 0.6)],
-            4: sorted_first_names[int(first_name_count * 0.6):int(first_name_count * 0.9)],
-            5: sorted_first_names[int(first_name_count * 0.9):]
-        }
-        
-        last_name_tiers = {
-            1: sorted_last_names[:int(last_name_count * 0.1)],
-            2: sorted_last_names[int(last_name_count * 0.1):int(last_name_count * 0.3)],
-            3: sorted_last_names[int(last_name_count * 0.3):int(last_name_count * 0.6)],
-            4: sorted_last_names[int(last_name_count * 0.6):int(last_name_count * 0.9)],
-            5: sorted_last_names[int(last_name_count * 0.9):]
-        }
-        
-        # Define tier selection probabilities (favoring uncommon/rare names)
-        # The more unique tiers (4, 5) get higher probabilities
-        tier_probabilities = {
-            1: 0.05,  # Very common (5% chance)
-            2: 0.10,  # Common (10% chance)
-            3: 0.20,  # Moderately common (20% chance)
-            4: 0.30,  # Uncommon (30% chance)
-            5: 0.35   # Rare (35% chance)
-        }
+        rng = get_random(rng)
         
         # Select a tier for first name and last name
-        first_name_tier = random.choices(
-            list(tier_probabilities.keys()),
-            weights=list(tier_probabilities.values()),
-            k=1
-        )[0]
-        
-        last_name_tier = random.choices(
-            list(tier_probabilities.keys()),
-            weights=list(tier_probabilities.values()),
-            k=1
-        )[0]
+        first_name_tier = rng.choices(self.TIERS, cum_weights=self.TIER_CUM_WEIGHTS, k=1)[0]
+        last_name_tier = rng.choices(self.TIERS, cum_weights=self.TIER_CUM_WEIGHTS, k=1)[0]
         
         # Apply an additional rule: if first name is very common (tier 1), 
         # ensure last name is at least uncommon (tier 4 or 5)
         if first_name_tier == 1:
-            last_name_tier = random.choice([4, 5])
+            last_name_tier = rng.choice([4, 5])
         
         # Select names from the chosen tiers with inversely weighted probabilities
-        first_name_options = first_name_tiers[first_name_tier]
-        last_name_options = last_name_tiers[last_name_tier]
-        
-        # Invert and normalize weights for selected tier
-        if first_name_options:
-            # Invert frequencies to favor less common names within the tier
-            first_name_inverted_weights = [1/(freq + 0.001) for _, freq in first_name_options]  # Add small constant to avoid division by zero
-            # Apply logarithmic scaling to make the distribution more balanced
-            first_name_scaled_weights = [math.log(w + 1) for w in first_name_inverted_weights]
-            # Select a name using these weights
-            first_name_candidate = random.choices(
-                [name for name, _ in first_name_options],
-                weights=first_name_scaled_weights,
-                k=1
-            )[0]
-        else:
-            # Fallback if tier is empty
-            first_name_candidate = random.choice([name for name, _ in sorted_first_names[int(first_name_count * 0.6):]])
-        
-        if last_name_options:
-            # Same weighting approach for last names
-            last_name_inverted_weights = [1/(freq + 0.001) for _, freq in last_name_options]
-            last_name_scaled_weights = [math.log(w + 1) for w in last_name_inverted_weights]
-            last_name_candidate = random.choices(
-                [name for name, _ in last_name_options],
-                weights=last_name_scaled_weights,
-                k=1
-            )[0]
-        else:
-            # Fallback if tier is empty
-            last_name_candidate = random.choice([name for name, _ in sorted_last_names[int(last_name_count * 0.6):]])
+        first_name_candidate = self._sample_tier(self._first_name_tiers(gender), first_name_tier, rng)
+        last_name_candidate = self._sample_tier(self.last_name_tiers, last_name_tier, rng)
         
         # Properly capitalize the names
         first_name_candidate = first_name_candidate.capitalize()
@@ -214,29 +249,274 @@ class CensusNameGenerator:
         
         return f"{first_name_candidate} {last_name_candidate}"
     
-    def generate_multiple_weighted_unique(self, count=10):
+    def generate_windowed_name(self, first_window=(0.0, 1.0), last_window=(0.0, 1.0), by="percentile", rng=None,
+                               gender=None):
+        """
+        Generate a name from chosen frequency windows, favoring less common names within each window.
+        
+        Args:
+            first_window (tuple): (start, end) window for the first name
+            last_window (tuple): (start, end) window for the last name
+            by (str): "percentile" for windows from 0.0 to 1.0, or "rank" for windows of ranks
+            rng: random.Random or seed, the global random stream by default
+            gender (str): Only use first names of this gender, ranked among themselves
+            
+        Returns:
+            str: A generated name
+        """
+        if not self.first_name_tiers or not self.last_name_tiers:
+            return "No data available"
+        
+        rng = get_random(rng)
+        first_name_tiers = self._first_name_tiers(gender)
+        if by == "percentile":
+            first = first_name_tiers.sample_percentile(*first_window, rng=rng)
+            last = self.last_name_tiers.sample_percentile(*last_window, rng=rng)
+        elif by == "rank":
+            first = first_name_tiers.sample(*first_window, rng=rng)
+            last = self.last_name_tiers.sample(*last_window, rng=rng)
+        else:
+            raise ValueError(f"Unknown window type: {by}")
+        
+        return f"{first.capitalize()} {last.capitalize()}"
+    
+    def _load_rank_tables(self, first_name_table, last_name_table):
+        """
+        Restore the rank-based structures from a warm-start snapshot, building
+        and saving them when the snapshot is missing or stale.
+        """
+        key = None
+        if first_name_table and last_name_table:
+            key = snapshot_key(dataset_registry.table_digest(first_name_table),
+                               dataset_registry.table_digest(last_name_table),
+                               self.DEFAULT_TOP_N, file_digest(__file__), file_digest(samplers.__file__))
+        shared = {"first_names": first_name_table, "last_names": last_name_table}
+        restore_or_build(self, "census", key, self.SNAPSHOT_ATTRIBUTES, self._build_rank_tables, shared)
+    
+    def _build_rank_tables(self):
+        """
+        Build every rank-based structure from the rank-ordered name tables.
+        """
+        # Best rank of each first name, for O(1) "is this a top N name" checks
+        self.first_name_ranks = self._rank_array(self.first_name_sampler.items)
+        
+        # Tiers for weighted unique names
+        self.first_name_tiers = self._inverse_frequency_sampler(self.first_name_sampler)
+        self.last_name_tiers = self._inverse_frequency_sampler(self.last_name_sampler)
+        
+        # Unique names draw last names from the ranks after any top N cutoff in O(log n)
+        self.last_name_windows = PrefixSumSampler(self.last_name_sampler.items, self.last_name_sampler.weights)
+        
+        self._build_gender_tables()
+    
+    def _build_gender_tables(self):
+        """
+        Build a first name sampler and tiers for each gender in the first name file.
+        
+        The samplers share the first name table, giving other genders' names
+        zero weight, so filtering by gender costs nothing per name. The tiers
+        rank each gender's names among themselves.
+        """
+        self.first_name_samplers_by_gender = {}
+        self.first_name_tiers_by_gender = {}
+        first_names = self.first_name_sampler.items
+        genders = dataset_registry.column(FIRST_NAMES_FILE, "gender", compiled_path=COMPILED_FIRST_NAME_GENDERS_FILE)
+        if not genders or len(genders) != len(first_names):
+            return
+        
+        self.first_name_samplers_by_gender = AliasSampler.by_label(first_names, self.first_name_sampler.weights, genders)
+        weights = self._inverse_frequency_weights(self.first_name_sampler.weights)
+        for gender in self.first_name_samplers_by_gender:
+            indices = [i for i, name_gender in enumerate(genders) if name_gender == gender]
+            self.first_name_tiers_by_gender[gender] = PrefixSumSampler(NameSubset(first_names, indices),
+                                                                       [weights[i] for i in indices])
+    
+    @staticmethod
+    def _rank_array(names):
+        """
+        Look up the frequency rank of each name.
+        
+        Args:
+            names (Sequence): Names in rank order
+            
+        Returns:
+            array: Rank of each name, using its best rank if it appears more than once
+        """
+        ranks = {}
+        for rank, name in enumerate(names):
+            ranks.setdefault(name, rank)
+        return array('q', (ranks[name] for name in names))
+    
+    @staticmethod
+    def _inverse_frequency_sampler(sampler):
+        """
+        Weight names so less common names are favored.
+        
+        Args:
+            sampler (AliasSampler): Sampler over names in rank order, most common first
+            
+        Returns:
+            PrefixSumSampler: Sampler over the names in rank order
+        """
+        return PrefixSumSampler(sampler.items, CensusNameGenerator._inverse_frequency_weights(sampler.weights))
+    
+    @staticmethod
+    def _inverse_frequency_weights(frequencies):
+        """
+        Invert frequencies (small constant avoids division by zero), then apply
+        logarithmic scaling to make the distribution more balanced.
+        """
+        return [math.log(1 / (freq + 0.001) + 1) for freq in frequencies]
+    
+    def _sample_tier(self, sampler, tier, rng=random):
+        """
+        Draw a name from one of the frequency tiers.
+        
+        Args:
+            sampler (PrefixSumSampler): Rank-ordered sampler for first or last names
+            tier (int): Tier number from 1 (very common) to 5 (rare)
+            rng: random.Random stream to draw from
+            
+        Returns:
+            str: The selected name
+        """
+        start, stop = sampler.percentile_window(*self.TIER_PERCENTILES[tier])
+        if start < stop:
+            return sampler.sample(start, stop, rng)
+        
+        # Fallback if tier is empty
+        return sampler.items[rng.randrange(int(len(sampler) * 0.6), len(sampler))]
+    
+    @timed_generation
+    def generate_multiple_weighted_unique(self, count=10, rng=None, gender=None):
         """Generate multiple weighted unique names."""
-        return [self.generate_weighted_unique_name() for _ in range(count)]
+        rng = get_random(rng)
+        return [self.generate_weighted_unique_name(rng, gender) for _ in range(count)]
         
-    def generate_multiple_unique(self, count=10):
+    @timed_generation
+    def generate_multiple_unique(self, count=10, top_n=DEFAULT_TOP_N, rng=None, gender=None):
         """Generate multiple unique names."""
-        return [self.generate_unique_name() for _ in range(count)]
+        rng = get_random(rng)
+        return [self.generate_unique_name(top_n, rng, gender) for _ in range(count)]
         
-    def generate_multiple(self, count=10):
+    @timed_generation
+    def generate_multiple(self, count=10, rng=None, gender=None):
         """Generate multiple random names."""
-        return [self.generate_name() for _ in range(count)]
+        rng = get_random(rng)
+        return [self.generate_name(rng, gender) for _ in range(count)]
+    
+    @timed_generation
+    def generate_batch(self, count=10, rng=None, lazy=False, gender=None):
+        """
+        Generate many random names at once by drawing index arrays with NumPy.
+        
+        Args:
+            count (int): Number of names to generate
+            rng: NumPy Generator, random.Random or seed, a fresh Generator by default
+            lazy (bool): Return a NameBatch that formats names on access
+            gender (str): Only use first names of this gender, e.g. "female"
+            
+        Returns:
+            list or NameBatch: Generated names
+        """
+        if not self.first_name_sampler or not self.last_name_sampler:
+            return ["No data available"] * count
+        
+        if self.formatted_first_names is None or self.formatted_last_names is None:
+            self.formatted_first_names = format_column(self.first_name_sampler.items, str.capitalize)
+            self.formatted_last_names = format_column(self.last_name_sampler.items, str.capitalize)
+        
+        rng = get_numpy_rng(rng)
+        batch = NameBatch(
+            self.formatted_first_names, self.formatted_last_names,
+            self._first_name_sampler(gender).sample_indices(count, rng),
+            self.last_name_sampler.sample_indices(count, rng)
+        )
+        return batch if lazy else batch.tolist()
+    
+    def iter_names(self, count, rng=None, gender=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Generate any number of random names a chunk at a time, so memory
+        stays the same however many names are streamed.
+        
+        Args:
+            count (int): Number of names to generate
+            rng: NumPy Generator, random.Random or seed, shared by every chunk
+            gender (str): Only use first names of this gender, e.g. "female"
+            chunk_size (int): Most names in one chunk
+            
+        Returns:
+            Iterator of lists of generated names
+        """
+        rng = get_numpy_rng(rng)
+        for size in chunk_sizes(count, chunk_size):
+            yield self.generate_batch(size, rng, gender=gender)
+    
+    def iter_unique_names(self, count, top_n=DEFAULT_TOP_N, rng=None, gender=None, chunk_size=STREAM_CHUNK_SIZE):
+        """Generate any number of unique names a chunk at a time, see iter_names()."""
+        rng = get_random(rng)
+        for size in chunk_sizes(count, chunk_size):
+            yield self.generate_multiple_unique(size, top_n, rng, gender)
+    
+    def iter_weighted_unique_names(self, count, rng=None, gender=None, chunk_size=STREAM_CHUNK_SIZE):
+        """Generate any number of weighted unique names a chunk at a time, see iter_names()."""
+        rng = get_random(rng)
+        for size in chunk_sizes(count, chunk_size):
+            yield self.generate_multiple_weighted_unique(size, rng, gender)
     
     def get_most_common(self, name_type="first", limit=20):
         """Get the most common names of a specific type."""
         if name_type == "first":
-            return sorted(self.first_names, key=lambda x: x[1], reverse=True)[:limit]
+            return self.first_names[:limit]
         elif name_type == "last":
-            return sorted(self.last_names, key=lambda x: x[1], reverse=True)[:limit]
+            return self.last_names[:limit]
         else:
             return []
+    
+    def memory_report(self):
+        """
+        Break down the generator's memory by structure.
+        
+        Returns:
+            dict: Private and shared bytes for each attribute, see utils/memory_report.py
+        """
+        return memory_report(self)
+
+def compile_census_data():
+    """
+    Compile the census data files into tables the generator can map without parsing.
+    
+    Returns:
+        list: Paths of the compiled tables that were written
+    """
+    written = []
+    for source_file, compiled_file, name_key in [
+        (FIRST_NAMES_FILE, COMPILED_FIRST_NAMES_FILE, "firstname"),
+        (LAST_NAMES_FILE, COMPILED_LAST_NAMES_FILE, "surname"),
+    ]:
+        source_file = find_data_file(source_file) or source_file
+        if not os.path.exists(source_file):
+            print(f"Data file not found, skipping: {source_file}")
+            continue
+        table = rank_name_table(*load_name_columns(source_file, name_key))
+        table.save(compiled_file)
+        print(f"Compiled {len(table)} names from {source_file} to {compiled_file} ({table.nbytes:,} bytes)")
+        written.append(compiled_file)
+        
+        # First names also carry their gender, compiled as a column in the same rank order
+        if name_key == "firstname":
+            genders = rank_column_table(*load_name_columns(source_file, "gender"))
+            genders.save(COMPILED_FIRST_NAME_GENDERS_FILE)
+            print(f"Compiled {len(genders)} genders from {source_file} to {COMPILED_FIRST_NAME_GENDERS_FILE}")
+            written.append(COMPILED_FIRST_NAME_GENDERS_FILE)
+    return written
 
 def main():
     """Main function to demonstrate the name generator."""
+    if "--compile" in sys.argv[1:]:
+        compile_census_data()
+        return
+    
     generator = CensusNameGenerator()
     
     print("\n=== Census Name Generator ===\n")
@@ -2,9 +2,14 @@
 Base class for name generators.
 """
 
-import random
-from typing import List, Tuple, Optional
-from utils.data_loader import create_weighted_list, format_name
+from typing import Any, Dict, Iterator, List, Tuple, Optional, Union
+import numpy as np
+from utils.data_loader import format_name
+from utils.samplers import AliasSampler
+from utils.name_batch import NameBatch, format_column, chunk_sizes, STREAM_CHUNK_SIZE
+from utils.rng import get_random, get_numpy_rng
+from utils.memory_report import memory_report
+from utils.metrics import timed_generation
 
 class BaseNameGenerator:
     """Base class for name generators."""
@@ -13,39 +18,149 @@ class BaseNameGenerator:
         """Initialize the name generator."""
         self.first_names: List[Tuple[str, float]] = []
         self.last_names: List[Tuple[str, float]] = []
-        self.weighted_first_names: List[str] = []
-        self.weighted_last_names: List[str] = []
+        self.first_name_sampler: AliasSampler = AliasSampler([], [])
+        self.last_name_sampler: AliasSampler = AliasSampler([], [])
+        # First name sampler for each gender, sharing the first name sampler's items
+        self.first_name_samplers_by_gender: Dict[str, AliasSampler] = {}
+        self._formatted_columns = {}
     
     def load_data(self):
         """Load name data from files. To be implemented by subclasses."""
         raise NotImplementedError("Subclasses must implement load_data()")
     
-    def generate_name(self) -> str:
+    @property
+    def genders(self) -> Tuple[str, ...]:
+        """Genders that first names can be filtered by, none if the data has no genders."""
+        return tuple(self.first_name_samplers_by_gender)
+    
+    def _first_name_sampler(self, gender: Optional[str] = None) -> AliasSampler:
+        """
+        Get the first name sampler for a gender.
+        
+        Args:
+            gender (Optional[str]): Gender in any case, or None for every first name
+            
+        Returns:
+            AliasSampler: Sampler whose indices point into first_name_sampler.items
+        """
+        if gender is None:
+            return self.first_name_sampler
+        sampler = self.first_name_samplers_by_gender.get(gender.lower())
+        if sampler is None:
+            raise ValueError(f"Unknown gender: {gender!r}, expected one of {list(self.genders)}")
+        return sampler
+    
+    def generate_name(self, rng=None, gender: Optional[str] = None) -> str:
         """
         Generate a random name.
         
+        Args:
+            rng: random.Random or seed, the global random stream by default
+            gender (Optional[str]): Only use first names of this gender, e.g. "female"
+            
         Returns:
             str: A generated name
         """
-        if not self.weighted_first_names or not self.weighted_last_names:
+        if not self.first_name_sampler or not self.last_name_sampler:
             return "No data available"
         
-        first = random.choice(self.weighted_first_names)
-        last = random.choice(self.weighted_last_names)
+        rng = get_random(rng)
+        first = self._first_name_sampler(gender).sample(rng)
+        last = self.last_name_sampler.sample(rng)
         
         return self.format_full_name(first, last)
     
-    def generate_multiple(self, count: int = 10) -> List[str]:
+    @timed_generation
+    def generate_multiple(self, count: int = 10, rng=None, gender: Optional[str] = None) -> List[str]:
         """
         Generate multiple random names.
         
         Args:
             count (int): Number of names to generate
+            rng: random.Random or seed, the global random stream by default
+            gender (Optional[str]): Only use first names of this gender, e.g. "female"
             
         Returns:
             List[str]: List of generated names
         """
-        return [self.generate_name() for _ in range(count)]
+        rng = get_random(rng)
+        return [self.generate_name(rng, gender) for _ in range(count)]
+    
+    @timed_generation
+    def generate_batch(self, count: int = 10, rng=None, lazy: bool = False,
+                       gender: Optional[str] = None) -> Union[List[str], NameBatch]:
+        """
+        Generate many names at once by drawing index arrays with NumPy.
+        
+        Args:
+            count (int): Number of names to generate
+            rng: NumPy Generator, random.Random or seed, a fresh Generator by default
+            lazy (bool): Return a NameBatch that formats names on access
+            gender (Optional[str]): Only use first names of this gender, e.g. "female"
+            
+        Returns:
+            Union[List[str], NameBatch]: Generated names
+        """
+        if not self.first_name_sampler or not self.last_name_sampler:
+            return ["No data available"] * count
+        
+        rng = get_numpy_rng(rng)
+        first_idx = self._first_name_sampler(gender).sample_indices(count, rng)
+        last_idx = self.last_name_sampler.sample_indices(count, rng)
+        nicknames, nickname_idx = self._batch_nicknames(count, rng)
+        
+        batch = NameBatch(
+            self._formatted_column(self.first_name_sampler), self._formatted_column(self.last_name_sampler),
+            first_idx, last_idx, nicknames, nickname_idx
+        )
+        return batch if lazy else batch.tolist()
+    
+    def iter_names(self, count: int, rng=None, chunk_size: int = STREAM_CHUNK_SIZE, **options) -> Iterator[List[str]]:
+        """
+        Generate any number of names a chunk at a time, so memory stays the
+        same however many names are streamed.
+        
+        Args:
+            count (int): Number of names to generate
+            rng: NumPy Generator, random.Random or seed, shared by every chunk
+            chunk_size (int): Most names in one chunk
+            **options: Passed on to generate_batch, e.g. gender
+            
+        Returns:
+            Iterator[List[str]]: Chunks of generated names
+        """
+        rng = get_numpy_rng(rng)
+        for size in chunk_sizes(count, chunk_size):
+            yield self.generate_batch(size, rng, **options)
+    
+    def _batch_nicknames(self, count: int, rng: np.random.Generator) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Draw nickname indices for a batch. Generators without nicknames use none.
+        
+        Args:
+            count (int): Number of names in the batch
+            rng (np.random.Generator): Random stream for the batch
+            
+        Returns:
+            Tuple[Optional[np.ndarray], Optional[np.ndarray]]: Formatted nicknames and indices (-1 for none)
+        """
+        return None, None
+    
+    def _formatted_column(self, sampler: AliasSampler) -> np.ndarray:
+        """
+        Get the formatted names for a sampler, formatting them on first use.
+        
+        Args:
+            sampler (AliasSampler): Sampler whose items should be formatted
+            
+        Returns:
+            np.ndarray: Formatted names in sampler order
+        """
+        cached = self._formatted_columns.get(id(sampler))
+        if cached is None or cached[0] is not sampler:
+            cached = (sampler, format_column(sampler.items, format_name))
+            self._formatted_columns[id(sampler)] = cached
+        return cached[1]
     
     def get_most_common(self, name_type: str = "first", limit: int = 20) -> List[Tuple[str, float]]:
         """
@@ -67,6 +182,15 @@ class BaseNameGenerator:
             
         return sorted(names, key=lambda x: x[1], reverse=True)[:limit]
     
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Break down the generator's memory by structure.
+        
+        Returns:
+            Dict[str, Any]: Private and shared bytes for each attribute, see utils/memory_report.py
+        """
+        return memory_report(self)
+    
     def format_full_name(self, first: str, last: str, nickname: Optional[str] = None) -> str:
         """
         Format a full name with optional nickname.
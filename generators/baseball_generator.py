@@ -2,11 +2,12 @@
 Generator for vintage baseball player names.
 """
 
-import os
-import random
-from typing import List, Tuple
+from typing import List, Tuple, Optional
+import numpy as np
 from .base_generator import BaseNameGenerator
-from utils.data_loader import load_json_data, create_weighted_list
+from utils.baseball_etl import load_count_tables
+from utils.samplers import AliasSampler
+from utils.rng import get_random
 
 class BaseballNameGenerator(BaseNameGenerator):
     """Generator for vintage baseball player names."""
@@ -15,80 +16,73 @@ class BaseballNameGenerator(BaseNameGenerator):
         """Initialize the baseball name generator."""
         super().__init__()
         self.nicknames: List[Tuple[str, float]] = []
-        self.weighted_nicknames: List[str] = []
+        self.nickname_sampler: AliasSampler = AliasSampler([], [])
+        self.nickname_chance = 0.7
         self.load_data()
     
     def load_data(self):
-        """Load baseball player name data."""
-        data_dir = "baseball_data"
-        player_file = os.path.join(data_dir, "all_baseball_players.json")
-        
-        players = load_json_data(player_file)
-        if not players:
+        """Load the baseball name count tables built by clean_baseball_data.py."""
+        tables = load_count_tables()
+        if tables is None:
             return
-            
-        print(f"Loaded {len(players)} players from {player_file}")
-        
-        # Process first names
-        first_counter = {}
-        last_counter = {}
-        nickname_counter = {}
-        
-        for player in players:
-            # First names
-            first = player.get("first_name", "")
-            if first and len(first) > 1:
-                first_counter[first] = first_counter.get(first, 0) + 1
-            
-            # Last names
-            last = player.get("last_name", "")
-            if last and len(last) > 1:
-                last_counter[last] = last_counter.get(last, 0) + 1
-            
-            # Nicknames
-            nick = player.get("nickname", "")
-            if nick and nick != "None" and len(nick) > 1 and nick.lower() != "none":
-                if " or " in nick.lower():
-                    parts = nick.split(" or ")
-                    for part in parts:
-                        if part and len(part.strip()) > 1:
-                            nickname_counter[part.strip()] = nickname_counter.get(part.strip(), 0) + 1
-                else:
-                    nickname_counter[nick] = nickname_counter.get(nick, 0) + 1
+        first_name_table, last_name_table, nickname_table = tables
         
-        # Convert counters to lists of tuples
-        self.first_names = [(name, count) for name, count in first_counter.items()]
-        self.last_names = [(name, count) for name, count in last_counter.items()]
-        self.nicknames = [(name, count) for name, count in nickname_counter.items()]
+        # (name, count) views, most common first
+        self.first_names = first_name_table.pairs
+        self.last_names = last_name_table.pairs
+        self.nicknames = nickname_table.pairs
         
-        # Create weighted lists
-        self.weighted_first_names = create_weighted_list(self.first_names)
-        self.weighted_last_names = create_weighted_list(self.last_names)
-        self.weighted_nicknames = create_weighted_list(self.nicknames)
+        # Create weighted samplers
+        self.first_name_sampler = AliasSampler.from_table(first_name_table)
+        self.last_name_sampler = AliasSampler.from_table(last_name_table)
+        self.nickname_sampler = AliasSampler.from_table(nickname_table)
         
         print(f"Processed {len(self.first_names)} unique first names")
         print(f"Processed {len(self.last_names)} unique last names")
         print(f"Processed {len(self.nicknames)} unique nicknames")
     
-    def generate_name(self) -> str:
+    def generate_name(self, rng=None, gender: Optional[str] = None) -> str:
         """
         Generate a random baseball player name.
         
+        Args:
+            rng: random.Random or seed, the global random stream by default
+            gender (Optional[str]): Not supported, the player data has no genders
+            
         Returns:
             str: A generated name
         """
-        if not self.weighted_first_names or not self.weighted_last_names:
+        if not self.first_name_sampler or not self.last_name_sampler:
             return "No data available"
         
-        first = random.choice(self.weighted_first_names)
-        last = random.choice(self.weighted_last_names)
+        rng = get_random(rng)
+        first = self._first_name_sampler(gender).sample(rng)
+        last = self.last_name_sampler.sample(rng)
         
-        if self.weighted_nicknames and random.random() < 0.7:  # 70% chance to use nickname
-            nickname = random.choice(self.weighted_nicknames)
+        if self.nickname_sampler and rng.random() < self.nickname_chance:  # 70% chance to use nickname
+            nickname = self.nickname_sampler.sample(rng)
             return self.format_full_name(first, last, nickname)
         
         return self.format_full_name(first, last)
     
+    def _batch_nicknames(self, count: int, rng: np.random.Generator) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Draw nickname indices for a batch, leaving about 30% of names without one.
+        
+        Args:
+            count (int): Number of names in the batch
+            rng (np.random.Generator): Random stream for the batch
+            
+        Returns:
+            Tuple[Optional[np.ndarray], Optional[np.ndarray]]: Formatted nicknames and indices (-1 for none)
+        """
+        if not self.nickname_sampler:
+            return None, None
+        
+        nickname_idx = self.nickname_sampler.sample_indices(count, rng)
+        nickname_idx[rng.random(count) >= self.nickname_chance] = -1
+        return self._formatted_column(self.nickname_sampler), nickname_idx
+    
     def get_notable_nicknames(self, min_length: int = 5, limit: int = 20) -> List[Tuple[str, float]]:
         """
         Get notable (longer) nicknames.
@@ -5,7 +5,8 @@ Generator for names based on US Census data.
 import os
 from typing import List, Tuple
 from .base_generator import BaseNameGenerator
-from utils.data_loader import load_json_data, create_weighted_list
+from utils.dataset_registry import dataset_registry
+from utils.samplers import AliasSampler
 
 class CensusNameGenerator(BaseNameGenerator):
     """Generator for census-based names."""
@@ -16,24 +17,25 @@ class CensusNameGenerator(BaseNameGenerator):
         self.load_data()
     
     def load_data(self):
-        """Load name data from census files."""
+        """Load name data from census files, in JSON or CSV format, through the shared dataset registry."""
         census_dir = "census_data/final"
         
-        # Load first names
-        first_names_file = os.path.join(census_dir, "census_firstnames_combined.json")
-        first_names_data = load_json_data(first_names_file)
-        if first_names_data:
-            self.first_names = [(item["firstname"], item["frequency"]) 
-                               for item in first_names_data]
-            self.weighted_first_names = create_weighted_list(self.first_names)
+        # Load first names, with a sampler per gender over the same table
+        first_names_file = os.path.join(census_dir, "census_firstnames_combined")
+        first_name_table = dataset_registry.name_table(first_names_file, "firstname")
+        if first_name_table:
+            self.first_names = first_name_table.pairs
+            self.first_name_sampler = AliasSampler.from_table(first_name_table)
+            genders = dataset_registry.column(first_names_file, "gender")
+            if len(genders) == len(first_name_table):
+                self.first_name_samplers_by_gender = AliasSampler.by_label(first_name_table, first_name_table.weights,
+                                                                           genders)
         
         # Load last names
-        last_names_file = os.path.join(census_dir, "census_surnames.json")
-        last_names_data = load_json_data(last_names_file)
-        if last_names_data:
-            self.last_names = [(item["surname"], item["frequency"]) 
-                              for item in last_names_data]
-            self.weighted_last_names = create_weighted_list(self.last_names)
+        last_name_table = dataset_registry.name_table(os.path.join(census_dir, "census_surnames"), "surname")
+        if last_name_table:
+            self.last_names = last_name_table.pairs
+            self.last_name_sampler = AliasSampler.from_table(last_name_table)
         
         print(f"Loaded {len(self.first_names)} first names")
         print(f"Loaded {len(self.last_names)} last names") 
\ No newline at end of file
@@ -4,14 +4,211 @@ Generator for funny names based on US Census data.
 
 import os
 import random
-import re
-from typing import List, Tuple, Dict, Set
+from array import array
+from typing import List, Sequence, Tuple, Dict, Set, Union
+import numpy as np
 from .base_generator import BaseNameGenerator
-from utils.data_loader import load_json_data, create_weighted_list
+from utils.name_batch import NameBatch
+from utils.dataset_registry import dataset_registry, file_digest
+from utils.samplers import AliasSampler
+from utils import pattern_matcher
+from utils.pattern_matcher import MultiPatternMatcher
+from utils.rng import get_random, get_numpy_rng
+from utils.startup_profiler import startup_profiler
+from utils.snapshot import snapshot_key, restore_or_build
+from utils.metrics import metrics, timed_generation
+
+# Sets that ran out of unique first or last names, and the names filled in with possible repeats
+FALLBACK_BATCHES = metrics.counter(
+    "namegen_funny_fallbacks_total", "Funny name sets that ran out of unique first or last names"
+)
+FALLBACK_NAMES = metrics.counter(
+    "namegen_funny_fallback_names_total", "Funny names added with possible repeats after the unique pools ran dry"
+)
+
+def _flatten_pools(pools: Dict[str, Sequence[int]], patterns: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Concatenate the pools for the given patterns into one index array.
+    
+    Args:
+        pools: Pattern -> name indices
+        patterns: Patterns to include, in order
+        
+    Returns:
+        Flat name indices, the offset of each pattern's pool and each pool's size
+    """
+    sizes = np.array([len(pools[p]) for p in patterns], dtype=np.int64)
+    offsets = np.zeros(len(patterns), dtype=np.int64)
+    if len(patterns) > 1:
+        offsets[1:] = np.cumsum(sizes)[:-1]
+    flat = np.array([index for p in patterns for index in pools[p]], dtype=np.int64)
+    return flat, offsets, sizes
+
+def _draw_from_pools(flat_pools: Tuple[np.ndarray, np.ndarray, np.ndarray], patterns: np.ndarray,
+                     rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw one name uniformly from the pool of each chosen pattern.
+    
+    Args:
+        flat_pools: Output of _flatten_pools
+        patterns: Chosen pattern position for each draw
+        rng: Random stream for the batch
+        
+    Returns:
+        Name indices
+    """
+    flat, offsets, sizes = flat_pools
+    picks = (rng.random(len(patterns)) * sizes[patterns]).astype(np.int64)
+    np.minimum(picks, sizes[patterns] - 1, out=picks)
+    return flat[offsets[patterns] + picks]
+
+class _PoolCursor:
+    """
+    Draws name indices from one pool without replacement.
+    
+    The pool is shuffled lazily as it is drawn from, and names already used
+    elsewhere in the batch are skipped, so each entry is looked at once.
+    """
+    
+    __slots__ = ("pool", "remaining")
+    
+    def __init__(self, pool: Sequence[int]):
+        self.pool = array('q', pool)
+        self.remaining = len(self.pool)
+    
+    def draw(self, names: List[str], used: Set[str], rng=random):
+        """
+        Draw an index whose name is not in used, or None if the pool is exhausted.
+        """
+        pool = self.pool
+        while self.remaining:
+            j = rng.randrange(self.remaining)
+            self.remaining -= 1
+            index = pool[j]
+            # Swap the drawn index past the end, where put_back() can find it
+            pool[j] = pool[self.remaining]
+            pool[self.remaining] = index
+            if names[index] not in used:
+                return index
+        return None
+    
+    def put_back(self):
+        """
+        Return the index drawn last to the pool, e.g. when no partner could be found for it.
+        """
+        self.remaining += 1
+
+class _UniquePairDraw:
+    """
+    State for one batch of funny names with no repeated first or last name.
+    """
+    
+    def __init__(self, generator: "FunnyNameGenerator", rng=random):
+        self.generator = generator
+        self.rng = rng
+        self.first_names = generator.first_name_sampler.items
+        self.last_names = generator.last_name_sampler.items
+        self.used_first = set()
+        self.used_last = set()
+        self.cursors = {}
+        # Cursor of the last first name drawn, to put it back if it can't be paired
+        self.first_cursor = None
+    
+    def _draw(self, key, pool: Sequence[int], names: List[str], used: Set[str]):
+        cursor = self.cursors.get(key)
+        if cursor is None:
+            cursor = self.cursors[key] = _PoolCursor(pool)
+        index = cursor.draw(names, used, self.rng)
+        if index is not None and key[0] == "first":
+            self.first_cursor = cursor
+        return index
+    
+    def _put_back_first(self):
+        self.first_cursor.put_back()
+        self.first_cursor = None
+    
+    def _first(self, key, pool: Sequence[int]):
+        return self._draw(("first",) + key, pool, self.first_names, self.used_first)
+    
+    def _last(self, key, pool: Sequence[int]):
+        return self._draw(("last",) + key, pool, self.last_names, self.used_last)
+    
+    def _accept(self, first_index: int, last_index: int) -> Tuple[int, int]:
+        self.used_first.add(self.first_names[first_index])
+        self.used_last.add(self.last_names[last_index])
+        return first_index, last_index
+    
+    def silly_sound_pair(self):
+        """
+        Draw an unused silly sound pair, or None if the silly pools are exhausted.
+        """
+        gen = self.generator
+        if not gen.silly_last_patterns:
+            return None
+        
+        patterns = list(gen.silly_first_patterns)
+        self.rng.shuffle(patterns)
+        for pattern in patterns:
+            first_index = self._first(("silly", pattern), gen.silly_first_pools[pattern])
+            if first_index is None:
+                continue
+            
+            # Prefer the same pattern, then other matching patterns, then any silly last name
+            matching = list(gen._silly_matching_patterns(gen.silly_first_masks[first_index]))
+            self.rng.shuffle(matching)
+            others = list(gen.silly_last_patterns)
+            self.rng.shuffle(others)
+            for last_pattern in [pattern] + matching + others:
+                if not gen.silly_last_pools.get(last_pattern):
+                    continue
+                last_index = self._last(("silly", last_pattern), gen.silly_last_pools[last_pattern])
+                if last_index is not None:
+                    return self._accept(first_index, last_index)
+            # Keep the first name for a later pair and try the next pattern
+            self._put_back_first()
+        return None
+    
+    def crude_pair(self):
+        """
+        Draw an unused crude pair, or None if the crude pools are exhausted.
+        """
+        gen = self.generator
+        if gen.innuendo_first_pool and gen.innuendo_last_pool:
+            first_index = self._first(("innuendo",), gen.innuendo_first_pool)
+            last_index = self._last(("innuendo",), gen.innuendo_last_pool) if first_index is not None else None
+        else:
+            first_index = self._pattern_draw(self._first, gen.crude_first_patterns, gen.crude_first_pools)
+            last_index = self._pattern_draw(self._last, gen.crude_last_patterns, gen.crude_last_pools) if first_index is not None else None
+        
+        if first_index is None:
+            return None
+        if last_index is None:
+            self._put_back_first()
+            return None
+        return self._accept(first_index, last_index)
+    
+    def _pattern_draw(self, draw, patterns: Tuple[str, ...], pools: Dict[str, Sequence[int]]):
+        order = list(patterns)
+        self.rng.shuffle(order)
+        for pattern in order:
+            index = draw(("crude", pattern), pools[pattern])
+            if index is not None:
+                return index
+        return None
 
 class FunnyNameGenerator(BaseNameGenerator):
     """Generator for funny names based on census data."""
     
+    # Derived by _build_candidate_pools() and kept in the warm-start snapshot
+    SNAPSHOT_ATTRIBUTES = (
+        "silly_first_masks", "silly_last_masks", "crude_first_masks", "crude_last_masks",
+        "silly_first_pools", "silly_last_pools", "crude_first_pools", "crude_last_pools",
+        "silly_first_patterns", "silly_last_patterns", "crude_first_patterns", "crude_last_patterns",
+        "_unique_capacity", "_silly_last_mask", "silly_pair_table",
+        "innuendo_first_pool", "innuendo_last_pool",
+        "_silly_first_flat", "_silly_last_flat", "_crude_first_flat", "_crude_last_flat", "_silly_first_to_last",
+    )
+    
     def __init__(self):
         """Initialize the funny name generator."""
         super().__init__()
@@ -85,225 +282,473 @@ class FunnyNameGenerator(BaseNameGenerator):
         
         self.load_data()
         
-        # Index names by patterns for faster lookup
-        self.silly_first_names = self._index_names_by_patterns(self.weighted_first_names, self.silly_sound_patterns)
-        self.silly_last_names = self._index_names_by_patterns(self.weighted_last_names, self.silly_sound_patterns)
-        self.crude_first_names = self._index_names_by_patterns(self.weighted_first_names, self.crude_patterns)
-        self.crude_last_names = self._index_names_by_patterns(self.weighted_last_names, self.crude_patterns)
+        with startup_profiler.phase("index_build"):
+            # Compile each pattern dictionary into a single multi-pattern matcher
+            self.silly_matcher = MultiPatternMatcher(self.silly_sound_patterns)
+            self.crude_matcher = MultiPatternMatcher(self.crude_patterns)
+            
+            # Build every candidate pool once, up front, or map them from the last run's snapshot
+            self._load_candidate_pools()
     
     def load_data(self):
-        """Load name data from census files."""
+        """Load name data from census files, in JSON or CSV format, through the shared dataset registry."""
         census_dir = "census_data/final"
         
         # Load first names
-        first_names_file = os.path.join(census_dir, "census_firstnames_combined.json")
-        first_names_data = load_json_data(first_names_file)
-        if first_names_data:
-            self.first_names = [(item["firstname"], item["frequency"]) 
-                               for item in first_names_data]
-            self.weighted_first_names = create_weighted_list(self.first_names)
+        first_name_table = dataset_registry.name_table(os.path.join(census_dir, "census_firstnames_combined"), "firstname")
+        if first_name_table:
+            self.first_names = first_name_table.pairs
+            self.first_name_sampler = AliasSampler.from_table(first_name_table)
         
         # Load last names
-        last_names_file = os.path.join(census_dir, "census_surnames.json")
-        last_names_data = load_json_data(last_names_file)
-        if last_names_data:
-            self.last_names = [(item["surname"], item["frequency"]) 
-                              for item in last_names_data]
-            self.weighted_last_names = create_weighted_list(self.last_names)
+        last_name_table = dataset_registry.name_table(os.path.join(census_dir, "census_surnames"), "surname")
+        if last_name_table:
+            self.last_names = last_name_table.pairs
+            self.last_name_sampler = AliasSampler.from_table(last_name_table)
         
         print(f"Loaded {len(self.first_names)} first names")
         print(f"Loaded {len(self.last_names)} last names")
     
-    def _index_names_by_patterns(self, names: List[str], patterns: Dict[str, str]) -> Dict[str, Set[str]]:
+    def _load_candidate_pools(self):
+        """
+        Restore the candidate pools from a warm-start snapshot, building and
+        saving them when the snapshot is missing or stale.
+        """
+        first_names = self.first_name_sampler.items
+        last_names = self.last_name_sampler.items
+        key = None
+        if first_names and last_names:
+            key = snapshot_key(dataset_registry.table_digest(first_names), dataset_registry.table_digest(last_names),
+                               self.silly_sound_patterns, self.crude_patterns,
+                               self.innuendo_first_names, self.innuendo_last_names,
+                               file_digest(__file__), file_digest(pattern_matcher.__file__))
+        shared = {"first_names": first_names, "last_names": last_names}
+        restore_or_build(self, "funny", key, self.SNAPSHOT_ATTRIBUTES, self._build_candidate_pools, shared)
+    
+    def _build_candidate_pools(self):
+        """
+        Build the candidate pools for every kind of funny name.
+        
+        Pools are compact arrays of indices into the first and last name
+        samplers, with one entry per distinct name, so generating a funny
+        name is a couple of O(1) draws.
+        """
+        first_names = self.first_name_sampler.items
+        last_names = self.last_name_sampler.items
+        
+        # Index names by patterns for faster lookup
+        self.silly_first_masks = array('q', self.silly_matcher.match_masks(first_names))
+        self.silly_last_masks = array('q', self.silly_matcher.match_masks(last_names))
+        self.crude_first_masks = array('q', self.crude_matcher.match_masks(first_names))
+        self.crude_last_masks = array('q', self.crude_matcher.match_masks(last_names))
+        self.silly_first_pools = self._index_names_by_patterns(first_names, self.silly_first_masks, self.silly_matcher)
+        self.silly_last_pools = self._index_names_by_patterns(last_names, self.silly_last_masks, self.silly_matcher)
+        self.crude_first_pools = self._index_names_by_patterns(first_names, self.crude_first_masks, self.crude_matcher)
+        self.crude_last_pools = self._index_names_by_patterns(last_names, self.crude_last_masks, self.crude_matcher)
+        
+        # Patterns that have at least one candidate, so a pattern can be picked in one draw
+        self.silly_first_patterns = tuple(p for p, pool in self.silly_first_pools.items() if pool)
+        self.silly_last_patterns = tuple(p for p, pool in self.silly_last_pools.items() if pool)
+        self.crude_first_patterns = tuple(p for p, pool in self.crude_first_pools.items() if pool)
+        self.crude_last_patterns = tuple(p for p, pool in self.crude_last_pools.items() if pool)
+        
+        # Computed on first use by unique_name_capacity()
+        self._unique_capacity = None
+        
+        # Matched-pair table: for each first name pattern mask, the patterns
+        # that some last name shares with it
+        self._silly_last_mask = 0
+        for pattern in self.silly_last_patterns:
+            self._silly_last_mask |= self.silly_matcher.bits[pattern]
+        self.silly_pair_table = {}
+        for pattern in self.silly_first_patterns:
+            for index in self.silly_first_pools[pattern]:
+                self._silly_matching_patterns(self.silly_first_masks[index])
+        
+        # Innuendo names that actually exist in our data
+        self.innuendo_first_pool = self._pool_for_names(first_names, self.innuendo_first_names)
+        self.innuendo_last_pool = self._pool_for_names(last_names, self.innuendo_last_names)
+        
+        # Flattened copies of the pools for vectorized batch draws
+        self._silly_first_flat = _flatten_pools(self.silly_first_pools, self.silly_first_patterns)
+        self._silly_last_flat = _flatten_pools(self.silly_last_pools, self.silly_last_patterns)
+        self._crude_first_flat = _flatten_pools(self.crude_first_pools, self.crude_first_patterns)
+        self._crude_last_flat = _flatten_pools(self.crude_last_pools, self.crude_last_patterns)
+        # Position of each first name pattern among the last name patterns, -1 if it has none
+        self._silly_first_to_last = np.array(
+            [self.silly_last_patterns.index(p) if p in self.silly_last_patterns else -1
+             for p in self.silly_first_patterns], dtype=np.int64
+        )
+    
+    def _index_names_by_patterns(self, names: List[str], masks: List[int], matcher: MultiPatternMatcher) -> Dict[str, Sequence[int]]:
         """
         Index names by sound patterns for faster lookup.
         
         Args:
             names: List of names to index
-            patterns: Dictionary of pattern name to regex pattern
+            masks: Bitmask of matched patterns for each name
+            matcher: Matcher that produced the masks
             
         Returns:
-            Dictionary of pattern -> set of names matching that pattern
+            Dictionary of pattern -> indices of the distinct names matching that pattern
         """
-        result = {pattern: set() for pattern in patterns}
+        result = {pattern: [] for pattern in matcher.pattern_names}
+        seen = set()
         
-        for name in names:
-            for pattern_name, pattern in patterns.items():
-                if re.search(pattern, name, re.IGNORECASE):
-                    result[pattern_name].add(name)
+        for index, (name, mask) in enumerate(zip(names, masks)):
+            if mask and name not in seen:
+                seen.add(name)
+                for pattern_name in matcher.matched_names(mask):
+                    result[pattern_name].append(index)
         
-        return result
+        return {pattern: array('q', indices) for pattern, indices in result.items()}
     
-    def generate_silly_sound_name(self) -> str:
+    @staticmethod
+    def _pool_for_names(names: List[str], wanted: Set[str]) -> Sequence[int]:
         """
-        Generate a name with silly sounds.
+        Get the indices of the distinct names that are in a wanted set.
+        """
+        pool = {}
+        for index, name in enumerate(names):
+            if name in wanted:
+                pool.setdefault(name, index)
+        return array('q', pool.values())
+    
+    def _silly_matching_patterns(self, mask: int) -> Tuple[str, ...]:
+        """
+        Look up the silly patterns a first name shares with some last name.
         
+        Args:
+            mask: Silly pattern bitmask of the first name
+            
         Returns:
-            A funny name with silly sound patterns
+            Patterns that have last name candidates and match the first name
+        """
+        patterns = self.silly_pair_table.get(mask)
+        if patterns is None:
+            patterns = tuple(self.silly_matcher.matched_names(mask & self._silly_last_mask))
+            self.silly_pair_table[mask] = patterns
+        return patterns
+    
+    def _pick_silly_sound_pair(self, rng=random) -> Tuple[int, int]:
         """
-        # Try to find a matching first name with a silly pattern
-        pattern_keys = list(self.silly_sound_patterns.keys())
-        random.shuffle(pattern_keys)
+        Pick the first and last name indices for a silly sound name.
+        """
+        # Find a first name with a silly sound
+        if self.silly_first_patterns:
+            pattern = rng.choice(self.silly_first_patterns)
+            first_index = rng.choice(self.silly_first_pools[pattern])
+        else:
+            # If no match found, use a random first name
+            pattern = None
+            first_index = self.first_name_sampler.sample_index(rng)
         
-        first_name = None
-        last_name = None
+        # Try to find a last name with the same or similar pattern
+        if pattern is not None and self.silly_last_pools[pattern]:
+            matching_pattern = pattern
+        else:
+            matching_patterns = self._silly_matching_patterns(self.silly_first_masks[first_index])
+            if matching_patterns:
+                matching_pattern = rng.choice(matching_patterns)
+            elif self.silly_last_patterns:
+                # Otherwise, just pick a random silly last name
+                matching_pattern = rng.choice(self.silly_last_patterns)
+            else:
+                matching_pattern = None
         
-        # Find a first name with a silly sound
-        for pattern in pattern_keys:
-            if self.silly_first_names[pattern]:
-                candidates = list(self.silly_first_names[pattern])
-                if candidates:
-                    first_name = random.choice(candidates)
-                    break
+        if matching_pattern is not None:
+            last_index = rng.choice(self.silly_last_pools[matching_pattern])
+        else:
+            # Fallback to a random last name if needed
+            last_index = self.last_name_sampler.sample_index(rng)
         
-        # If no match found, use a random first name
-        if not first_name:
-            first_name = random.choice(self.weighted_first_names)
+        return first_index, last_index
+    
+    def _pick_crude_pair(self, rng=random) -> Tuple[int, int]:
+        """
+        Pick the first and last name indices for a crude name.
+        """
+        # First try to find a combination of known innuendo names
+        if self.innuendo_first_pool and self.innuendo_last_pool:
+            return rng.choice(self.innuendo_first_pool), rng.choice(self.innuendo_last_pool)
         
-        # Try to find a last name with the same or similar pattern
-        matching_pattern = None
-        for pattern in pattern_keys:
-            if re.search(self.silly_sound_patterns[pattern], first_name, re.IGNORECASE) and self.silly_last_names[pattern]:
-                matching_pattern = pattern
-                break
+        # Otherwise use names from our crude patterns
+        if self.crude_first_patterns:
+            first_index = rng.choice(self.crude_first_pools[rng.choice(self.crude_first_patterns)])
+        else:
+            first_index = self.first_name_sampler.sample_index(rng)
         
-        # If a matching pattern is found, use it to choose a last name
-        if matching_pattern and self.silly_last_names[matching_pattern]:
-            last_name = random.choice(list(self.silly_last_names[matching_pattern]))
+        if self.crude_last_patterns:
+            last_index = rng.choice(self.crude_last_pools[rng.choice(self.crude_last_patterns)])
         else:
-            # Otherwise, just pick a random silly last name
-            for pattern in pattern_keys:
-                if self.silly_last_names[pattern]:
-                    last_name = random.choice(list(self.silly_last_names[pattern]))
-                    break
+            last_index = self.last_name_sampler.sample_index(rng)
         
-        # Fallback to a random last name if needed
-        if not last_name:
-            last_name = random.choice(self.weighted_last_names)
+        return first_index, last_index
+    
+    def _format_pair(self, first_index: int, last_index: int) -> str:
+        """
+        Format a pair of name indices as a full name.
+        """
+        return self.format_full_name(self.first_name_sampler.items[first_index],
+                                     self.last_name_sampler.items[last_index])
+    
+    def generate_silly_sound_name(self, rng=None) -> str:
+        """
+        Generate a name with silly sounds.
         
-        return self.format_full_name(first_name, last_name)
+        Args:
+            rng: random.Random or seed, the global random stream by default
+            
+        Returns:
+            A funny name with silly sound patterns
+        """
+        if not self.first_name_sampler or not self.last_name_sampler:
+            return "No data available"
+        return self._format_pair(*self._pick_silly_sound_pair(get_random(rng)))
     
-    def generate_crude_name(self) -> str:
+    def generate_crude_name(self, rng=None) -> str:
         """
         Generate a crude/bathroom humor name.
         
+        Args:
+            rng: random.Random or seed, the global random stream by default
+            
         Returns:
             A funny name with crude/bathroom humor
         """
-        # First try to find a combination of known innuendo names
-        if self.innuendo_first_names & set(self.weighted_first_names) and self.innuendo_last_names & set(self.weighted_last_names):
-            first_options = list(self.innuendo_first_names & set(self.weighted_first_names))
-            last_options = list(self.innuendo_last_names & set(self.weighted_last_names))
-            
-            if first_options and last_options:
-                return self.format_full_name(random.choice(first_options), random.choice(last_options))
-        
-        # Otherwise try to find a first name from our crude patterns
-        pattern_keys = list(self.crude_patterns.keys())
-        random.shuffle(pattern_keys)
-        
-        first_name = None
-        last_name = None
+        if not self.first_name_sampler or not self.last_name_sampler:
+            return "No data available"
+        return self._format_pair(*self._pick_crude_pair(get_random(rng)))
+    
+    def generate_name(self, rng=None) -> str:
+        """
+        Generate a funny name, randomly choosing between silly sounds and crude humor.
         
-        # Find a first name with a crude pattern
-        for pattern in pattern_keys:
-            if self.crude_first_names[pattern]:
-                candidates = list(self.crude_first_names[pattern])
-                if candidates:
-                    first_name = random.choice(candidates)
-                    break
+        Args:
+            rng: random.Random or seed, the global random stream by default
+            
+        Returns:
+            A funny name using either silly sounds or crude humor
+        """
+        rng = get_random(rng)
+        # 50% chance for each type of humor
+        if rng.random() < 0.5:
+            return self.generate_silly_sound_name(rng)
+        else:
+            return self.generate_crude_name(rng)
+    
+    @timed_generation
+    def generate_batch(self, count: int = 10, rng=None, lazy: bool = False) -> Union[List[str], NameBatch]:
+        """
+        Generate many funny names at once by drawing index arrays with NumPy.
         
-        # If no match found, use a random first name
-        if not first_name:
-            first_name = random.choice(self.weighted_first_names)
+        Names may repeat within a batch; use generate_multiple when every
+        first and last name should be different.
         
-        # Try to find a last name with a crude pattern
-        for pattern in pattern_keys:
-            if self.crude_last_names[pattern]:
-                candidates = list(self.crude_last_names[pattern])
-                if candidates:
-                    last_name = random.choice(candidates)
-                    break
+        Args:
+            count: Number of names to generate
+            rng: NumPy Generator, random.Random or seed, a fresh Generator by default
+            lazy: Return a NameBatch that formats names on access
+            
+        Returns:
+            Generated funny names
+        """
+        if not self.first_name_sampler or not self.last_name_sampler:
+            return ["No data available"] * count
         
-        # Fallback to a random last name if needed
-        if not last_name:
-            last_name = random.choice(self.weighted_last_names)
+        rng = get_numpy_rng(rng)
+        first_idx = np.empty(count, dtype=np.int64)
+        last_idx = np.empty(count, dtype=np.int64)
         
-        return self.format_full_name(first_name, last_name)
+        # 50% chance for each type of humor
+        silly = rng.random(count) < 0.5
+        first_idx[silly], last_idx[silly] = self._batch_silly_sound_pairs(int(silly.sum()), rng)
+        first_idx[~silly], last_idx[~silly] = self._batch_crude_pairs(int((~silly).sum()), rng)
+        
+        batch = NameBatch(
+            self._formatted_column(self.first_name_sampler), self._formatted_column(self.last_name_sampler),
+            first_idx, last_idx
+        )
+        return batch if lazy else batch.tolist()
     
-    def generate_name(self) -> str:
+    def _batch_silly_sound_pairs(self, count: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Generate a funny name, randomly choosing between silly sounds and crude humor.
+        Pick first and last name indices for a batch of silly sound names.
+        """
+        if self.silly_first_patterns:
+            patterns = rng.integers(len(self.silly_first_patterns), size=count)
+            first_idx = _draw_from_pools(self._silly_first_flat, patterns, rng)
+            last_patterns = self._silly_first_to_last[patterns]
+        else:
+            first_idx = self.first_name_sampler.sample_indices(count, rng)
+            last_patterns = np.full(count, -1, dtype=np.int64)
+        
+        if not self.silly_last_patterns:
+            return first_idx, self.last_name_sampler.sample_indices(count, rng)
+        
+        # First names whose pattern has no last names fall back to another pattern they match
+        for k in np.flatnonzero(last_patterns < 0):
+            matching_patterns = self._silly_matching_patterns(self.silly_first_masks[first_idx[k]])
+            if matching_patterns:
+                pattern = matching_patterns[rng.integers(len(matching_patterns))]
+                last_patterns[k] = self.silly_last_patterns.index(pattern)
+            else:
+                last_patterns[k] = rng.integers(len(self.silly_last_patterns))
         
-        Returns:
-            A funny name using either silly sounds or crude humor
+        return first_idx, _draw_from_pools(self._silly_last_flat, last_patterns, rng)
+    
+    def _batch_crude_pairs(self, count: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
         """
-        # 50% chance for each type of humor
-        if random.random() < 0.5:
-            return self.generate_silly_sound_name()
+        Pick first and last name indices for a batch of crude names.
+        """
+        if self.innuendo_first_pool and self.innuendo_last_pool:
+            first_pool = np.asarray(self.innuendo_first_pool, dtype=np.int64)
+            last_pool = np.asarray(self.innuendo_last_pool, dtype=np.int64)
+            return (first_pool[rng.integers(len(first_pool), size=count)],
+                    last_pool[rng.integers(len(last_pool), size=count)])
+        
+        if self.crude_first_patterns:
+            patterns = rng.integers(len(self.crude_first_patterns), size=count)
+            first_idx = _draw_from_pools(self._crude_first_flat, patterns, rng)
         else:
-            return self.generate_crude_name()
+            first_idx = self.first_name_sampler.sample_indices(count, rng)
+        
+        if self.crude_last_patterns:
+            patterns = rng.integers(len(self.crude_last_patterns), size=count)
+            last_idx = _draw_from_pools(self._crude_last_flat, patterns, rng)
+        else:
+            last_idx = self.last_name_sampler.sample_indices(count, rng)
+        
+        return first_idx, last_idx
     
-    def generate_multiple(self, count: int = 10) -> List[str]:
+    @timed_generation
+    def generate_multiple(self, count: int = 10, rng=None) -> List[str]:
         """
-        Generate multiple funny names.
+        Generate multiple funny names, with no first or last name used twice.
         
         Args:
             count: Number of names to generate
+            rng: random.Random or seed, the global random stream by default
             
         Returns:
             List of funny names
         """
-        # Track used names to prevent duplicates
-        used_first_names = set()
-        used_last_names = set()
-        results = []
+        names, _ = self.generate_multiple_with_report(count, rng)
+        return names
+    
+    def generate_multiple_with_report(self, count: int = 10, rng=None) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Generate multiple funny names and report how many of them are unique.
         
-        max_attempts = count * 10  # Prevent infinite loops if not enough variety
-        attempts = 0
+        Names are picked as (first, last) index pairs drawn without
+        replacement from the candidate pools, so no first or last name is
+        used twice and no retries are needed. Strings are only formatted at
+        the end. If the pools run dry, the rest of the batch is filled with
+        regular funny names that may repeat.
         
-        while len(results) < count and attempts < max_attempts:
-            name = self.generate_name()
-            # Split the name to check first and last parts
-            parts = name.split()
+        Args:
+            count: Number of names to generate
+            rng: random.Random or seed, the global random stream by default
             
-            # Handle names with nicknames (which have format "First 'Nickname' Last")
-            if '"' in name:
-                # Extract just the first and last name from the format
-                name_parts = name.split('"')
-                if len(name_parts) >= 3:
-                    first_name = name_parts[0].strip()
-                    last_name = name_parts[2].strip()
-                else:
-                    # Skip malformed names
-                    attempts += 1
-                    continue
-            elif len(parts) >= 2:  # Regular names with at least first and last
-                first_name = parts[0]
-                last_name = parts[-1]  # Last part is the surname
+        Returns:
+            The names, and a report with the requested, unique and duplicate
+            counts plus the pools' capacity, an upper bound on the unique count
+        """
+        if not self.first_name_sampler or not self.last_name_sampler:
+            return ["No data available"] * count, {"requested": count, "unique": 0, "duplicates": count, "capacity": 0}
+        
+        rng = get_random(rng)
+        draw = _UniquePairDraw(self, rng)
+        pairs = []
+        while len(pairs) < count:
+            # 50% chance for each type of humor, falling back to the other when one runs dry
+            if rng.random() < 0.5:
+                pair = draw.silly_sound_pair() or draw.crude_pair()
             else:
-                # Skip malformed names
-                attempts += 1
-                continue
-                
-            # Check if either first or last name has been used
-            if first_name in used_first_names or last_name in used_last_names:
-                attempts += 1
-                continue
-            
-            # Add the name to results and track used names
-            results.append(name)
-            used_first_names.add(first_name)
-            used_last_names.add(last_name)
-            attempts += 1
+                pair = draw.crude_pair() or draw.silly_sound_pair()
+            if pair is None:
+                break
+            pairs.append(pair)
+        
+        results = [self._format_pair(first_index, last_index) for first_index, last_index in pairs]
         
         # If we couldn't generate enough unique names, fill the remaining with regular names
-        if len(results) < count:
-            remaining = count - len(results)
+        remaining = count - len(results)
+        if remaining:
             print(f"Warning: Could only generate {len(results)} unique funny names. Adding {remaining} non-unique names.")
-            results.extend([self.generate_name() for _ in range(remaining)])
-            
-        return results
+            FALLBACK_BATCHES.inc()
+            FALLBACK_NAMES.inc(remaining)
+            results.extend([self.generate_name(rng) for _ in range(remaining)])
+        
+        report = {
+            "requested": count,
+            "unique": len(pairs),
+            "duplicates": remaining,
+            "capacity": self.unique_name_capacity()
+        }
+        return results, report
+    
+    def unique_name_capacity(self) -> int:
+        """
+        Calculate how many funny names with no repeated first or last name the pools can supply.
+        
+        Silly names can pair any silly first name with any silly last name,
+        and crude names do the same within the innuendo (or crude pattern)
+        pools. The capacity is the maximum matching across those two blocks,
+        which by Konig's theorem is the smallest vertex cover: one side of
+        each block.
+        
+        It is an upper bound on what generate_multiple() supplies: the batch
+        is drawn at random rather than as a maximum matching, so a name that
+        is in both blocks can be used up by the one where it was needed less.
+        
+        Returns:
+            The most unique funny names one batch can have
+        """
+        if self._unique_capacity is not None:
+            return self._unique_capacity
+        
+        blocks = []
+        for first_pool, last_pool in (self._silly_candidates(), self._crude_candidates()):
+            if first_pool and last_pool:
+                blocks.append((first_pool, last_pool))
+        
+        if not blocks:
+            capacity = 0
+        elif len(blocks) == 1:
+            capacity = min(len(blocks[0][0]), len(blocks[0][1]))
+        else:
+            (first_a, last_a), (first_b, last_b) = blocks
+            capacity = min(
+                len(first_a | first_b),
+                len(first_a) + len(last_b),
+                len(last_a) + len(first_b),
+                len(last_a | last_b)
+            )
+        
+        self._unique_capacity = capacity
+        return capacity
+    
+    def _silly_candidates(self) -> Tuple[Set[str], Set[str]]:
+        """
+        Get every distinct first and last name a silly sound name can use.
+        """
+        first_names = self.first_name_sampler.items
+        last_names = self.last_name_sampler.items
+        return ({first_names[i] for p in self.silly_first_patterns for i in self.silly_first_pools[p]},
+                {last_names[i] for p in self.silly_last_patterns for i in self.silly_last_pools[p]})
+    
+    def _crude_candidates(self) -> Tuple[Set[str], Set[str]]:
+        """
+        Get every distinct first and last name a crude name can use.
+        """
+        first_names = self.first_name_sampler.items
+        last_names = self.last_name_sampler.items
+        if self.innuendo_first_pool and self.innuendo_last_pool:
+            return ({first_names[i] for i in self.innuendo_first_pool},
+                    {last_names[i] for i in self.innuendo_last_pool})
+        return ({first_names[i] for p in self.crude_first_patterns for i in self.crude_first_pools[p]},
+                {last_names[i] for p in self.crude_last_patterns for i in self.crude_last_pools[p]})
     
     def calculate_possible_combinations(self) -> dict:
         """
@@ -313,31 +758,32 @@ class FunnyNameGenerator(BaseNameGenerator):
             Dictionary with statistics about possible name combinations
         """
         # Count names that match our patterns
-        silly_first_count = sum(len(names) for names in self.silly_first_names.values())
-        silly_last_count = sum(len(names) for names in self.silly_last_names.values())
-        crude_first_count = sum(len(names) for names in self.crude_first_names.values())
-        crude_last_count = sum(len(names) for names in self.crude_last_names.values())
+        silly_first_count = sum(len(names) for names in self.silly_first_pools.values())
+        silly_last_count = sum(len(names) for names in self.silly_last_pools.values())
+        crude_first_count = sum(len(names) for names in self.crude_first_pools.values())
+        crude_last_count = sum(len(names) for names in self.crude_last_pools.values())
         
         # Adjust for duplicates (names appearing in multiple pattern categories)
+        # Pools hold name indices, and each distinct name has a single index
         unique_silly_first = set()
-        for names in self.silly_first_names.values():
+        for names in self.silly_first_pools.values():
             unique_silly_first.update(names)
             
         unique_silly_last = set()
-        for names in self.silly_last_names.values():
+        for names in self.silly_last_pools.values():
             unique_silly_last.update(names)
             
         unique_crude_first = set()
-        for names in self.crude_first_names.values():
+        for names in self.crude_first_pools.values():
             unique_crude_first.update(names)
             
         unique_crude_last = set()
-        for names in self.crude_last_names.values():
+        for names in self.crude_last_pools.values():
             unique_crude_last.update(names)
         
         # Count innuendo names that actually exist in our data
-        innuendo_first_available = self.innuendo_first_names & set(self.weighted_first_names)
-        innuendo_last_available = self.innuendo_last_names & set(self.weighted_last_names)
+        innuendo_first_available = self.innuendo_first_pool
+        innuendo_last_available = self.innuendo_last_pool
         
         # Calculate total possible combinations
         silly_sound_combinations = len(unique_silly_first) * len(unique_silly_last)
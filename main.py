@@ -2,14 +2,17 @@
 Main entry point for the name generator application.
 """
 
+import sys
 from generators.baseball_generator import BaseballNameGenerator
 from generators.census_generator import CensusNameGenerator
+from utils.startup_profiler import startup_profiler, report_path
 
 def demonstrate_baseball_generator():
     """Demonstrate the baseball name generator."""
     print("\n=== Baseball Name Generator ===\n")
     
-    generator = BaseballNameGenerator()
+    with startup_profiler.phase("baseball"):
+        generator = BaseballNameGenerator()
     
     # Generate some random names
     print("Random Generated Names:")
@@ -34,7 +37,8 @@ def demonstrate_census_generator():
     """Demonstrate the census name generator."""
     print("\n=== Census Name Generator ===\n")
     
-    generator = CensusNameGenerator()
+    with startup_profiler.phase("census"):
+        generator = CensusNameGenerator()
     
     # Generate some random names
     print("Random Generated Names:")
@@ -56,8 +60,18 @@ def main():
     print("Welcome to the Name Generator!")
     print("This program demonstrates different styles of name generation.\n")
     
+    # --profile-startup [report.json] or PROFILE_STARTUP records how long each generator takes to load
+    profile_path = report_path(sys.argv[1:])
+    if profile_path:
+        startup_profiler.enable()
+    
     demonstrate_baseball_generator()
     demonstrate_census_generator()
+    
+    if profile_path:
+        startup_profiler.write(profile_path)
+        startup_profiler.disable()
+        print(f"\nStartup profile written to {profile_path}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Test script for cost-based admission control in utils/admission.py
+"""
+import threading
+import time
+from utils.admission import AdmissionController, AdmissionRejected, CostModel
+
+def test_cost_model():
+    """
+    Check estimates, budget counts and calibration against a runner with a known cost
+    """
+    model = CostModel({"census": (0.001, 1e-5), "unique_census": (0.0, 1e-4)})
+    assert abs(model.estimate("census", 1000) - 0.011) < 1e-9
+    assert model.max_count("unique_census", 1.0) == 10000
+    # Unknown types cost as much as the most expensive known one
+    assert model.estimate("mystery", 1000) == model.estimate("unique_census", 1000)
+
+    def run(count):
+        time.sleep(0.002 + count * 2e-6)
+
+    measured = model.calibrate({"census": run}, count=100, repeat=1)
+    overhead, per_name = measured["census"]
+    print(f"\nCalibrated: {overhead * 1e3:.2f}ms + {per_name * 1e6:.2f}us/name")
+    assert model.calibrated and 1e-6 < per_name < 4e-6
+
+    # Runs are scaled down to a runner's limit, and skipped when they can't fit
+    counts = []
+    measured = model.calibrate({"funny": counts.append, "tiny": counts.append}, count=100, repeat=1,
+                               limits={"funny": 469, "tiny": 5})
+    assert max(counts) <= 469 and "funny" in measured and "tiny" not in measured
+
+def test_admission():
+    """
+    Check the budget, the expensive-work cap and that cheap requests always get in
+    """
+    model = CostModel({"census": (0.0, 1e-5)})
+    controller = AdmissionController(model, budget_seconds=1.0, expensive_seconds=0.1, max_expensive=1)
+
+    try:
+        controller.admit("census", 200000)
+        assert False, "Requests over the budget should be rejected"
+    except AdmissionRejected as e:
+        assert e.status == 413 and e.details["max_count"] == model.max_count("census", 1.0)
+        assert model.estimate("census", e.details["max_count"]) <= 1.0 < model.estimate("census", e.details["max_count"] + 1)
+
+    with controller.admit("census", 50000):
+        try:
+            controller.admit("census", 50000)
+            assert False, "A second expensive request should be turned away"
+        except AdmissionRejected as e:
+            assert e.status == 429 and e.retry_after >= 1
+        with controller.admit("census", 100):
+            pass
+
+    # Streams skip the budget but still take the slot, which is free again
+    admission = controller.admit("census", 10 ** 7, enforce_budget=False)
+    admission.release()
+    admission.release()
+    controller.admit("census", 50000).release()
+    assert controller.status()["rejected"] == {"over_budget": 1, "busy": 1}
+
+    # Rejections from several threads at once are all counted
+    def reject():
+        for _ in range(5000):
+            try:
+                controller.admit("census", 200000)
+            except AdmissionRejected:
+                pass
+
+    threads = [threading.Thread(target=reject) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert controller.status()["rejected"]["over_budget"] == 20001
+
+if __name__ == "__main__":
+    test_cost_model()
+    test_admission()
@@ -0,0 +1,90 @@
+"""
+Test script for the ASGI entry point in asgi.py
+"""
+import asyncio
+import json
+import os
+import threading
+os.environ.setdefault("GENERATOR_WARMUP", "off")
+import asgi
+
+async def call(method, path, body=b""):
+    """
+    Send one request through the ASGI app and collect the response.
+    """
+    messages = [{"type": "http.request", "body": body[:5], "more_body": True},
+                {"type": "http.request", "body": body[5:], "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": []}
+    await asgi.app(scope, receive, send)
+    headers = dict(sent[0]["headers"])
+    return sent[0]["status"], headers, b"".join(m.get("body", b"") for m in sent[1:])
+
+def test_generate_contract():
+    """
+    Check that /generate answers like the Flask app, inline and on the executor
+    """
+    async def run():
+        status, _, body = await call("POST", "/generate", json.dumps({"type": "census", "count": 5, "seed": 1}).encode())
+        names = json.loads(body)["names"]
+        print(f"\nASGI names: {names}")
+        assert status == 200 and len(names) == 5
+
+        # Large enough to go to the executor; the same seed gives the same names
+        payload = json.dumps({"type": "census", "count": 2000, "seed": 1}).encode()
+        responses = await asyncio.gather(*(call("POST", "/generate", payload) for _ in range(3)))
+        assert all(status == 200 for status, _, _ in responses)
+        assert len({body for _, _, body in responses}) == 1
+
+        status, _, body = await call("POST", "/generate", b'{"type": "funny", "gender": "female"}')
+        assert status == 400 and not json.loads(body)["success"]
+
+        status, _, body = await call("POST", "/generate", b'{"type": "census", "count": 100000000}')
+        assert status == 413 and "max_count" in json.loads(body)
+
+        status, headers, _ = await call("GET", "/generate")
+        assert status == 405 and headers[b"allow"] == b"POST"
+
+        status, headers, body = await call("GET", "/")
+        assert status == 200 and headers[b"content-type"].startswith(b"text/html") and b"generateNames" in body
+
+    try:
+        asyncio.run(run())
+    finally:
+        asgi.shutdown_executor()
+
+def test_unbuilt_generator_off_the_loop():
+    """
+    Check that cheap jobs only run on the event loop once their generator is built
+    """
+    from utils.generator_registry import GeneratorRegistry
+    registry = GeneratorRegistry({"census": object})
+    original, asgi.generators = asgi.generators, registry
+
+    def job():
+        registry.get("census")
+        return threading.current_thread()
+
+    async def run():
+        first = await asgi.run_generation(0.0, "census", job)
+        second = await asgi.run_generation(0.0, "census", job)
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        asgi.generators = original
+        asgi.shutdown_executor()
+    assert first is not threading.main_thread()
+    assert second is threading.main_thread()
+
+if __name__ == "__main__":
+    test_generate_contract()
+    test_unbuilt_generator_off_the_loop()
@@ -0,0 +1,82 @@
+"""
+Test script for the baseball name ETL in utils/baseball_etl.py
+"""
+import json
+import os
+import tempfile
+import time
+from utils.baseball_etl import clean_name, clean_nickname, split_nicknames, run_etl, load_count_tables
+from utils.data_loader import iter_json_array
+
+PLAYERS = [
+    {"first_name": "John", "last_name": "Williams)", "nickname": "Kid or Red"},
+    {"first_name": "John", "last_name": "García", "nickname": "None"},
+    {"first_name": "Bill", "last_name": "@JuanSoto25_)", "nickname": "The Bruggy Boys (with Moe Berg)"},
+    {"first_name": "X", "last_name": "", "nickname": "Red"},
+]
+
+def test_name_rules():
+    """
+    Check the unified name rules on the names that used to be handled differently
+    """
+    assert clean_name("@JuanSoto25_)") == ""
+    assert clean_name("Williams)") == "Williams"
+    assert clean_name(" Jesús ") == "Jesús"
+    assert clean_name("The Bruggy Boys (with Moe Berg)") == "The Bruggy Boys (with Moe Berg)"
+    assert clean_name("Old Aches & Pains") == "Old Aches & Pains"
+    assert clean_name("J") == "" and clean_name(None) == ""
+    assert clean_nickname("None") == "" and clean_nickname("none ") == ""
+    assert split_nicknames(clean_nickname("Kid or Red OR Rube")) == ["Kid", "Red", "Rube"]
+
+def test_etl_outputs_and_loading():
+    """
+    Check that the count tables match an in-memory count, and are only used while current
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        player_file = os.path.join(tmp, "players.json")
+        cleaned_file = os.path.join(tmp, "cleaned.json")
+        count_files = tuple(os.path.join(tmp, f"{kind}_counts.csv") for kind in ("first", "last", "nickname"))
+        with open(player_file, "w") as f:
+            json.dump(PLAYERS, f, indent=2)
+
+        # Streaming matches json.load
+        assert list(iter_json_array(player_file, chunk_size=16)) == PLAYERS
+
+        # Counting in memory before the ETL has run
+        counted = load_count_tables(player_file, count_files)
+
+        stats = run_etl(player_file, cleaned_file, count_files)
+        print(f"\nETL stats: {stats}")
+        assert stats["players"] == 4 and stats["dropped_players"] == 1
+
+        with open(cleaned_file) as f:
+            cleaned = json.load(f)
+        assert [player["last_name"] for player in cleaned] == ["Williams", "García", ""]
+        assert cleaned[1]["nickname"] == ""
+
+        loaded = load_count_tables(player_file, count_files)
+        for table, expected in zip(loaded, counted):
+            assert list(table.pairs) == list(expected.pairs)
+        first_names, last_names, nicknames = loaded
+        assert list(first_names.pairs) == [("John", 2), ("Bill", 1)]
+        assert ("Williams", 1) in list(last_names.pairs)
+        assert list(nicknames.pairs) == [("Kid", 1), ("Red", 1), ("The Bruggy Boys (with Moe Berg)", 1)]
+
+        # Freshness goes by content: a player file that only looks newer, as in a fresh clone, keeps the tables
+        later = time.time() + 10
+        os.utime(player_file, (later, later))
+        with open(count_files[0], "a") as f:
+            f.write("Marker,100\n")
+        first_names, _, _ = load_count_tables(player_file, count_files)
+        assert ("Marker", 100) in list(first_names.pairs)
+
+        # A changed player file makes the count tables stale, whatever their modification times
+        with open(player_file, "w") as f:
+            json.dump(PLAYERS[:1], f)
+        os.utime(player_file, (0, 0))
+        first_names, _, _ = load_count_tables(player_file, count_files)
+        assert list(first_names.pairs) == [("John", 1)]
+
+if __name__ == "__main__":
+    test_name_rules()
+    test_etl_outputs_and_loading()
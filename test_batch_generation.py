@@ -0,0 +1,84 @@
+"""
+Test script for the vectorized generate_batch API
+"""
+import random
+from collections import Counter
+from generators.baseball_generator import BaseballNameGenerator
+from utils.samplers import AliasSampler
+
+def test_sample_indices_distribution():
+    """
+    Check that vectorized draws follow the same weights as single draws
+    """
+    sampler = AliasSampler(["A", "B", "C"], [0.5, 0.3, 0.2])
+    indices = sampler.sample_indices(200000, rng=1)
+    counts = Counter(indices.tolist())
+
+    for i, expected in enumerate([0.5, 0.3, 0.2]):
+        observed = counts[i] / len(indices)
+        print(f"{sampler.items[i]}: expected {expected:.3f}, observed {observed:.3f}")
+        assert abs(observed - expected) < 0.01
+
+def test_generate_batch():
+    """
+    Check batch size, seeding and the lazy batch against the eager one
+    """
+    generator = BaseballNameGenerator()
+
+    names = generator.generate_batch(1000, rng=123)
+    assert len(names) == 1000
+    assert all(isinstance(name, str) and name for name in names)
+
+    # The same seed replays the same batch, lazily or not
+    lazy_names = generator.generate_batch(1000, rng=123, lazy=True)
+    assert list(lazy_names) == names
+    assert lazy_names[10] == names[10]
+    assert lazy_names[5:15].tolist() == names[5:15]
+
+    with_nickname = sum(1 for name in names if '"' in name)
+    print(f"Names with nicknames: {with_nickname}/{len(names)}")
+    assert 0.6 < with_nickname / len(names) < 0.8
+
+    print("\nSample batch names:")
+    for i, name in enumerate(random.sample(names, 5), 1):
+        print(f"{i}. {name}")
+
+def test_formatted_columns_reused():
+    """
+    Check that the app's baseball generator formats its name columns once, not per batch
+    """
+    from baseball_name_generator import BaseballNameGenerator as AppBaseballNameGenerator
+    generator = AppBaseballNameGenerator()
+    first = generator.generate_batch(10, rng=1, lazy=True)
+    second = generator.generate_batch(10, rng=2, lazy=True)
+    assert first.first_names is second.first_names
+    assert first.last_names is second.last_names
+    assert first.nicknames is second.nicknames
+
+def test_nickname_reuse_threshold():
+    """
+    Check that nicknames are only reused once fewer than three occurrences are
+    left, counting each nickname as often as it occurs
+    """
+    from baseball_name_generator import BaseballNameGenerator as AppBaseballNameGenerator
+    from utils.name_table import NameTable
+    generator = AppBaseballNameGenerator()
+    # Two distinct nicknames but twenty occurrences, so a set of two never repeats one
+    generator._set_tables(NameTable.from_pairs([("John", 1)]), NameTable.from_pairs([("Smith", 1)]),
+                          NameTable.from_pairs([("Babe", 10), ("Kid", 10)]))
+    generator.nickname_frequency = 1.0
+    for seed in range(20):
+        names = generator.generate_multiple(2, rng=seed)
+        assert len(set(names)) == 2, f"Nicknames repeated with seed {seed}: {names}"
+
+    # With only two occurrences left from the start, nicknames are drawn with replacement
+    generator._set_tables(NameTable.from_pairs([("John", 1)]), NameTable.from_pairs([("Smith", 1)]),
+                          NameTable.from_pairs([("Babe", 1), ("Kid", 1)]))
+    generator.nickname_frequency = 1.0
+    assert any(len(set(generator.generate_multiple(2, rng=seed))) == 1 for seed in range(20))
+
+if __name__ == "__main__":
+    test_sample_indices_distribution()
+    test_generate_batch()
+    test_formatted_columns_reused()
+    test_nickname_reuse_threshold()
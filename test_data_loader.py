@@ -0,0 +1,94 @@
+"""
+Test script for loading census name files in utils/data_loader.py
+"""
+import json
+import os
+import tempfile
+from utils.data_loader import detect_format, find_data_file, load_name_columns
+from utils.dataset_registry import DatasetRegistry
+
+def test_load_name_columns_by_content():
+    """
+    Check that JSON and CSV files load to the same columns, whatever their extension says
+    """
+    rows = [("SMITH", 1.006), ("JOHNSON", 0.81), ("GARCÍA", 0.254)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "surnames.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("surname,frequency,rank\n")
+            for rank, (name, freq) in enumerate(rows, 1):
+                f.write(f"{name},{freq},{rank}\n")
+
+        # JSON content behind a misleading extension
+        json_path = os.path.join(tmp, "surnames_export.csv")
+        with open(json_path, "w", encoding="utf-8") as f:
+            f.write("\n  ")
+            json.dump([{"surname": name, "frequency": freq, "rank": 1} for name, freq in rows], f, indent=2)
+
+        assert detect_format(csv_path) == "csv"
+        assert detect_format(json_path) == "json"
+
+        for path in (csv_path, json_path):
+            names, weights = load_name_columns(path, "surname")
+            assert names == [name for name, _ in rows]
+            assert list(weights) == [freq for _, freq in rows]
+
+        names, weights = load_name_columns(os.path.join(tmp, "missing.csv"), "surname")
+        assert names == [] and len(weights) == 0
+
+def test_find_data_file():
+    """
+    Check that a missing JSON file falls back to the CSV file next to it
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "census_surnames.csv")
+        with open(csv_path, "w") as f:
+            f.write("surname,frequency\nSMITH,1.006\n")
+
+        assert find_data_file(os.path.join(tmp, "census_surnames.json")) == csv_path
+        assert find_data_file(os.path.join(tmp, "census_surnames")) == csv_path
+        assert find_data_file(os.path.join(tmp, "census_firstnames")) is None
+
+def test_dataset_registry_shares_tables():
+    """
+    Check that a file is parsed once, ranked, and reloaded only when its contents change
+    """
+    registry = DatasetRegistry()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "surnames.csv")
+        with open(path, "w") as f:
+            f.write("surname,frequency\nBROWN,0.621\nSMITH,1.006\nJONES,0.621\n")
+
+        table = registry.name_table(path, "surname")
+        assert registry.name_table(path, "surname") is table
+        assert registry.name_table(os.path.join(tmp, "surnames"), "surname") is table
+        assert list(table) == ["SMITH", "BROWN", "JONES"], "Most common first, ties in file order"
+
+        with open(path, "a") as f:
+            f.write("GARCIA,0.254\n")
+        updated = registry.name_table(path, "surname")
+        assert updated is not table and len(updated) == 4
+        assert len(registry) == 1
+
+def test_census_surnames_load():
+    """
+    Check that the shipped surname CSV now fills the census generators
+    """
+    from generators.census_generator import CensusNameGenerator
+    from generators.funny_generator import FunnyNameGenerator
+
+    generator = CensusNameGenerator()
+    print(f"\nLoaded {len(generator.last_names)} census surnames")
+    assert len(generator.last_names) > 0, "Surnames should load from census_surnames.csv"
+    assert generator.generate_name() != "No data available"
+
+    # Generators over the same files share one table
+    assert FunnyNameGenerator().last_name_sampler.items is generator.last_name_sampler.items
+
+if __name__ == "__main__":
+    test_load_name_columns_by_content()
+    test_find_data_file()
+    test_dataset_registry_shares_tables()
+    test_census_surnames_load()
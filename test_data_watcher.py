@@ -0,0 +1,110 @@
+"""
+Test script for hot reloading generators in utils/data_watcher.py
+"""
+import os
+import tempfile
+import time
+from utils.data_watcher import DataWatcher
+from utils.generator_registry import GeneratorRegistry
+
+def test_reload_swaps_generator():
+    """
+    Check that a reload swaps in a new generator, and keeps the old one if it fails
+    """
+    versions = iter(["v1", "v2", None])
+
+    def factory():
+        version = next(versions)
+        if version is None:
+            raise IOError("half-written data file")
+        return {"version": version}
+
+    registry = GeneratorRegistry({"census": factory})
+    assert registry.reload("census") is None, "Unbuilt generators are left to build on first use"
+
+    old = registry.get("census")
+    new = registry.reload("census")
+    assert old["version"] == "v1", "Holders of the old generator keep it"
+    assert new["version"] == "v2" and registry.get("census") is new
+
+    try:
+        registry.reload("census")
+        assert False, "The failed rebuild should raise"
+    except IOError:
+        pass
+    status = registry.status()["census"]
+    print(f"\nStatus after a failed reload: {status}")
+    assert registry.get("census") is new
+    assert status["reloads"] == 1 and "half-written" in status["reload_error"]
+
+def test_watcher_reloads_changed_file():
+    """
+    Check that writing a data file reloads only the generators built from it
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        surnames = os.path.join(tmp, "census_surnames.csv")
+        players = os.path.join(tmp, "players.json")
+        for path in (surnames, players):
+            with open(path, "w") as f:
+                f.write("surname,frequency\nSMITH,1.0\n")
+
+        def reader(path):
+            def factory():
+                with open(path) as f:
+                    return f.read()
+            return factory
+
+        registry = GeneratorRegistry({"census": reader(surnames), "baseball": reader(players)})
+        registry.warm_up(background=False)
+
+        reloaded = []
+        watcher = DataWatcher(registry, {"census": [os.path.join(tmp, "census_surnames")],
+                                         "baseball": [players]}, delay=0.05, on_reload=reloaded.append)
+        watcher.start()
+        try:
+            # Written to a temporary file and renamed into place
+            with open(surnames + ".tmp", "w") as f:
+                f.write("surname,frequency\nSMITH,1.0\nJONES,0.6\n")
+            os.replace(surnames + ".tmp", surnames)
+
+            deadline = time.time() + 5
+            while not reloaded and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+
+        assert "JONES" in registry.get("census"), "The census generator should have been reloaded"
+        assert registry.status()["baseball"]["reloads"] == 0
+        assert reloaded == ["census"], "on_reload runs once the new generator is in place"
+
+def test_baseball_count_files_reload():
+    """
+    Check that touching a baseball count table, which the generator is built from, reloads it
+    """
+    os.environ.setdefault("GENERATOR_WARMUP", "off")
+    from app import HOT_RELOAD_FILES
+    from baseball_name_generator import BaseballNameGenerator, COUNT_FILES
+
+    registry = GeneratorRegistry({"baseball": BaseballNameGenerator})
+    registry.warm_up(background=False)
+    reloaded = []
+    watcher = DataWatcher(registry, {"baseball": HOT_RELOAD_FILES["baseball"]}, delay=0.05,
+                          on_reload=reloaded.append)
+    stat = os.stat(COUNT_FILES[0])
+    watcher.start()
+    try:
+        os.utime(COUNT_FILES[0])
+        deadline = time.time() + 10
+        while not reloaded and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        watcher.stop()
+        os.utime(COUNT_FILES[0], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert reloaded == ["baseball"] and registry.status()["baseball"]["reloads"] == 1
+    assert len(registry.get("baseball").generate_multiple(5)) == 5
+
+if __name__ == "__main__":
+    test_reload_swaps_generator()
+    test_watcher_reloads_changed_file()
+    test_baseball_count_files_reload()
@@ -0,0 +1,66 @@
+"""
+Test script for the funny name generator's deduplicated batches
+"""
+import random
+from types import SimpleNamespace
+from generators.funny_generator import FunnyNameGenerator, _PoolCursor, _UniquePairDraw
+
+def test_unique_funny_batch():
+    """
+    Check that generate_multiple never reuses a first or last name while
+    the pools last, and that the report matches the batch
+    """
+    generator = FunnyNameGenerator()
+    capacity = generator.unique_name_capacity()
+    
+    for count in [10, capacity, capacity + 25]:
+        names, report = generator.generate_multiple_with_report(count)
+        
+        print(f"\n=== Funny batch of {count} ===")
+        print(report)
+        assert len(names) == count
+        assert report["unique"] + report["duplicates"] == count
+        assert report["unique"] <= report["capacity"]
+        
+        unique_part = names[:report["unique"]]
+        first_names = [name.split()[0] for name in unique_part]
+        last_names = [name.split()[-1] for name in unique_part]
+        assert len(set(first_names)) == len(first_names), "First names should not repeat"
+        assert len(set(last_names)) == len(last_names), "Last names should not repeat"
+    
+    print(f"\nPools can supply {capacity} unique funny names")
+
+def test_unpaired_first_name_put_back():
+    """
+    Check that a first name with no free partner goes back to its pool, and
+    that the other patterns are still tried
+    """
+    cursor = _PoolCursor([0, 1, 2])
+    names = ["Boo", "Wee", "Zoo"]
+    cursor.draw(names, set(), random.Random(1))
+    cursor.put_back()
+    assert sorted(cursor.draw(names, set()) for _ in range(3)) == [0, 1, 2]
+
+    generator = SimpleNamespace(
+        first_name_sampler=SimpleNamespace(items=["Boo", "Wee"]),
+        last_name_sampler=SimpleNamespace(items=["Zoo", "Pee"]),
+        silly_first_patterns=("oo", "ee"), silly_first_pools={"oo": [0], "ee": [1]},
+        silly_first_masks=[0, 0],
+        silly_last_patterns=("oo", "ee"), silly_last_pools={"oo": [0], "ee": [1]},
+        _silly_matching_patterns=lambda mask: [],
+    )
+    for seed in range(5):
+        draw = _UniquePairDraw(generator, random.Random(seed))
+        # Use up the "ee" last name, so the first pattern tried may have no free partner
+        draw.used_last.add("Pee")
+        draw.cursors[("last", "silly", "ee")] = _PoolCursor([])
+        assert draw.silly_sound_pair() is not None
+        assert draw.silly_sound_pair() is None
+        unused = {"Boo", "Wee"} - draw.used_first
+        assert len(unused) == 1
+        pattern = "oo" if "Boo" in unused else "ee"
+        assert draw.cursors[("first", "silly", pattern)].remaining == 1, "The unpaired first name stays available"
+
+if __name__ == "__main__":
+    test_unique_funny_batch()
+    test_unpaired_first_name_put_back()
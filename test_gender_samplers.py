@@ -0,0 +1,75 @@
+"""
+Test script for gender-filtered census names
+"""
+import os
+import tempfile
+import numpy as np
+from census_name_generator import CensusNameGenerator, FIRST_NAMES_FILE
+from utils import dataset_registry as registry_module
+from utils.data_loader import find_data_file, load_name_columns
+from utils.dataset_registry import DatasetRegistry, dataset_registry, rank_column_table
+from utils.samplers import AliasSampler
+
+def test_samplers_by_label():
+    """
+    Check that each label's sampler only draws items with that label
+    """
+    items = ["JAMES", "MARY", "JOHN", "PATRICIA"]
+    samplers = AliasSampler.by_label(items, [3.3, 2.6, 3.2, 1.1], ["male", "female", "male", "female"])
+    assert list(samplers) == ["male", "female"]
+    assert all(sampler.items is items for sampler in samplers.values())
+    female = samplers["female"].sample_indices(10000, np.random.default_rng(1))
+    assert set(female.tolist()) == {1, 3}
+
+def test_census_gender_filter():
+    """
+    Check that gender-filtered census names only use that gender's first names
+    """
+    generator = CensusNameGenerator()
+    assert set(generator.genders) == {"male", "female"}
+    genders = dataset_registry.column(FIRST_NAMES_FILE, "gender")
+    first_names = generator.first_name_sampler.items
+    female_names = {first_names[i].capitalize() for i, gender in enumerate(genders) if gender == "female"}
+
+    batch = generator.generate_batch(5000, rng=7, lazy=True, gender="female")
+    assert {genders[i] for i in batch.first_idx} == {"female"}
+
+    names = (generator.generate_multiple(20, rng=7, gender="female") +
+             generator.generate_multiple_unique(20, rng=7, gender="Female") +
+             generator.generate_multiple_weighted_unique(20, rng=7, gender="female"))
+    print(f"\nFemale names: {names[:5]}")
+    assert all(name.split(" ")[0] in female_names for name in names)
+
+    try:
+        generator.generate_name(gender="other")
+        assert False, "An unknown gender should be rejected"
+    except ValueError:
+        pass
+
+def test_compiled_gender_column():
+    """
+    Check that a compiled gender column is mapped instead of parsing the first name file
+    """
+    source = find_data_file(FIRST_NAMES_FILE)
+    parsed = DatasetRegistry().column(FIRST_NAMES_FILE, "gender")
+
+    with tempfile.TemporaryDirectory() as directory:
+        compiled = os.path.join(directory, "genders.bin")
+        rank_column_table(*load_name_columns(source, "gender")).save(compiled)
+        os.utime(compiled, (os.path.getmtime(source) + 1,) * 2)
+
+        def no_parsing(*args, **kwargs):
+            raise AssertionError("The first name file should not be parsed")
+
+        original = registry_module.load_name_columns
+        registry_module.load_name_columns = no_parsing
+        try:
+            mapped = DatasetRegistry().column(FIRST_NAMES_FILE, "gender", compiled_path=compiled)
+        finally:
+            registry_module.load_name_columns = original
+    assert mapped == parsed and set(mapped) == {"male", "female"}
+
+if __name__ == "__main__":
+    test_samplers_by_label()
+    test_census_gender_filter()
+    test_compiled_gender_column()
@@ -0,0 +1,65 @@
+"""
+Test script for lazily built generators in utils/generator_registry.py
+"""
+import threading
+import time
+from utils.generator_registry import GeneratorRegistry
+
+def test_lazy_build_once():
+    """
+    Check that generators are built on first use, once, even from many threads
+    """
+    builds = []
+
+    def factory():
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+
+    registry = GeneratorRegistry({"slow": factory, "unused": factory})
+    assert registry.status()["slow"]["state"] == "pending"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("slow"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1, "The factory should only run once"
+    assert all(result is results[0] for result in results)
+    assert registry.ready(["slow"]) and not registry.ready()
+
+    status = registry.status()
+    print(f"\nRegistry status: {status}")
+    assert status["slow"]["state"] == "ready"
+    assert status["slow"]["build_seconds"] >= 0.05
+    assert status["unused"]["state"] == "pending"
+
+def test_warm_up_and_failures():
+    """
+    Check background warm-up, and that a failed build is reported and retried
+    """
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise IOError("data file missing")
+        return "loaded"
+
+    registry = GeneratorRegistry({"ok": lambda: "loaded", "flaky": flaky})
+    registry.warm_up().join()
+
+    status = registry.status()
+    assert status["ok"]["state"] == "ready"
+    assert status["flaky"]["state"] == "failed"
+    assert "data file missing" in status["flaky"]["error"]
+    assert not registry.ready()
+
+    assert registry.get("flaky") == "loaded"
+    assert registry.ready()
+
+if __name__ == "__main__":
+    test_lazy_build_once()
+    test_warm_up_and_failures()
@@ -0,0 +1,45 @@
+"""
+Test script for the memory footprint report in utils/memory_report.py
+"""
+import mmap
+from array import array
+from utils.memory_report import memory_report
+from utils.name_batch import format_column
+from utils.name_table import NameTable
+
+class Holder:
+    """Stand-in generator with a private, a shared and a repeated structure."""
+
+    def __init__(self):
+        self.weights = array('d', range(1000))
+        self.table = NameTable.from_pairs([("SMITH", 2), ("JONES", 1)])
+        self.same_weights = self.weights
+
+def test_report_breakdown():
+    """
+    Check that private and shared bytes are split, and each object is counted once
+    """
+    holder = Holder()
+    report = memory_report(holder)
+    print(f"\nReport: {report}")
+    structures = report["structures"]
+    assert structures["weights"]["bytes"] >= 8000 and structures["weights"]["shared_bytes"] == 0
+    assert structures["table"]["shared_bytes"] == holder.table.nbytes
+    assert structures["same_weights"]["bytes"] == 0, "Objects already counted aren't counted again"
+    assert report["total_bytes"] == sum(s["bytes"] for s in structures.values())
+
+    assert list(memory_report(holder, ["table"])["structures"]) == ["table"]
+
+def test_formatted_names_are_shared():
+    """
+    Check that formatting the same names twice shares the strings
+    """
+    table = NameTable.from_pairs([("SMITH", 2), ("JONES", 1)])
+    first = format_column(table, str.capitalize)
+    second = format_column(table, str.capitalize)
+    assert first.tolist() == ["Smith", "Jones"]
+    assert all(a is b for a, b in zip(first, second))
+
+if __name__ == "__main__":
+    test_report_breakdown()
+    test_formatted_names_are_shared()
@@ -0,0 +1,95 @@
+"""
+Test script for the metrics registry in utils/metrics.py and the /metrics endpoint
+"""
+import os
+import threading
+os.environ.setdefault("GENERATOR_WARMUP", "off")
+from utils.metrics import MetricsRegistry, generation_seconds, timed_generation, untimed
+
+def sample_value(text, line_start):
+    """
+    Find the value of the first exposition line starting with line_start.
+    """
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample starting with {line_start!r} in:\n{text}")
+
+def test_registry():
+    """
+    Check counters and histograms, from several threads, in the Prometheus text format
+    """
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests", ("type",))
+    latency = registry.histogram("test_latency_seconds", "Latency", ("type",), buckets=(0.1, 1.0))
+    registry.gauge("test_pool_names", "Pool size", ("type",), lambda: {("census",): 7})
+    assert registry.counter("test_requests_total", "Requests", ("type",)) is requests
+
+    census = requests.labels("census")
+
+    def work():
+        for _ in range(10000):
+            census.inc()
+        latency.labels("census").observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latency.labels("census").observe(0.05)
+    latency.labels("census").observe(5)
+    requests.labels('fu"nny').inc(2)
+
+    text = registry.exposition()
+    print(f"\n{text}")
+    assert "# TYPE test_requests_total counter" in text
+    assert sample_value(text, 'test_requests_total{type="census"}') == 40000
+    assert 'test_requests_total{type="fu\\"nny"} 2' in text
+    assert sample_value(text, 'test_latency_seconds_bucket{type="census",le="0.1"}') == 1
+    assert sample_value(text, 'test_latency_seconds_bucket{type="census",le="1.0"}') == 5
+    assert sample_value(text, 'test_latency_seconds_bucket{type="census",le="+Inf"}') == 6
+    assert sample_value(text, 'test_latency_seconds_count{type="census"}') == 6
+    assert abs(sample_value(text, 'test_latency_seconds_sum{type="census"}') - 7.05) < 1e-9
+    assert sample_value(text, 'test_pool_names{type="census"}') == 7
+
+def test_untimed():
+    """
+    Check that generator calls inside untimed() aren't recorded
+    """
+    class UntimedNameGenerator:
+        @timed_generation
+        def generate_multiple(self, count):
+            return ["name"] * count
+
+    generator = UntimedNameGenerator()
+    with untimed():
+        generator.generate_multiple(3)
+    assert "untimed" not in "".join(generation_seconds.samples())
+    generator.generate_multiple(3)
+    assert 'generator="untimed",method="generate_multiple"} 1' in "\n".join(generation_seconds.samples())
+
+def test_metrics_endpoint():
+    """
+    Check that /metrics reports requests, generator calls and load times
+    """
+    import app
+    client = app.app.test_client()
+    for payload in ({"type": "census", "count": 5, "seed": 3}, {"type": "funny", "count": 5}, {"type": "census", "count": -1}):
+        client.post("/generate", json=payload)
+
+    response = client.get("/metrics")
+    text = response.get_data(as_text=True)
+    assert response.status_code == 200 and response.content_type.startswith("text/plain")
+    assert sample_value(text, 'namegen_requests_total{endpoint="generate",type="census",status="200"}') >= 1
+    assert sample_value(text, 'namegen_requests_total{endpoint="generate",type="census",status="400"}') >= 1
+    assert sample_value(text, 'namegen_request_duration_seconds_count{endpoint="generate",type="census"}') >= 1
+    assert sample_value(text, 'namegen_generation_names_sum{generator="census",method="generate_multiple"}') >= 5
+    assert sample_value(text, 'namegen_generator_load_seconds_count{generator="census",kind="build"}') >= 1
+    assert "# TYPE namegen_funny_fallback_names_total counter" in text
+    print(f"\n{len(text.splitlines())} metric lines")
+
+if __name__ == "__main__":
+    test_registry()
+    test_untimed()
+    test_metrics_endpoint()
@@ -2,6 +2,7 @@ import os
 import json
 import sys
 from baseball_name_generator import BaseballNameGenerator
+from utils.samplers import AliasSampler, FenwickSampler
 
 # Test with the small dataset we've already collected
 TEST_DATA_FILE = "baseball_data/test_all_players.json"
@@ -61,18 +62,11 @@ class TestBaseballNameGenerator(BaseballNameGenerator):
             self.nicknames = sorted([(name, count) for name, count in nickname_counter.items()], 
                                    key=lambda x: x[1], reverse=True)
             
-            # Create weighted lists for random selection
-            self.weighted_first_names = []
-            for name, count in self.first_names:
-                self.weighted_first_names.extend([name] * count)
-            
-            self.weighted_last_names = []
-            for name, count in self.last_names:
-                self.weighted_last_names.extend([name] * count)
-            
-            self.weighted_nicknames = []
-            for name, count in self.nicknames:
-                self.weighted_nicknames.extend([name] * count)
+            # Create weighted samplers for random selection
+            self.first_name_sampler = AliasSampler.from_pairs(self.first_names)
+            self.last_name_sampler = AliasSampler.from_pairs(self.last_names)
+            self.nickname_sampler = AliasSampler.from_pairs(self.nicknames)
+            self.nickname_pool = FenwickSampler.from_pairs(self.nicknames)
             
             print(f"Processed {len(self.first_names)} unique first names")
             print(f"Processed {len(self.last_names)} unique last names")
@@ -85,7 +79,7 @@ def main():
     """Main function to test the name generator with test data."""
     generator = TestBaseballNameGenerator()
     
-    if not generator.weighted_first_names:
+    if not generator.first_name_sampler:
         print("No data available. Exiting.")
         sys.exit(1)
     
@@ -0,0 +1,125 @@
+"""
+Test script for the pre-generated name pools in utils/name_pool.py
+"""
+import itertools
+import os
+import time
+os.environ.setdefault("GENERATOR_WARMUP", "off")
+from utils.name_pool import NamePool, NamePools
+
+def counter_pool(**options):
+    """A pool whose names are consecutive numbers, one block per list."""
+    numbers = itertools.count()
+    blocks = []
+
+    def produce(n):
+        block = [str(next(numbers)) for _ in range(n)]
+        blocks.append(block)
+        return block
+
+    return NamePool(produce, **options), blocks
+
+def test_take_and_refill():
+    """
+    Check that names come out in order, across blocks, and that misses leave the pool alone
+    """
+    pool, blocks = counter_pool(capacity=100, block_size=30)
+    assert pool.take(5) is None
+    pool.refill()
+    assert len(pool) == 90 and len(blocks) == 3 and not pool.needs_refill()
+
+    assert pool.take(20) == [str(i) for i in range(20)]
+    assert pool.take(20) == [str(i) for i in range(20, 40)]
+    assert pool.take(100) is None
+    assert len(pool) == 50 and not pool.needs_refill()
+    assert pool.take(10) == [str(i) for i in range(40, 50)]
+    assert pool.needs_refill()
+    pool.refill()
+    assert len(pool) == 100
+    assert pool.status() == {"size": 100, "capacity": 100, "hits": 3, "misses": 2, "dropped": 0}
+
+def test_whole_blocks():
+    """
+    Check that a pool of whole sets never mixes names from two blocks
+    """
+    pool, blocks = counter_pool(capacity=60, block_size=20, split_blocks=False)
+    pool.refill()
+    first = pool.take(15)
+    second = pool.take(15)
+    assert first == blocks[0][:15]
+    assert second == blocks[1][:15]
+    assert pool.status()["dropped"] == 5
+    # Larger than a block is always generated
+    assert pool.take(21) is None
+
+def test_clear():
+    """
+    Check that clearing a pool drops its names, including a block being generated at the time
+    """
+    pool, blocks = counter_pool(capacity=40, block_size=20)
+    pool.refill()
+    pool.clear()
+    assert len(pool) == 0 and pool.status()["dropped"] == 40
+
+    # A reload lands while a block is being generated: that block is thrown away
+    produce = pool.produce
+    def produce_then_reload(n):
+        block = produce(n)
+        if len(blocks) == 3:
+            pool.clear()
+        return block
+    pool.produce = produce_then_reload
+    pool.refill()
+    assert len(pool) == 40 and pool.take(20) == blocks[3]
+
+    pools = NamePools({"census": pool, "unique_census": counter_pool()[0]})
+    pools.clear(["census", "unknown"])
+    deadline = time.time() + 5
+    while len(pool) < 40 and time.time() < deadline:
+        time.sleep(0.01)
+    assert pool.take(20) == blocks[5], "The cleared pool is filled again in the background"
+
+def test_background_refill():
+    """
+    Check that taking from a pool below its low-water mark fills it again on the refill thread
+    """
+    pool, _ = counter_pool(capacity=200, block_size=50)
+    pools = NamePools({"census": pool})
+    assert pools.take("census", 10) is None
+    assert pools.take("unknown", 10) is None
+
+    deadline = time.time() + 5
+    while len(pool) < 200 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(pool) == 200
+    assert pools.take("census", 10) == [str(i) for i in range(10)]
+
+def test_app_pools():
+    """
+    Check that the app serves small unseeded requests from the pools and seeded ones exactly
+    """
+    import app
+    from app import pooled_names, name_pools
+
+    names = None
+    deadline = time.time() + 30
+    while names is None and time.time() < deadline:
+        names = pooled_names("funny", 10)
+        time.sleep(0.05)
+    print(f"\nPooled funny names: {names}")
+    assert names is not None and len(names) == 10
+    # Funny sets still never repeat a first or last name
+    assert len({name.split()[0] for name in names}) == 10
+    assert len({name.split()[-1] for name in names}) == 10
+
+    assert pooled_names("census", 5, rng=app.request_rng({"seed": 1})) is None
+    assert pooled_names("census", 5, gender="female") is None
+    assert pooled_names("census", app.NAME_POOL_MAX_COUNT + 1) is None
+    print(f"Pool status: {name_pools.status()['funny']}")
+
+if __name__ == "__main__":
+    test_take_and_refill()
+    test_whole_blocks()
+    test_clear()
+    test_background_refill()
+    test_app_pools()
@@ -0,0 +1,89 @@
+"""
+Test script for the flat name tables in utils/name_table.py
+"""
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from utils.name_table import NameTable, load_compiled_table
+from utils.samplers import AliasSampler
+
+def test_name_table_round_trip():
+    """
+    Check that names, weights and pairs come back the way they were packed
+    """
+    pairs = [("SMITH", 1.006), ("JOHNSON", 0.81), ("MÜLLER", 0.5), ("O'BRIEN", 0.0)]
+
+    for shared in (True, False):
+        table = NameTable.from_pairs(pairs, shared=shared)
+        assert len(table) == len(pairs)
+        assert list(table) == [name for name, _ in pairs]
+        assert table[-1] == "O'BRIEN"
+        assert table.pairs[:2] == pairs[:2]
+        assert list(table.pairs) == pairs
+
+    # Counts come back as ints
+    counts = NameTable.from_pairs([("John", 514), ("William", 448)])
+    assert counts.pairs[0] == ("John", 514)
+    assert isinstance(counts.pairs[1][1], int)
+
+    empty = NameTable.from_pairs([])
+    assert len(empty) == 0 and not empty.pairs[:5]
+
+def test_table_sampler_distribution():
+    """
+    Check that a sampler over a table draws like one built from the pairs
+    """
+    rng = random.Random(5)
+    pairs = [("A", 0.5), ("B", 0.3), ("C", 0.2)]
+    table = NameTable.from_pairs(pairs)
+    sampler = AliasSampler.from_table(table)
+
+    assert list(sampler.prob) == list(AliasSampler.from_pairs(pairs).prob)
+
+    draws = 100000
+    counts = Counter(sampler.sample(rng) for _ in range(draws))
+    print(f"\nTable of {len(table)} names uses {table.nbytes} bytes")
+    for name, expected in pairs:
+        observed = counts[name] / draws
+        print(f"{name}: expected {expected:.3f}, observed {observed:.3f}")
+        assert abs(observed - expected) < 0.01
+
+    batch_counts = Counter(sampler.sample_indices(draws, rng=1).tolist())
+    assert abs(batch_counts[0] / draws - 0.5) < 0.01
+
+def test_compiled_table_files():
+    """
+    Check saving and mapping compiled tables, and skipping stale or broken files
+    """
+    pairs = [("Babe", 12), ("Cap", 3), ("Honus", 1)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "players.json")
+        compiled = os.path.join(tmp, "first_names.bin")
+        with open(source, "w") as f:
+            f.write("[]")
+
+        NameTable.from_pairs(pairs).save(compiled)
+        table = NameTable.load(compiled)
+        assert list(table.pairs) == pairs
+        assert list(AliasSampler.from_table(table).prob) == list(AliasSampler.from_pairs(pairs).prob)
+        assert load_compiled_table(compiled, source) is not None
+
+        # A source edited after compiling makes the compiled table stale
+        later = time.time() + 10
+        os.utime(source, (later, later))
+        assert load_compiled_table(compiled, source) is None
+
+        # Truncated files are rejected instead of read past the end
+        del table
+        with open(compiled, "r+b") as f:
+            f.truncate(64)
+        assert load_compiled_table(compiled) is None
+        assert load_compiled_table(os.path.join(tmp, "missing.bin")) is None
+
+if __name__ == "__main__":
+    test_name_table_round_trip()
+    test_table_sampler_distribution()
+    test_compiled_table_files()
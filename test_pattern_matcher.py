@@ -0,0 +1,39 @@
+"""
+Test script for the multi-pattern matcher used by the funny name generator
+"""
+import re
+from utils.pattern_matcher import MultiPatternMatcher, expand_literals
+
+def test_expand_literals():
+    """
+    Check that simple regex patterns expand into the right literal strings
+    """
+    assert expand_literals(r"oo") == ["oo"]
+    assert expand_literals(r"but|butt") == ["but", "butt"]
+    assert expand_literals(r"b[o0]{2}b") == ["b00b", "b0ob", "bo0b", "boob"]
+    assert expand_literals(r"b.b") is None, "Wildcards can't be expanded"
+
+def test_matcher_agrees_with_regex():
+    """
+    Check that the matcher finds exactly the patterns re.search finds
+    """
+    patterns = {
+        "oo": r"oo",
+        "oob": r"oob",
+        "oodle": r"oodle",
+        "butt": r"but|butt",
+        "boob": r"b[o0]{2}b",
+        "wild": r"w.ng",
+    }
+    matcher = MultiPatternMatcher(patterns)
+    names = ["GOOBER", "NOODLE", "BUTTS", "ABBOTT", "BOOBY", "WANG", "WING", "SMITH", "Boobie", ""]
+
+    for name in names:
+        expected = {key for key, pattern in patterns.items() if re.search(pattern, name, re.IGNORECASE)}
+        found = set(matcher.matched_names(matcher.match_mask(name)))
+        print(f"{name!r}: {sorted(found)}")
+        assert found == expected, f"{name}: expected {sorted(expected)}, got {sorted(found)}"
+
+if __name__ == "__main__":
+    test_expand_literals()
+    test_matcher_agrees_with_regex()
@@ -0,0 +1,47 @@
+"""
+Test script for seeded, reproducible name generation
+"""
+import numpy as np
+from baseball_name_generator import BaseballNameGenerator
+from census_name_generator import CensusNameGenerator
+from utils.rng import stream, seed_sequence
+
+def test_seed_replays_names():
+    """
+    Check that the same seed replays the same names for every generation method
+    """
+    baseball = BaseballNameGenerator()
+    census = CensusNameGenerator()
+
+    methods = {
+        "baseball": lambda rng: baseball.generate_multiple(50, rng=rng),
+        "census": lambda rng: census.generate_multiple(50, rng=rng),
+        "unique census": lambda rng: census.generate_multiple_unique(50, rng=rng),
+        "weighted unique census": lambda rng: census.generate_multiple_weighted_unique(50, rng=rng),
+    }
+
+    print("\n=== Seeded Generation ===")
+    for label, generate in methods.items():
+        first = generate(stream(2024))
+        assert first == generate(stream(2024)), f"{label} names should replay for the same seed"
+        assert first == generate(2024), f"{label} should accept a plain int seed"
+        print(f"{label}: {first[0]}")
+
+def test_shards_are_independent():
+    """
+    Check that shards of a seed are reproducible but differ from each other
+    """
+    baseball = BaseballNameGenerator()
+
+    shard_0 = baseball.generate_multiple(50, rng=stream(7, 0))
+    shard_1 = baseball.generate_multiple(50, rng=stream(7, 1))
+    assert shard_0 == baseball.generate_multiple(50, rng=stream(7, 0))
+    assert shard_0 != shard_1, "Different shards should give different names"
+
+    # Shard k is the same stream as the k-th spawned child of the seed
+    spawned = np.random.SeedSequence(7).spawn(2)[1]
+    assert (seed_sequence(7, 1).generate_state(4) == spawned.generate_state(4)).all()
+
+if __name__ == "__main__":
+    test_seed_replays_names()
+    test_shards_are_independent()
@@ -0,0 +1,94 @@
+"""
+Test script for the weighted samplers in utils/samplers.py
+"""
+import random
+from collections import Counter
+from utils.samplers import AliasSampler, PrefixSumSampler, FenwickSampler
+
+def test_alias_sampler_distribution():
+    """
+    Check that the alias sampler draws items in proportion to their weights
+    """
+    rng = random.Random(42)
+    weights = {"SMITH": 1.006, "JOHNSON": 0.81, "WILLIAMS": 0.699, "RARE": 0.0004}
+    sampler = AliasSampler.from_pairs(list(weights.items()))
+
+    draws = 200000
+    counts = Counter(sampler.sample(rng) for _ in range(draws))
+    total = sum(weights.values())
+
+    print("\n=== Alias Sampler Distribution ===")
+    for name, weight in weights.items():
+        expected = weight / total
+        observed = counts[name] / draws
+        print(f"{name}: expected {expected:.4f}, observed {observed:.4f}")
+        assert abs(observed - expected) < 0.01, f"{name} drawn at the wrong rate"
+
+    # Names under 0.001 used to be truncated away by the expanded lists
+    assert counts["RARE"] > 0, "Rare names should still be drawn"
+
+def test_alias_sampler_edge_cases():
+    """
+    Check empty samplers, zero weights and invalid weights
+    """
+    empty = AliasSampler([], [])
+    assert not empty
+    assert len(empty) == 0
+
+    rng = random.Random(7)
+    sampler = AliasSampler(["A", "B", "C"], [0.0, 1.0, 0.0])
+    assert all(sampler.sample(rng) == "B" for _ in range(1000))
+
+    try:
+        AliasSampler(["A"], [0.0])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("All-zero weights should be rejected")
+
+def test_prefix_sum_sampler_windows():
+    """
+    Check that rank and percentile windows only return items inside the window
+    """
+    rng = random.Random(3)
+    items = [f"NAME{i}" for i in range(100)]
+    sampler = PrefixSumSampler(items, [1.0] * 50 + [3.0] * 50)
+
+    ranks = {int(sampler.sample(10, 20, rng)[4:]) for _ in range(2000)}
+    assert ranks == set(range(10, 20)), "Rank window should cover exactly ranks 10-19"
+
+    percentile_ranks = [int(sampler.sample_percentile(0.9, 1.0, rng)[4:]) for _ in range(2000)]
+    assert all(90 <= rank < 100 for rank in percentile_ranks)
+
+    # Items 50-99 weigh three times as much as items 0-49
+    draws = Counter(sampler.sample_index(0, 100, rng) >= 50 for _ in range(40000))
+    observed = draws[True] / 40000
+    print(f"\nHeavy half drawn {observed:.3f} of the time (expected 0.750)")
+    assert abs(observed - 0.75) < 0.02
+
+def test_fenwick_sampler_without_replacement():
+    """
+    Check that drawing with removal returns every item exactly once
+    """
+    rng = random.Random(11)
+    items = [f"NICK{i}" for i in range(37)]
+    pool = FenwickSampler(items, [float(i % 5 + 1) for i in range(37)])
+
+    copy = pool.copy()
+    drawn = [copy.pop(rng) for _ in range(len(items))]
+    assert sorted(drawn) == sorted(items), "Every item should be drawn exactly once"
+    assert not copy
+    assert len(pool) == len(items), "Copies should not change the original pool"
+
+    # The first draw still follows the weights
+    counts = Counter(pool.sample_index(rng) % 5 for _ in range(30000))
+    observed = counts[4] / 30000
+    expected = 7 * 5 / sum(i % 5 + 1 for i in range(37))
+    print(f"\nWeight-5 items drawn {observed:.3f} of the time (expected {expected:.3f})")
+    assert abs(observed - expected) < 0.02
+
+if __name__ == "__main__":
+    test_alias_sampler_distribution()
+    test_alias_sampler_edge_cases()
+    test_prefix_sum_sampler_windows()
+    test_fenwick_sampler_without_replacement()
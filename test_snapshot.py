@@ -0,0 +1,109 @@
+"""
+Test script for warm-start snapshots in utils/snapshot.py
+"""
+import os
+import tempfile
+from array import array
+import numpy as np
+from utils.name_table import NameTable
+from utils.snapshot import (save_snapshot, load_snapshot, snapshot_key, restore_or_build,
+                            SNAPSHOT_DIR_ENV_VAR)
+
+def test_snapshot_round_trip():
+    """
+    Check that arrays come back as views over the file and shared objects by reference
+    """
+    table = NameTable.from_pairs([("SMITH", 1.006), ("JONES", 0.621)])
+    state = {
+        "ranks": array('q', [0, 1, 1]),
+        "cumulative": array('d', [0.0, 0.5, 1.0]),
+        "flat": np.arange(5, dtype=np.int64),
+        "pools": {"oo": (1, 2), "ee": ()},
+        "items": table,
+    }
+    key = snapshot_key("digest", {"oo": r"oo"}, {"HARRY", "DICK"})
+    assert key == snapshot_key("digest", {"oo": r"oo"}, {"DICK", "HARRY"})
+    assert key != snapshot_key("other digest", {"oo": r"oo"}, {"HARRY", "DICK"})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "test.snapshot")
+        assert save_snapshot(path, key, state, shared={"names": table})
+        print(f"\nSnapshot is {os.path.getsize(path)} bytes")
+
+        loaded = load_snapshot(path, key, shared={"names": table})
+        assert loaded["items"] is table, "Shared objects should not be copied into the snapshot"
+        assert list(loaded["ranks"]) == [0, 1, 1]
+        assert isinstance(loaded["ranks"], memoryview) and loaded["ranks"].readonly
+        assert list(loaded["cumulative"]) == [0.0, 0.5, 1.0]
+        assert loaded["flat"].tolist() == [0, 1, 2, 3, 4] and not loaded["flat"].flags.writeable
+        assert loaded["pools"] == state["pools"]
+
+        # Snapshots from other inputs, or broken files, are ignored
+        assert load_snapshot(path, snapshot_key("other digest")) is None
+        del loaded
+        with open(path, "r+b") as f:
+            f.truncate(60)
+        assert load_snapshot(path, key, shared={"names": table}) is None
+        assert load_snapshot(os.path.join(tmp, "missing.snapshot"), key) is None
+
+def test_restore_or_build():
+    """
+    Check that attributes are built once, then restored from the snapshot
+    """
+    class Index:
+        def __init__(self):
+            self.builds = 0
+
+        def build(self):
+            self.builds += 1
+            self.masks = array('q', [3, 0, 5])
+
+    saved = os.environ.get(SNAPSHOT_DIR_ENV_VAR)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ[SNAPSHOT_DIR_ENV_VAR] = tmp
+        try:
+            key = snapshot_key("v1")
+            first = Index()
+            assert not restore_or_build(first, "index", key, ["masks"], first.build)
+            second = Index()
+            assert restore_or_build(second, "index", key, ["masks"], second.build)
+            assert second.builds == 0 and list(second.masks) == [3, 0, 5]
+
+            # A new key rebuilds; no key never touches the disk
+            third = Index()
+            assert not restore_or_build(third, "index", snapshot_key("v2"), ["masks"], third.build)
+            fourth = Index()
+            assert not restore_or_build(fourth, "other", None, ["masks"], fourth.build)
+            assert sorted(os.listdir(tmp)) == ["index.snapshot"]
+        finally:
+            if saved is None:
+                os.environ.pop(SNAPSHOT_DIR_ENV_VAR, None)
+            else:
+                os.environ[SNAPSHOT_DIR_ENV_VAR] = saved
+
+def test_funny_generator_warm_start():
+    """
+    Check that a funny name generator restored from a snapshot draws the same names
+    """
+    from generators.funny_generator import FunnyNameGenerator
+
+    saved = os.environ.get(SNAPSHOT_DIR_ENV_VAR)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ[SNAPSHOT_DIR_ENV_VAR] = tmp
+        try:
+            built = FunnyNameGenerator()
+            restored = FunnyNameGenerator()
+        finally:
+            if saved is None:
+                os.environ.pop(SNAPSHOT_DIR_ENV_VAR, None)
+            else:
+                os.environ[SNAPSHOT_DIR_ENV_VAR] = saved
+
+    assert isinstance(restored.silly_first_masks, memoryview), "Pools should come from the snapshot"
+    assert restored.generate_multiple(20, rng=7) == built.generate_multiple(20, rng=7)
+    assert list(restored.generate_batch(20, rng=7)) == list(built.generate_batch(20, rng=7))
+
+if __name__ == "__main__":
+    test_snapshot_round_trip()
+    test_restore_or_build()
+    test_funny_generator_warm_start()
@@ -0,0 +1,67 @@
+"""
+Test script for startup profiling in utils/startup_profiler.py
+"""
+import json
+import os
+import tempfile
+from utils.startup_profiler import StartupProfiler, report_path, PROFILE_ENV_VAR, DEFAULT_REPORT_PATH
+
+def test_nested_phases_report():
+    """
+    Check that nested phases are timed, traced and written as a JSON report
+    """
+    profiler = StartupProfiler()
+
+    # Disabled profilers record nothing
+    with profiler.phase("census"):
+        pass
+    assert profiler.phases == []
+
+    profiler.enable()
+    try:
+        with profiler.phase("census"):
+            with profiler.phase("parse"):
+                names = ["SMITH"] * 200000
+            with profiler.phase("weight_build"):
+                del names
+    finally:
+        profiler.disable()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.json")
+        profiler.write(path)
+        with open(path) as f:
+            report = json.load(f)
+
+    print(f"\nStartup report: {report['generators']}")
+    assert [phase["phase"] for phase in report["phases"]] == ["census", "census/parse", "census/weight_build"]
+    parse = report["phases"][1]
+    assert parse["memory_bytes"] >= 200000 * 8, "The list should show up in traced memory"
+    assert report["phases"][0]["peak_memory_bytes"] >= parse["peak_memory_bytes"]
+    assert report["generators"]["census"]["seconds"] >= parse["seconds"]
+
+def test_report_path():
+    """
+    Check that the command line flag wins over the environment variable
+    """
+    saved = os.environ.pop(PROFILE_ENV_VAR, None)
+    try:
+        assert report_path([]) is None
+        assert report_path(["--profile-startup"]) == DEFAULT_REPORT_PATH
+        assert report_path(["--port", "80", "--profile-startup", "out.json"]) == "out.json"
+
+        os.environ[PROFILE_ENV_VAR] = "1"
+        assert report_path(None) == DEFAULT_REPORT_PATH
+        os.environ[PROFILE_ENV_VAR] = "release.json"
+        assert report_path(None) == "release.json"
+        assert report_path(["--profile-startup", "cli.json"]) == "cli.json"
+        os.environ[PROFILE_ENV_VAR] = "0"
+        assert report_path(None) is None
+    finally:
+        os.environ.pop(PROFILE_ENV_VAR, None)
+        if saved is not None:
+            os.environ[PROFILE_ENV_VAR] = saved
+
+if __name__ == "__main__":
+    test_nested_phases_report()
+    test_report_path()
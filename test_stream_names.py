@@ -0,0 +1,81 @@
+"""
+Test script for streaming names with iter_names and /generate/stream
+"""
+import csv
+import io
+import json
+import os
+os.environ.setdefault("GENERATOR_WARMUP", "off")
+import app as app_module
+from app import app
+from census_name_generator import CensusNameGenerator
+
+def test_iter_names_chunks():
+    """
+    Check that names come in bounded chunks and a seed replays them
+    """
+    generator = CensusNameGenerator()
+    chunks = list(generator.iter_names(25, rng=5, chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert chunks == list(generator.iter_names(25, rng=5, chunk_size=10))
+
+    unique_chunks = list(generator.iter_unique_names(7, rng=5, chunk_size=3, gender="male"))
+    assert [len(chunk) for chunk in unique_chunks] == [3, 3, 1]
+
+def test_stream_endpoint():
+    """
+    Check the NDJSON and CSV output, and that bad parameters get an error status
+    """
+    client = app.test_client()
+
+    response = client.post("/generate/stream", json={"type": "census", "count": 25, "seed": 1})
+    assert response.status_code == 200 and response.mimetype == "application/x-ndjson"
+    names = [json.loads(line)["name"] for line in response.get_data(as_text=True).splitlines()]
+    print(f"\nStreamed names: {names[:5]}")
+    assert len(names) == 25
+
+    response = client.get("/generate/stream?type=baseball&count=12&format=csv")
+    assert response.mimetype == "text/csv"
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ["name"] and len(rows) == 13
+
+    assert client.get("/generate/stream?type=census&format=xml").status_code == 400
+    assert client.get("/generate/stream?type=funny&gender=female").status_code == 400
+
+def test_stream_error_status():
+    """
+    Check that a stream failing part way through is recorded as an error, not a success
+    """
+    class FailingGenerator:
+        def iter_names(self, count, rng=None, gender=None):
+            yield ["Ada Lovelace"]
+            raise RuntimeError("data went away")
+
+    def failed_streams():
+        for line in app_module.metrics.exposition().splitlines():
+            if line.startswith('namegen_requests_total{endpoint="stream",type="census",status="500"}'):
+                return float(line.rsplit(" ", 1)[1])
+        return 0
+
+    client = app.test_client()
+    before = failed_streams()
+    get = app_module.generators.get
+    app_module.generators.get = lambda name: FailingGenerator()
+    try:
+        response = client.get("/generate/stream?type=census&count=5")
+        assert response.status_code == 200
+        try:
+            response.get_data()
+            assert False, "The stream should break off"
+        except RuntimeError:
+            pass
+        # The server closes the response when the stream ends
+        response.close()
+    finally:
+        app_module.generators.get = get
+    assert failed_streams() == before + 1
+
+if __name__ == "__main__":
+    test_iter_names_chunks()
+    test_stream_endpoint()
+    test_stream_error_status()
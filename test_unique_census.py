@@ -76,5 +76,40 @@ def test_name_uniqueness():
     print("\nMost common last names in unique set:")
     print(Counter(unique_last).most_common(5))
 
+def test_custom_top_n():
+    """
+    Test that the unique generator honors a custom top-N cutoff
+    """
+    generator = CensusNameGenerator()
+    
+    top_n = 1000
+    sample_size = 200
+    unique_names = generator.generate_multiple_unique(sample_size, top_n=top_n)
+    
+    top_first_names = {name.capitalize() for name, _ in generator.get_most_common("first", top_n)}
+    top_last_names = {name.capitalize() for name, _ in generator.get_most_common("last", top_n)}
+    
+    both_top_count = sum(1 for name in unique_names
+                         if name.split()[0] in top_first_names and name.split()[-1] in top_last_names)
+    
+    print(f"\nUnique Census Names (top {top_n}) - Both top {top_n}: {both_top_count}/{sample_size}")
+    assert both_top_count == 0, f"Unique Census Names should never combine top {top_n} first and last names"
+
+def test_top_n_range():
+    """
+    Test that cutoffs leaving no last names, or negative ones, are rejected
+    """
+    generator = CensusNameGenerator()
+    
+    for top_n in (-1, len(generator.last_names)):
+        try:
+            generator.generate_multiple_unique(5, top_n=top_n)
+            assert False, f"top_n={top_n} should be rejected"
+        except ValueError as e:
+            print(f"\ntop_n={top_n}: {e}")
+    assert len(generator.generate_multiple_unique(5, top_n=len(generator.last_names) - 1)) == 5
+
 if __name__ == "__main__":
-    test_name_uniqueness() 
\ No newline at end of file
+    test_name_uniqueness()
+    test_custom_top_n()
+    test_top_n_range() 
\ No newline at end of file
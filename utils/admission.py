@@ -0,0 +1,248 @@
+"""
+Cost-based admission control for name generation requests.
+
+Each request type has a cost model, seconds = overhead + per_name * count,
+measured on the running machine by calibrate(), a short built-in benchmark.
+Until calibration runs the model uses DEFAULT_COSTS.
+
+AdmissionController uses the estimates to:
+- reject requests that would take longer than a per-request budget, and
+- cap how many expensive requests a worker runs at once, so a bulk caller
+  can't starve interactive traffic. Cheap requests never wait for a slot.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from utils.metrics import untimed
+
+# (overhead seconds, seconds per name) for each request type, measured on a laptop
+DEFAULT_COSTS = {
+    "baseball": (0.0, 10e-6),
+    "census": (0.0, 10e-6),
+    "unique_census": (0.0, 10e-6),
+    "weighted_unique_census": (0.0, 25e-6),
+    "funny": (0.0, 15e-6),
+}
+# Names per calibration run; the second run is this many times larger
+CALIBRATION_COUNT = 1000
+CALIBRATION_SCALE = 10
+
+class AdmissionRejected(Exception):
+    """
+    A request was turned away before any work was done.
+    """
+
+    def __init__(self, message: str, status: int, retry_after: Optional[int] = None,
+                 details: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the rejection.
+
+        Args:
+            message (str): Reason, for the client
+            status (int): HTTP status to answer with
+            retry_after (Optional[int]): Seconds the client should wait before retrying
+            details (Optional[Dict[str, Any]]): Extra fields for the response body
+        """
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.details = details or {}
+
+class CostModel:
+    """
+    Estimated seconds of work for a request type and name count.
+    """
+
+    def __init__(self, costs: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Initialize the model.
+
+        Args:
+            costs (Optional[Dict[str, Tuple[float, float]]]): (overhead, per-name)
+                seconds for each request type, DEFAULT_COSTS by default
+        """
+        self.costs = dict(DEFAULT_COSTS if costs is None else costs)
+        self.calibrated = False
+
+    def estimate(self, kind: str, count: int) -> float:
+        """
+        Estimate how long a request takes.
+
+        Args:
+            kind (str): Request type, e.g. "unique_census"
+            count (int): Number of names
+
+        Returns:
+            float: Estimated seconds, using the most expensive known type for unknown ones
+        """
+        overhead, per_name = self.costs.get(kind) or max(self.costs.values(), key=lambda cost: cost[1])
+        return overhead + per_name * count
+
+    def max_count(self, kind: str, seconds: float) -> int:
+        """
+        Get the most names of a type that fit in a time budget.
+        """
+        overhead, per_name = self.costs.get(kind) or max(self.costs.values(), key=lambda cost: cost[1])
+        if per_name <= 0:
+            return 0 if seconds < overhead else 2 ** 63 - 1
+        # Round off floating point error, then make sure the count really fits
+        count = max(int((seconds - overhead) / per_name + 1e-9), 0)
+        if count and overhead + per_name * count > seconds:
+            count -= 1
+        return count
+
+    def calibrate(self, runners: Dict[str, Callable[[int], Any]], count: int = CALIBRATION_COUNT,
+                  repeat: int = 3, limits: Optional[Dict[str, int]] = None) -> Dict[str, Tuple[float, float]]:
+        """
+        Measure the cost of each request type on this machine.
+
+        Each runner is timed at count and count * CALIBRATION_SCALE names,
+        keeping the fastest of a few runs, and the two timings give the
+        per-name cost and the fixed overhead. Runs don't record generation
+        metrics, so calibration doesn't show up as traffic.
+
+        Args:
+            runners (Dict[str, Callable[[int], Any]]): Generates n names of a request type
+            count (int): Names in the smaller run
+            repeat (int): Runs per size
+            limits (Optional[Dict[str, int]]): Most names a runner makes in one call
+                before it changes behavior, e.g. the unique funny name capacity;
+                that type's runs are scaled down to fit, or skipped if they can't
+
+        Returns:
+            Dict[str, Tuple[float, float]]: Measured (overhead, per-name) seconds
+        """
+        measured = {}
+        limits = limits or {}
+        with untimed():
+            for kind, run in runners.items():
+                kind_count = min(count, limits.get(kind, count * CALIBRATION_SCALE) // CALIBRATION_SCALE)
+                if kind_count < 1:
+                    continue
+                # The first call can fill caches that later requests reuse
+                run(1)
+                small = min(_time_run(run, kind_count) for _ in range(repeat))
+                large = min(_time_run(run, kind_count * CALIBRATION_SCALE) for _ in range(repeat))
+                per_name = max(large - small, 0.0) / (kind_count * (CALIBRATION_SCALE - 1))
+                overhead = max(small - per_name * kind_count, 0.0)
+                measured[kind] = (overhead, per_name)
+
+        self.costs.update(measured)
+        self.calibrated = True
+        return measured
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Report the cost of each type, in microseconds per name.
+        """
+        return {
+            "calibrated": self.calibrated,
+            "costs": {kind: {"overhead_ms": round(overhead * 1e3, 3), "per_name_us": round(per_name * 1e6, 3)}
+                      for kind, (overhead, per_name) in self.costs.items()}
+        }
+
+def _time_run(run: Callable[[int], Any], count: int) -> float:
+    """
+    Time one run of a calibration runner.
+    """
+    start = time.perf_counter()
+    run(count)
+    return time.perf_counter() - start
+
+class Admission:
+    """
+    A request that was let in, holding an expensive-work slot if it needed one.
+
+    Use it as a context manager, or call release() when the work is done.
+    """
+
+    def __init__(self, cost: float, slots: Optional[threading.Semaphore] = None):
+        self.cost = cost
+        self._slots = slots
+
+    def release(self):
+        """Give back the slot, if any. Safe to call more than once."""
+        slots, self._slots = self._slots, None
+        if slots is not None:
+            slots.release()
+
+    def __enter__(self) -> "Admission":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+class AdmissionController:
+    """
+    Decides whether a worker takes on a generation request.
+    """
+
+    def __init__(self, cost_model: CostModel, budget_seconds: float = 1.0,
+                 expensive_seconds: float = 0.1, max_expensive: int = 1):
+        """
+        Initialize the controller.
+
+        Args:
+            cost_model (CostModel): Estimates the cost of each request
+            budget_seconds (float): Most estimated seconds for a single request
+            expensive_seconds (float): Requests estimated to take longer need a slot
+            max_expensive (int): Expensive requests a worker runs at once
+        """
+        self.cost_model = cost_model
+        self.budget_seconds = budget_seconds
+        self.expensive_seconds = expensive_seconds
+        self.max_expensive = max_expensive
+        self._slots = threading.BoundedSemaphore(max_expensive)
+        self.rejected = {"over_budget": 0, "busy": 0}
+        self._lock = threading.Lock()
+
+    def admit(self, kind: str, count: int, enforce_budget: bool = True) -> Admission:
+        """
+        Let a request in, or reject it.
+
+        Args:
+            kind (str): Request type
+            count (int): Number of names
+            enforce_budget (bool): Reject requests over the budget; streamed
+                requests only take a slot
+
+        Returns:
+            Admission: Release it when the work is done
+
+        Raises:
+            AdmissionRejected: 413 over the budget, 429 when every expensive slot is taken
+        """
+        cost = self.cost_model.estimate(kind, count)
+        if enforce_budget and cost > self.budget_seconds:
+            with self._lock:
+                self.rejected["over_budget"] += 1
+            max_count = self.cost_model.max_count(kind, self.budget_seconds)
+            raise AdmissionRejected(
+                f"{count} {kind} names is over the limit of {max_count} per request; "
+                f"use /generate/stream for bulk generation",
+                413, details={"max_count": max_count}
+            )
+        if cost <= self.expensive_seconds:
+            return Admission(cost)
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected["busy"] += 1
+            raise AdmissionRejected("Too many large requests in progress, try again shortly", 429,
+                                    retry_after=max(1, math.ceil(min(cost, self.budget_seconds))))
+        return Admission(cost, self._slots)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Report the limits, rejections and cost model.
+        """
+        with self._lock:
+            rejected = dict(self.rejected)
+        return {
+            "budget_seconds": self.budget_seconds,
+            "expensive_seconds": self.expensive_seconds,
+            "max_expensive": self.max_expensive,
+            "rejected": rejected,
+            **self.cost_model.status()
+        }
@@ -0,0 +1,276 @@
+"""
+One-pass cleaning and aggregation of the scraped baseball player file.
+
+The generators only need how often each first name, last name and nickname
+occurs. run_etl() streams the player records once, applies the name rules
+below to every field, and writes:
+
+    cleaned_baseball_players.json    the players, with invalid names blanked
+    baseball_first_name_counts.csv   name,count, most common first
+    baseball_last_name_counts.csv
+    baseball_nickname_counts.csv
+
+each with a .sha256 file holding the player file's digest, so the tables
+are only used while they match it, and the generators load three small count tables instead of every player
+record. The same rules are used by clean_baseball_data.py and both
+baseball generators.
+"""
+
+import csv
+import json
+import os
+import re
+import textwrap
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from utils.data_loader import iter_json_array, load_name_columns
+from utils.dataset_registry import built_from, file_digests, write_source_digests
+from utils.name_table import NameTable
+from utils.startup_profiler import startup_profiler
+
+DATA_DIR = "baseball_data"
+PLAYER_FILE = os.path.join(DATA_DIR, "all_baseball_players.json")
+CLEANED_PLAYER_FILE = os.path.join(DATA_DIR, "cleaned_baseball_players.json")
+FIRST_NAME_COUNTS_FILE = os.path.join(DATA_DIR, "baseball_first_name_counts.csv")
+LAST_NAME_COUNTS_FILE = os.path.join(DATA_DIR, "baseball_last_name_counts.csv")
+NICKNAME_COUNTS_FILE = os.path.join(DATA_DIR, "baseball_nickname_counts.csv")
+COUNT_FILES = (FIRST_NAME_COUNTS_FILE, LAST_NAME_COUNTS_FILE, NICKNAME_COUNTS_FILE)
+
+MIN_NAME_LENGTH = 2
+# Anything but letters (in any script), digits, whitespace and the punctuation
+# real names and nicknames use, e.g. "O'Rourke", "Old Aches & Pains", "$11000 Beauty"
+INVALID_CHARACTERS = re.compile(r"[^\w\s.,'&$/()\-]|_")
+# Fields like "Kid or Red" hold more than one nickname
+NICKNAME_SEPARATOR = re.compile(r"\s+or\s+", re.IGNORECASE)
+# Placeholders the scraper writes for players without a nickname
+MISSING_NICKNAMES = frozenset({"none"})
+
+def clean_name(name: Optional[str]) -> str:
+    """
+    Clean a name, or reject it.
+
+    Names must be at least two characters without "@" or unusual symbols.
+    Unbalanced trailing parentheses are dropped; balanced ones, as in
+    "The Bruggy Boys (with Moe Berg)", are kept.
+
+    Args:
+        name (Optional[str]): The name to clean
+
+    Returns:
+        str: The cleaned name, or an empty string if it can't be salvaged
+    """
+    if not name:
+        return ""
+    name = name.strip()
+    if len(name) < MIN_NAME_LENGTH or '@' in name:
+        return ""
+    if name.endswith(')') and name.count(')') > name.count('('):
+        name = name.rstrip(')').rstrip()
+    if len(name) < MIN_NAME_LENGTH or INVALID_CHARACTERS.search(name):
+        return ""
+    return name
+
+def is_valid_name(name: Optional[str]) -> bool:
+    """
+    Check if a name survives cleaning.
+    """
+    return clean_name(name) != ""
+
+def clean_nickname(nickname: Optional[str]) -> str:
+    """
+    Clean a nickname field, treating placeholders like "None" as no nickname.
+    """
+    if not nickname or nickname.strip().lower() in MISSING_NICKNAMES:
+        return ""
+    return clean_name(nickname)
+
+def split_nicknames(nickname: str) -> List[str]:
+    """
+    Split a cleaned nickname field into its cleaned nicknames.
+
+    Args:
+        nickname (str): Output of clean_nickname()
+
+    Returns:
+        List[str]: Each nickname, e.g. ["Kid", "Red"] for "Kid or Red"
+    """
+    if not nickname:
+        return []
+    return [part for part in map(clean_name, NICKNAME_SEPARATOR.split(nickname)) if part]
+
+def clean_player(player: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a player record with its first name, last name and nickname cleaned.
+
+    Args:
+        player (Dict[str, Any]): Scraped player record
+
+    Returns:
+        Dict[str, Any]: The record, with names that failed cleaning blanked
+    """
+    cleaned = dict(player)
+    cleaned["first_name"] = clean_name(player.get("first_name"))
+    cleaned["last_name"] = clean_name(player.get("last_name"))
+    cleaned["nickname"] = clean_nickname(player.get("nickname"))
+    return cleaned
+
+class NameCounts:
+    """
+    Running counts of cleaned first names, last names and nicknames.
+    """
+
+    def __init__(self):
+        """Initialize empty counts."""
+        self.first_names = Counter()
+        self.last_names = Counter()
+        self.nicknames = Counter()
+        self.players = 0
+        self.players_with_nickname = 0
+        self.dropped_players = 0
+
+    def add(self, player: Dict[str, Any]) -> bool:
+        """
+        Count the names of a cleaned player.
+
+        Args:
+            player (Dict[str, Any]): Output of clean_player()
+
+        Returns:
+            bool: False if the player has no valid first or last name
+        """
+        self.players += 1
+        first = player["first_name"]
+        last = player["last_name"]
+        if not first and not last:
+            self.dropped_players += 1
+            return False
+        if first:
+            self.first_names[first] += 1
+        if last:
+            self.last_names[last] += 1
+        if player["nickname"]:
+            self.players_with_nickname += 1
+            self.nicknames.update(split_nicknames(player["nickname"]))
+        return True
+
+    def tables(self) -> Tuple[NameTable, NameTable, NameTable]:
+        """
+        Pack the counts into first name, last name and nickname tables, most common first.
+        """
+        return tuple(NameTable.from_pairs(counter.most_common())
+                     for counter in (self.first_names, self.last_names, self.nicknames))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize what was counted.
+        """
+        return {
+            "players": self.players,
+            "dropped_players": self.dropped_players,
+            "nickname_frequency": self.players_with_nickname / self.players if self.players else 0.0,
+            "unique_first_names": len(self.first_names),
+            "unique_last_names": len(self.last_names),
+            "unique_nicknames": len(self.nicknames)
+        }
+
+def count_names(players: Iterable[Dict[str, Any]]) -> NameCounts:
+    """
+    Clean and count the names of a stream of player records.
+    """
+    counts = NameCounts()
+    for player in players:
+        counts.add(clean_player(player))
+    return counts
+
+def _write_atomic(path: str, write):
+    """
+    Write a file through a temporary file, replacing the old one in one step.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+        write(f)
+    os.replace(temp_path, path)
+
+def _write_counts(path: str, counter: Counter):
+    """
+    Write name,count rows, most common first.
+    """
+    def write(f):
+        writer = csv.writer(f)
+        writer.writerow(["name", "count"])
+        writer.writerows(counter.most_common())
+    _write_atomic(path, write)
+
+def run_etl(player_file: str = PLAYER_FILE, cleaned_file: str = CLEANED_PLAYER_FILE,
+            count_files: Tuple[str, str, str] = COUNT_FILES) -> Dict[str, Any]:
+    """
+    Clean the player file and write the cleaned players and the name count tables.
+
+    Args:
+        player_file (str): Scraped player records, a JSON array
+        cleaned_file (str): Where to write the cleaned players
+        count_files (Tuple[str, str, str]): Where to write the first name,
+            last name and nickname counts
+
+    Returns:
+        Dict[str, Any]: Counts summary, see NameCounts.stats()
+    """
+    counts = NameCounts()
+    # Hashed before reading, so a player file changed mid-run leaves the tables stale
+    digests = file_digests(player_file)
+
+    def write_players(f):
+        # Same layout as json.dump(players, f, indent=2), one player at a time
+        f.write("[")
+        separator = "\n"
+        for player in iter_json_array(player_file):
+            player = clean_player(player)
+            if counts.add(player):
+                f.write(separator)
+                f.write(textwrap.indent(json.dumps(player, indent=2), "  "))
+                separator = ",\n"
+        f.write("\n]" if separator != "\n" else "]")
+
+    _write_atomic(cleaned_file, write_players)
+    for path, counter in zip(count_files, (counts.first_names, counts.last_names, counts.nicknames)):
+        _write_counts(path, counter)
+        write_source_digests(path, digests)
+    return counts.stats()
+
+def load_count_tables(player_file: str = PLAYER_FILE,
+                      count_files: Tuple[str, str, str] = COUNT_FILES) -> Optional[Tuple[NameTable, NameTable, NameTable]]:
+    """
+    Load the first name, last name and nickname counts, most common first.
+
+    Reads the count tables written by run_etl() when they were built from
+    the current player file, by content digest, and otherwise counts the
+    player file in memory.
+
+    Args:
+        player_file (str): Scraped player records
+        count_files (Tuple[str, str, str]): Count tables written by run_etl()
+
+    Returns:
+        Optional[Tuple[NameTable, NameTable, NameTable]]: The tables, or None
+            if there is no data
+    """
+    digests = file_digests(player_file)
+    if all(built_from(path, digests) for path in count_files):
+        tables = []
+        for path in count_files:
+            with startup_profiler.phase("parse"):
+                names, counts = load_name_columns(path, "name", "count")
+            with startup_profiler.phase("weight_build"):
+                tables.append(NameTable.from_columns(names, [int(count) for count in counts]))
+        return tuple(tables)
+
+    if not os.path.exists(player_file):
+        print(f"Data file not found: {player_file}")
+        return None
+
+    print(f"Name count tables are missing or weren't built from the current {player_file}; "
+          f"run clean_baseball_data.py to build them. Counting the player file instead.")
+    with startup_profiler.phase("aggregate"):
+        counts = count_names(iter_json_array(player_file))
+    with startup_profiler.phase("weight_build"):
+        return counts.tables()
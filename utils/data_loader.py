@@ -3,8 +3,17 @@ Data loading utilities for name generators.
 """
 
 import os
+import re
+import csv
 import json
-from typing import List, Tuple, Dict, Any
+from array import array
+from typing import List, Tuple, Dict, Any, Iterator, Optional
+
+# Extensions tried, in order, when a data file is given without one
+DATA_FILE_EXTENSIONS = (".csv", ".json")
+
+# Whitespace and the comma between two items of a JSON array
+_JSON_ITEM_SEPARATOR = re.compile(r"\s*,?\s*")
 
 def load_json_data(filepath: str) -> List[Dict[str, Any]]:
     """
@@ -28,23 +37,135 @@ def load_json_data(filepath: str) -> List[Dict[str, Any]]:
         print(f"Error loading data from {filepath}: {e}")
         return []
 
-def create_weighted_list(names: List[Tuple[str, float]], weight_multiplier: int = 1000) -> List[str]:
+def iter_json_array(filepath: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Stream the items of a JSON array file one at a time.
+    
+    Only one chunk of the file and one item are held in memory at once,
+    instead of the whole decoded list.
+    
+    Args:
+        filepath (str): Path to a file holding a JSON array
+        chunk_size (int): Characters read at a time
+        
+    Yields:
+        Any: Each item of the array, in order
+        
+    Raises:
+        ValueError: If the file doesn't hold a well-formed JSON array
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{filepath} does not hold a JSON array")
+        pos = 1
+        eof = False
+        while True:
+            pos = _JSON_ITEM_SEPARATOR.match(buffer, pos).end()
+            if buffer.startswith(']', pos):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                end = None
+            # An item running to the end of the buffer may continue in the next chunk
+            if end is None or (end == len(buffer) and not eof):
+                if eof:
+                    raise ValueError(f"{filepath} ends in the middle of a JSON array")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+            pos = end
+
+def find_data_file(path: str) -> Optional[str]:
+    """
+    Find a data file, trying each known extension when the path has none
+    or the file it names doesn't exist.
+    
+    Args:
+        path (str): Path to the data file, with or without an extension
+        
+    Returns:
+        Optional[str]: Path of the first file that exists, or None
+    """
+    if os.path.isfile(path):
+        return path
+    stem, ext = os.path.splitext(path)
+    if ext not in DATA_FILE_EXTENSIONS:
+        stem = path
+    for extension in DATA_FILE_EXTENSIONS:
+        candidate = stem + extension
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def detect_format(filepath: str) -> str:
+    """
+    Detect whether a data file holds JSON or CSV from its first non-blank character.
+    
+    Args:
+        filepath (str): Path to the data file
+        
+    Returns:
+        str: "json" or "csv"
+    """
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        while True:
+            chunk = f.read(256)
+            if not chunk:
+                return "csv"
+            chunk = chunk.lstrip()
+            if chunk:
+                return "json" if chunk[0] in "[{" else "csv"
+
+def load_name_columns(filepath: str, name_key: str, weight_key: str = "frequency") -> Tuple[List[str], array]:
     """
-    Create a weighted list of names for random selection.
+    Load the name and weight columns from a JSON or CSV data file.
+    
+    CSV files are streamed row by row with csv.reader, so no per-row dicts
+    are built. JSON files must be a list of records.
     
     Args:
-        names (List[Tuple[str, float]]): List of (name, frequency) tuples
-        weight_multiplier (int): Multiplier to convert frequencies to integer weights
+        filepath (str): Path to the data file
+        name_key (str): Field or column holding the name
+        weight_key (str): Field or column holding the weight
         
     Returns:
-        List[str]: Weighted list where names appear multiple times based on frequency
+        Tuple[List[str], array]: Names and their weights as float64
     """
-    weighted_list = []
-    for name, freq in names:
-        # Convert frequency to integer weight
-        weight = int(float(freq) * weight_multiplier)
-        weighted_list.extend([name] * weight)
-    return weighted_list
+    names = []
+    weights = array('d')
+    if not os.path.exists(filepath):
+        print(f"Data file not found: {filepath}")
+        return names, weights
+    
+    try:
+        if detect_format(filepath) == "json":
+            with open(filepath, 'r', encoding='utf-8-sig') as f:
+                for item in json.load(f):
+                    names.append(item[name_key])
+                    weights.append(float(item[weight_key]))
+            return names, weights
+        
+        with open(filepath, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            name_column = header.index(name_key)
+            weight_column = header.index(weight_key)
+            add_name = names.append
+            add_weight = weights.append
+            for row in reader:
+                if row:
+                    add_name(row[name_column])
+                    add_weight(float(row[weight_column]))
+        return names, weights
+    except Exception as e:
+        print(f"Error loading data from {filepath}: {e}")
+        return [], array('d')
 
 def format_name(name: str, capitalize: bool = True) -> str:
     """
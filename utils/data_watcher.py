@@ -0,0 +1,161 @@
+"""
+Reload generators when their data files change on disk.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+from utils.data_loader import DATA_FILE_EXTENSIONS
+
+def _data_key(path: str) -> str:
+    """
+    Normalize a data file path, dropping a .csv or .json extension.
+    """
+    path = os.path.realpath(path)
+    stem, extension = os.path.splitext(path)
+    return stem if extension in DATA_FILE_EXTENSIONS else path
+
+class DataFileHandler(FileSystemEventHandler):
+    """
+    Pass file events in the watched directories on to a DataWatcher.
+    """
+
+    def __init__(self, watcher: "DataWatcher"):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.file_changed(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.file_changed(event.src_path)
+
+    def on_moved(self, event):
+        # Files written to a temporary name and renamed into place
+        if not event.is_directory:
+            self.watcher.file_changed(event.dest_path)
+
+class DataWatcher:
+    """
+    Watch generator data files and reload a generator when one of its files changes.
+
+    Reloads run on a background timer thread once a file has been quiet for
+    `delay` seconds, so a file written in many chunks is only reloaded once.
+    The generator registry swaps the new generator in when it is built, and
+    requests keep using the old one until then.
+    """
+
+    def __init__(self, registry, data_files: Dict[str, Iterable[str]], delay: float = 1.0,
+                 on_reload: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            registry (GeneratorRegistry): Registry whose generators get reloaded
+            data_files (Dict[str, Iterable[str]]): Generator name to the data
+                files it is built from, with or without their .csv or .json extension
+            delay (float): Seconds to wait after the last change before reloading
+            on_reload (Optional[Callable[[str], None]]): Called with the name of
+                each generator that was rebuilt, e.g. to drop names made by the old one
+        """
+        self.registry = registry
+        self.delay = delay
+        self.on_reload = on_reload
+        self._targets: Dict[str, Set[str]] = {}
+        for name, paths in data_files.items():
+            for path in paths:
+                self._targets.setdefault(_data_key(path), set()).add(name)
+        self._timers: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+        self.observer: Optional[Observer] = None
+        self._fork_hook_registered = False
+
+    def start(self):
+        """
+        Start watching the directories of the data files.
+        """
+        observer = Observer()
+        handler = DataFileHandler(self)
+        for directory in sorted({os.path.dirname(key) for key in self._targets}):
+            if os.path.isdir(directory):
+                observer.schedule(handler, directory, recursive=False)
+            else:
+                print(f"Data directory not found, not watching: {directory}")
+        observer.daemon = True
+        observer.start()
+        self.observer = observer
+
+        # The observer thread doesn't survive fork, so each worker starts its own
+        if not self._fork_hook_registered and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_hook_registered = True
+
+    def stop(self):
+        """
+        Stop watching and cancel any pending reloads.
+        """
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+    def file_changed(self, path: str):
+        """
+        Schedule a reload of every generator built from a file.
+
+        Args:
+            path (str): Path of the created, modified or moved file
+        """
+        for name in sorted(self._targets.get(_data_key(path), ())):
+            self._schedule(name)
+
+    def _schedule(self, name: str):
+        """
+        (Re)start the reload timer of a generator.
+        """
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.delay, self._reload, args=(name,))
+            timer.daemon = True
+            self._timers[name] = timer
+            timer.start()
+
+    def _reload(self, name: str):
+        """
+        Rebuild a generator, keeping the old one if the rebuild fails.
+        """
+        with self._lock:
+            self._timers.pop(name, None)
+        try:
+            if self.registry.reload(name) is None:
+                return
+            print(f"Reloaded {name} generator after a data file change")
+        except Exception as e:
+            print(f"Error reloading {name} generator: {e}")
+            return
+        if self.on_reload is not None:
+            try:
+                self.on_reload(name)
+            except Exception as e:
+                print(f"Error after reloading {name} generator: {e}")
+
+    def _after_fork(self):
+        """
+        Restart the observer and any pending reloads in a forked child.
+        """
+        pending = list(self._timers)
+        self._lock = threading.Lock()
+        self._timers = {}
+        if self.observer is not None:
+            self.start()
+            for name in pending:
+                self._schedule(name)
@@ -0,0 +1,254 @@
+"""
+Process-wide cache of loaded name data, so each data file is parsed once.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+from utils.data_loader import find_data_file, load_name_columns
+from utils.name_table import NameTable, load_compiled_table
+from utils.startup_profiler import startup_profiler
+
+def file_digest(filepath: str) -> str:
+    """
+    Hash a file's contents.
+
+    Args:
+        filepath (str): Path to the file
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Suffix of the file recording the digests of the files a derived file was built from
+SOURCE_DIGEST_SUFFIX = ".sha256"
+
+def file_digests(*paths: str) -> Dict[str, str]:
+    """
+    Hash the files that exist among some paths.
+
+    Returns:
+        Dict[str, str]: Path to hex SHA-256 digest, without the missing files
+    """
+    return {path: file_digest(path) for path in paths if os.path.exists(path)}
+
+def write_source_digests(path: str, digests: Dict[str, str]):
+    """
+    Record what a derived file was built from, next to it in sha256sum format.
+
+    Modification times aren't kept by git, so a fresh clone can't tell
+    from them whether a committed derived file still matches its sources.
+
+    Args:
+        path (str): Derived file, e.g. a count table
+        digests (Dict[str, str]): Source path to digest, see file_digests()
+    """
+    temp_path = f"{path}{SOURCE_DIGEST_SUFFIX}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for source, digest in sorted(digests.items()):
+            f.write(f"{digest}  {os.path.basename(source)}\n")
+    os.replace(temp_path, path + SOURCE_DIGEST_SUFFIX)
+
+def built_from(path: str, digests: Dict[str, str]) -> bool:
+    """
+    Check that a derived file exists and was built from sources with these digests.
+
+    Args:
+        path (str): Derived file
+        digests (Dict[str, str]): Current digest of each source that exists;
+            with none left, any existing derived file is used
+
+    Returns:
+        bool: Whether the file can be used as it is
+    """
+    if not os.path.exists(path):
+        return False
+    if not digests:
+        return True
+    recorded = {}
+    try:
+        with open(path + SOURCE_DIGEST_SUFFIX, encoding='utf-8') as f:
+            for line in f:
+                digest, _, name = line.rstrip("\n").partition("  ")
+                recorded[name] = digest
+    except OSError:
+        return False
+    return all(recorded.get(os.path.basename(source)) == digest for source, digest in digests.items())
+
+def rank_name_table(names, weights) -> NameTable:
+    """
+    Pack name and weight columns into a table, most common first.
+
+    Ties keep their file order, so a name's index is its frequency rank.
+
+    Args:
+        names (Sequence): Names
+        weights (Sequence): Weight of each name
+
+    Returns:
+        NameTable: Names in rank order
+    """
+    order = _rank_order(weights)
+    return NameTable.from_columns([names[i] for i in order], [weights[i] for i in order])
+
+def rank_column_table(values, weights) -> NameTable:
+    """
+    Pack another column of a name file, e.g. each name's gender, into a
+    table in the same rank order as rank_name_table().
+
+    Args:
+        values (Sequence): Column values
+        weights (Sequence): Weight of each name, which sets the order
+
+    Returns:
+        NameTable: Values in rank order, each with weight 1
+    """
+    return NameTable.from_columns([values[i] for i in _rank_order(weights)], [1] * len(values))
+
+def _rank_order(weights) -> List[int]:
+    """
+    Get the row order of a data file's rank-ordered tables, most common first.
+    """
+    return sorted(range(len(weights)), key=weights.__getitem__, reverse=True)
+
+class DatasetRegistry:
+    """
+    Hands out one shared, read-only NameTable per data file and column.
+
+    Tables are keyed by file path and columns and remember the content hash
+    they were built from. Asking again for an unchanged file returns the
+    same table; a file whose contents changed is loaded again.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._tables: Dict[Tuple[str, str, str], Tuple[str, NameTable]] = {}
+        self._columns: Dict[Tuple[str, str, str], Tuple[str, Tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+
+    def name_table(self, path: str, name_key: str, weight_key: str = "frequency",
+                   compiled_path: Optional[str] = None) -> NameTable:
+        """
+        Get the rank-ordered table for a JSON or CSV name file.
+
+        Args:
+            path (str): Data file, with or without its .csv or .json extension
+            name_key (str): Column holding the name
+            weight_key (str): Column holding the weight
+            compiled_path (Optional[str]): Compiled table to map instead of
+                parsing, when it is at least as new as the data file
+
+        Returns:
+            NameTable: Shared table, empty if there is no data
+        """
+        source = find_data_file(path)
+        # Without the data file, fall back to the compiled table on its own
+        key_path = source or compiled_path
+        if key_path is None or not os.path.exists(key_path):
+            print(f"Data file not found: {path}")
+            return NameTable.from_columns([], [])
+
+        key = (os.path.realpath(key_path), name_key, weight_key)
+        with startup_profiler.phase(os.path.basename(key_path)):
+            with startup_profiler.phase("read"):
+                digest = file_digest(key_path)
+            with self._lock:
+                cached = self._tables.get(key)
+                if cached is not None and cached[0] == digest:
+                    return cached[1]
+
+                table = None
+                if compiled_path:
+                    with startup_profiler.phase("read_compiled"):
+                        table = load_compiled_table(compiled_path, source)
+                if table is None:
+                    if source is None:
+                        return NameTable.from_columns([], [])
+                    with startup_profiler.phase("parse"):
+                        names, weights = load_name_columns(source, name_key, weight_key)
+                    with startup_profiler.phase("weight_build"):
+                        table = rank_name_table(names, weights)
+                self._tables[key] = (digest, table)
+                return table
+
+    def column(self, path: str, key: str, weight_key: str = "frequency",
+               compiled_path: Optional[str] = None) -> Tuple[str, ...]:
+        """
+        Get another column of a JSON or CSV name file, e.g. each name's
+        gender, in the same rank order as name_table().
+
+        Args:
+            path (str): Data file, with or without its .csv or .json extension
+            key (str): Column to read
+            weight_key (str): Column holding the weight, which sets the order
+            compiled_path (Optional[str]): Compiled column (see rank_column_table)
+                to map instead of parsing, when it is at least as new as the data file
+
+        Returns:
+            Tuple[str, ...]: Shared column, with one interned value per name,
+                empty if there is no data
+        """
+        source = find_data_file(path)
+        # Without the data file, fall back to the compiled column on its own
+        key_path = source or compiled_path
+        if key_path is None or not os.path.exists(key_path):
+            return ()
+
+        cache_key = (os.path.realpath(key_path), key, weight_key)
+        with startup_profiler.phase(os.path.basename(key_path)):
+            with startup_profiler.phase("read"):
+                digest = file_digest(key_path)
+            with self._lock:
+                cached = self._columns.get(cache_key)
+                if cached is not None and cached[0] == digest:
+                    return cached[1]
+
+                table = None
+                if compiled_path:
+                    with startup_profiler.phase("read_compiled"):
+                        table = load_compiled_table(compiled_path, source)
+                if table is not None:
+                    column = tuple(sys.intern(value) for value in table)
+                elif source is None:
+                    return ()
+                else:
+                    with startup_profiler.phase("parse"):
+                        values, weights = load_name_columns(source, key, weight_key)
+                    column = tuple(sys.intern(values[i]) for i in _rank_order(weights))
+                self._columns[cache_key] = (digest, column)
+                return column
+
+    def table_digest(self, table: NameTable) -> Optional[str]:
+        """
+        Get the content hash of the data file a shared table was loaded from.
+
+        Args:
+            table (NameTable): Table returned by name_table()
+
+        Returns:
+            Optional[str]: Hex SHA-256 digest, or None if the table isn't registered
+        """
+        with self._lock:
+            for digest, cached in self._tables.values():
+                if cached is table:
+                    return digest
+        return None
+
+    def clear(self):
+        """Forget every cached table."""
+        with self._lock:
+            self._tables.clear()
+            self._columns.clear()
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+# Shared by every generator in the process
+dataset_registry = DatasetRegistry()
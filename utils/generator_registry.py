@@ -0,0 +1,231 @@
+"""
+Lazily built name generators, shared by the web app.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+from utils.startup_profiler import startup_profiler
+from utils.metrics import metrics, LOAD_BUCKETS
+
+LOAD_SECONDS = metrics.histogram(
+    "namegen_generator_load_seconds", "Time to build a generator, at startup or on a data reload",
+    ("generator", "kind"), buckets=LOAD_BUCKETS
+)
+LOAD_FAILURES = metrics.counter(
+    "namegen_generator_load_failures_total", "Generator builds and reloads that raised", ("generator", "kind")
+)
+
+class LazyGenerator:
+    """
+    Build a generator on first use, exactly once, and record how long it took.
+
+    State is one of "pending", "loading", "ready" or "failed". A failed
+    build is retried on the next call to get().
+
+    reload() builds a replacement while the current generator keeps serving,
+    then publishes it with a single reference swap.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        """
+        Initialize the lazy generator.
+
+        Args:
+            name (str): Name reported in status()
+            factory (Callable[[], Any]): Builds the generator
+        """
+        self.name = name
+        self.factory = factory
+        self.state = "pending"
+        self.build_seconds = None
+        self.error = None
+        self.reloads = 0
+        self.reload_error = None
+        self._instance = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def get(self) -> Any:
+        """
+        Get the generator, building it first if needed.
+
+        Returns:
+            Any: The generator
+
+        Raises:
+            Exception: Whatever the factory raised, if the build failed
+        """
+        instance = self._instance
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if self._instance is None:
+                self._build()
+            return self._instance
+
+    def _build(self):
+        """
+        Run the factory. Must be called with the lock held.
+        """
+        self.state = "loading"
+        self.error = None
+        start = time.perf_counter()
+        try:
+            with startup_profiler.phase(self.name):
+                instance = self.factory()
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            LOAD_FAILURES.labels(self.name, "build").inc()
+            raise
+        finally:
+            self.build_seconds = time.perf_counter() - start
+        LOAD_SECONDS.labels(self.name, "build").observe(self.build_seconds)
+        self._instance = instance
+        self.state = "ready"
+
+    def reload(self) -> Any:
+        """
+        Build a fresh generator and swap it in.
+
+        Callers that already hold the old generator finish with it; later
+        calls to get() return the new one. If the build fails, the old
+        generator stays in place.
+
+        Returns:
+            Any: The new generator, or None if it hasn't been built yet
+                (it will read the current files when it is)
+
+        Raises:
+            Exception: Whatever the factory raised
+        """
+        with self._reload_lock:
+            if self._instance is None:
+                return None
+
+            start = time.perf_counter()
+            try:
+                instance = self.factory()
+            except Exception as e:
+                self.reload_error = str(e)
+                LOAD_FAILURES.labels(self.name, "reload").inc()
+                raise
+            self._instance = instance
+            self.build_seconds = time.perf_counter() - start
+            LOAD_SECONDS.labels(self.name, "reload").observe(self.build_seconds)
+            self.reloads += 1
+            self.reload_error = None
+            return instance
+
+    @property
+    def ready(self) -> bool:
+        return self._instance is not None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Report the load state and build time.
+        """
+        return {
+            "state": self.state,
+            "build_seconds": None if self.build_seconds is None else round(self.build_seconds, 4),
+            "error": self.error,
+            "reloads": self.reloads,
+            "reload_error": self.reload_error
+        }
+
+    def _reset_after_fork(self):
+        """
+        Drop a lock that a thread in the parent process may have been holding.
+        """
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        if self._instance is None:
+            self.state = "pending"
+
+class GeneratorRegistry:
+    """
+    A set of lazily built generators with an optional background warm-up.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        """
+        Initialize the registry.
+
+        Args:
+            factories (Dict[str, Callable[[], Any]]): Generator name to factory
+        """
+        self.generators = {name: LazyGenerator(name, factory) for name, factory in factories.items()}
+        self._warm_up_names = None
+        # Threads don't survive fork, so a worker forked mid warm-up finishes it itself
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def get(self, name: str) -> Any:
+        """
+        Get a generator by name, building it on first use.
+        """
+        return self.generators[name].get()
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Build generators ahead of the first request.
+
+        Args:
+            names (Optional[Iterable[str]]): Generators to build, all of them by default
+            background (bool): Build on a daemon thread instead of blocking
+
+        Returns:
+            Optional[threading.Thread]: The warm-up thread, if one was started
+        """
+        self._warm_up_names = list(self.generators if names is None else names)
+        if not background:
+            self._warm_up(self._warm_up_names)
+            return None
+
+        thread = threading.Thread(target=self._warm_up, args=(self._warm_up_names,),
+                                  name="generator-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self, names: Iterable[str]):
+        """
+        Build each generator in turn, carrying on past failures.
+        """
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Error warming up {name} generator: {e}")
+
+    def _after_fork(self):
+        """
+        Reset locks in a forked child and restart any unfinished warm-up.
+        """
+        for generator in self.generators.values():
+            generator._reset_after_fork()
+        if self._warm_up_names is not None:
+            pending = [name for name in self._warm_up_names if not self.generators[name].ready]
+            if pending:
+                self.warm_up(pending)
+
+    def reload(self, name: str) -> Any:
+        """
+        Rebuild a generator from its data files and swap it in, see LazyGenerator.reload().
+        """
+        return self.generators[name].reload()
+
+    def ready(self, names: Optional[Iterable[str]] = None) -> bool:
+        """
+        Check whether every generator (or every named one) has been built.
+        """
+        names = self.generators if names is None else names
+        return all(self.generators[name].ready for name in names)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Report the load state and build time of every generator.
+        """
+        return {name: generator.status() for name, generator in self.generators.items()}
@@ -0,0 +1,97 @@
+"""
+Memory footprint of generators, broken down by structure.
+"""
+
+import mmap
+import sys
+import types
+from array import array
+from typing import Any, Dict, Iterable, Optional
+import numpy as np
+
+# Code and classes belong to the process, not to any one generator
+_NOT_COUNTED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+def _referents(obj: Any) -> Iterable[Any]:
+    """
+    Get the objects a structure holds that count towards its size.
+    """
+    if isinstance(obj, _NOT_COUNTED):
+        return
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            yield key
+            yield value
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        yield from obj
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            yield from obj.flat
+        if obj.base is not None:
+            yield obj.base
+    elif isinstance(obj, memoryview):
+        yield obj.obj
+    elif not isinstance(obj, (str, bytes, bytearray, int, float, complex, bool, range, array, mmap.mmap, type(None))):
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if hasattr(obj, slot):
+                    yield getattr(obj, slot)
+        if hasattr(obj, "__dict__"):
+            yield obj.__dict__
+
+def _own_size(obj: Any):
+    """
+    Get the bytes an object holds itself, split into private and shared.
+
+    mmaps (name tables, compiled files and snapshots) are shared: forked
+    workers map the same pages, so they count once per machine, not per
+    worker. Arrays that view another buffer own only their header.
+    """
+    if isinstance(obj, _NOT_COUNTED):
+        return 0, 0
+    if isinstance(obj, mmap.mmap):
+        return 0, len(obj)
+    if isinstance(obj, np.ndarray) and obj.base is not None:
+        return sys.getsizeof(obj) - (obj.nbytes if obj.flags.owndata else 0), 0
+    return sys.getsizeof(obj), 0
+
+def memory_report(obj: Any, attributes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Break down the memory held by an object's attributes.
+
+    Every object reachable from an attribute is counted once, under the
+    first attribute (in the order given) that reaches it. Name tables
+    shared by two samplers are counted under whichever comes first.
+
+    Args:
+        obj (Any): Object to measure, e.g. a generator
+        attributes (Optional[Iterable[str]]): Attributes to measure, all
+            instance attributes by default
+
+    Returns:
+        Dict[str, Any]: For each attribute, its private and shared bytes,
+            plus totals over all of them
+    """
+    if attributes is None:
+        attributes = list(vars(obj))
+    seen = {id(obj), id(getattr(obj, "__dict__", None))}
+    structures = {}
+    for attribute in attributes:
+        private = shared = 0
+        stack = [getattr(obj, attribute)]
+        while stack:
+            item = stack.pop()
+            if id(item) in seen:
+                continue
+            seen.add(id(item))
+            own_private, own_shared = _own_size(item)
+            private += own_private
+            shared += own_shared
+            stack.extend(_referents(item))
+        structures[attribute] = {"bytes": private, "shared_bytes": shared}
+
+    return {
+        "structures": structures,
+        "total_bytes": sum(s["bytes"] for s in structures.values()),
+        "total_shared_bytes": sum(s["shared_bytes"] for s in structures.values())
+    }
@@ -0,0 +1,394 @@
+"""
+In-process metrics, exposed in the Prometheus text format.
+
+Counters and histograms keep one cell per thread for each label set, so
+recording a value never takes a lock: a thread only ever adds to its own
+cell, and collection sums the cells. A lock is only taken the first time a
+thread records into a label set. Values are per process; with several
+gunicorn workers each one reports its own.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from threading import get_ident
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds, from a pooled request to a large bulk one
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Names per request or per call
+SIZE_BUCKETS = (1, 5, 10, 20, 50, 100, 500, 1000, 10000, 100000, 1000000)
+# Seconds to build a generator
+LOAD_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value, dropping the fraction of whole numbers.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Format a label set, e.g. {type="census",status="200"}.
+    """
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+class _Series:
+    """
+    One label set of a metric, holding a cell per recording thread.
+    """
+
+    __slots__ = ("size", "cells", "lock")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.cells: Dict[int, List[float]] = {}
+        self.lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        """
+        Get the calling thread's cell, creating it on first use.
+        """
+        cell = self.cells.get(get_ident())
+        if cell is None:
+            with self.lock:
+                cell = self.cells.setdefault(get_ident(), [0.0] * self.size)
+        return cell
+
+    def totals(self) -> List[float]:
+        """
+        Sum the cells of every thread.
+        """
+        with self.lock:
+            cells = list(self.cells.values())
+        totals = [0.0] * self.size
+        for cell in cells:
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+class Metric:
+    """
+    A named metric with optional labels.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): Metric name, e.g. "namegen_requests_total"
+            documentation (str): Help text
+            labelnames (Iterable[str]): Names of the labels, in order
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _cell_size(self) -> int:
+        return 1
+
+    def _get_series(self, values: Tuple[str, ...]) -> _Series:
+        """
+        Get the series for a label set, creating it on first use.
+        """
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with self._lock:
+                series = self._series.setdefault(values, _Series(self._cell_size()))
+        return series
+
+    def samples(self) -> List[str]:
+        """
+        Get the exposition lines of every label set.
+        """
+        raise NotImplementedError("Subclasses must implement samples()")
+
+    def _label_sets(self) -> List[Tuple[Tuple[str, ...], _Series]]:
+        with self._lock:
+            return sorted(self._series.items())
+
+    def _reset_after_fork(self):
+        """
+        Drop locks that a thread in the parent process may have been holding.
+        """
+        self._lock = threading.Lock()
+        for series in self._series.values():
+            series.lock = threading.Lock()
+
+class Counter(Metric):
+    """
+    A value that only goes up, e.g. requests served.
+    """
+
+    kind = "counter"
+
+    def labels(self, *values: str) -> "BoundCounter":
+        """
+        Get the counter for one label set. Keep it to skip the lookup on every update.
+        """
+        return BoundCounter(self._get_series(tuple(str(value) for value in values)))
+
+    def inc(self, amount: float = 1):
+        """Add to a counter without labels."""
+        self._get_series(()).cell()[0] += amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.totals()[0])}"
+                for values, series in self._label_sets()]
+
+class BoundCounter:
+    """
+    A counter for one label set.
+    """
+
+    __slots__ = ("_series",)
+
+    def __init__(self, series: _Series):
+        self._series = series
+
+    def inc(self, amount: float = 1):
+        """Add to the counter."""
+        self._series.cell()[0] += amount
+
+class Histogram(Metric):
+    """
+    Distribution of observed values, e.g. request latency, in cumulative buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): Metric name, e.g. "namegen_request_duration_seconds"
+            documentation (str): Help text
+            labelnames (Iterable[str]): Names of the labels, in order
+            buckets (Sequence[float]): Upper bounds of the buckets, in increasing order
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+
+    def _cell_size(self) -> int:
+        # A count per bucket, one for +Inf, then the sum
+        return len(self.buckets) + 2
+
+    def labels(self, *values: str) -> "BoundHistogram":
+        """
+        Get the histogram for one label set. Keep it to skip the lookup on every observation.
+        """
+        return BoundHistogram(self._get_series(tuple(str(value) for value in values)), self.buckets)
+
+    def observe(self, value: float):
+        """Record a value in a histogram without labels."""
+        BoundHistogram(self._get_series(()), self.buckets).observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        # Bounds keep their fraction, e.g. le="1.0", as the official clients write them
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        for values, series in self._label_sets():
+            totals = series.totals()
+            cumulative = 0.0
+            for bound, count in zip(bounds, totals):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(totals[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+class BoundHistogram:
+    """
+    A histogram for one label set.
+    """
+
+    __slots__ = ("_series", "_buckets")
+
+    def __init__(self, series: _Series, buckets: Tuple[float, ...]):
+        self._series = series
+        self._buckets = buckets
+
+    def observe(self, value: float):
+        """Record a value."""
+        cell = self._series.cell()
+        cell[bisect_left(self._buckets, value)] += 1
+        cell[-1] += value
+
+class Gauge(Metric):
+    """
+    A value read when the metrics are collected, e.g. how full a pool is.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 read: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        """
+        Initialize the gauge.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (Iterable[str]): Names of the labels, in order
+            read (Callable[[], Dict[Tuple[str, ...], float]]): Returns the
+                current value of each label set
+        """
+        super().__init__(name, documentation, labelnames)
+        self.read = read
+
+    def samples(self) -> List[str]:
+        values = self.read() if self.read is not None else {}
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(values.items())]
+
+class MetricsRegistry:
+    """
+    The metrics of a process, rendered together for a /metrics endpoint.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _register(self, metric: Metric) -> Metric:
+        """
+        Add a metric, or return the one already registered under its name.
+        """
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered as a different {existing.kind}")
+        return existing
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Get or register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Get or register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str],
+              read: Callable[[], Dict[Tuple[str, ...], float]]) -> Gauge:
+        """Get or register a gauge whose values are read at collection time."""
+        return self._register(Gauge(name, documentation, labelnames, read))
+
+    def exposition(self) -> str:
+        """
+        Render every metric in the Prometheus text format.
+
+        Returns:
+            str: The text for a /metrics response, see CONTENT_TYPE
+        """
+        with self._lock:
+            registered = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in registered:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _after_fork(self):
+        """
+        Drop locks that a thread in the parent process may have been holding.
+
+        Values recorded before the fork, like generator load times, are kept.
+        """
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._reset_after_fork()
+
+# Shared by the app and every generator in the process
+metrics = MetricsRegistry()
+
+generation_seconds = metrics.histogram(
+    "namegen_generation_duration_seconds", "Time spent in a generator method",
+    ("generator", "method")
+)
+generation_names = metrics.histogram(
+    "namegen_generation_names", "Names made per generator method call",
+    ("generator", "method"), buckets=SIZE_BUCKETS
+)
+
+# Set on threads whose generator calls aren't recorded, see untimed()
+_untimed = threading.local()
+
+@contextmanager
+def untimed() -> Iterator[None]:
+    """
+    Skip recording generator calls made on this thread, e.g. benchmark runs.
+    """
+    previous = getattr(_untimed, "active", False)
+    _untimed.active = True
+    try:
+        yield
+    finally:
+        _untimed.active = previous
+
+def timed_generation(method: Callable) -> Callable:
+    """
+    Record the duration and size of every call to a generator method.
+
+    The generator label is the class name without "NameGenerator", e.g.
+    "census"; the sum of namegen_generation_names gives names per second.
+
+    Args:
+        method (Callable): Method returning a list of names or a NameBatch
+
+    Returns:
+        Callable: The wrapped method
+    """
+    bound: Dict[type, Tuple[BoundHistogram, BoundHistogram]] = {}
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(_untimed, "active", False):
+            return method(self, *args, **kwargs)
+        histograms = bound.get(type(self))
+        if histograms is None:
+            generator = type(self).__name__.replace("NameGenerator", "").lower()
+            histograms = (generation_seconds.labels(generator, method.__name__),
+                          generation_names.labels(generator, method.__name__))
+            bound[type(self)] = histograms
+        start = time.perf_counter()
+        names = method(self, *args, **kwargs)
+        histograms[0].observe(time.perf_counter() - start)
+        histograms[1].observe(len(names))
+        return names
+
+    return wrapper
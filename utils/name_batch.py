@@ -0,0 +1,116 @@
+"""
+Batches of generated names backed by NumPy index arrays.
+"""
+
+import sys
+from collections.abc import Sequence
+from typing import Callable, Iterator, List, Optional
+import numpy as np
+
+# Names per chunk when streaming, enough to keep NumPy busy without holding many strings
+STREAM_CHUNK_SIZE = 10000
+
+def chunk_sizes(count: int, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[int]:
+    """
+    Split a number of names into chunks.
+
+    Args:
+        count (int): Total number of names
+        chunk_size (int): Most names in one chunk
+
+    Returns:
+        Iterator[int]: Size of each chunk, all chunk_size but the last
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    for start in range(0, count, chunk_size):
+        yield min(chunk_size, count - start)
+
+def format_column(names: Sequence, formatter: Optional[Callable[[str], str]] = None) -> np.ndarray:
+    """
+    Format every distinct name once and store them in an object array.
+
+    Formatted names are interned, so generators formatting the same names
+    (e.g. the census and funny generators) share one copy of each string.
+
+    Args:
+        names (Sequence): Distinct names, in sampler order
+        formatter (Optional[Callable[[str], str]]): Function applied to each name
+
+    Returns:
+        np.ndarray: Object array of formatted names, indexable by sampler index
+    """
+    column = np.empty(len(names), dtype=object)
+    column[:] = [sys.intern(formatter(name)) for name in names] if formatter else [sys.intern(name) for name in names]
+    return column
+
+class NameBatch(Sequence):
+    """
+    A batch of generated names stored as index arrays.
+
+    Strings are only built when the batch is read, either one at a time
+    through indexing and iteration or all at once with tolist().
+    """
+
+    __slots__ = ("first_names", "last_names", "first_idx", "last_idx", "nicknames", "nickname_idx")
+
+    def __init__(self, first_names: np.ndarray, last_names: np.ndarray,
+                 first_idx: np.ndarray, last_idx: np.ndarray,
+                 nicknames: Optional[np.ndarray] = None, nickname_idx: Optional[np.ndarray] = None):
+        """
+        Initialize the batch.
+
+        Args:
+            first_names (np.ndarray): Formatted first names
+            last_names (np.ndarray): Formatted last names
+            first_idx (np.ndarray): Index into first_names for each name
+            last_idx (np.ndarray): Index into last_names for each name
+            nicknames (Optional[np.ndarray]): Formatted nicknames
+            nickname_idx (Optional[np.ndarray]): Index into nicknames, -1 for no nickname
+        """
+        self.first_names = first_names
+        self.last_names = last_names
+        self.first_idx = first_idx
+        self.last_idx = last_idx
+        self.nicknames = nicknames
+        self.nickname_idx = nickname_idx
+
+    def __len__(self) -> int:
+        return len(self.first_idx)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NameBatch(
+                self.first_names, self.last_names,
+                self.first_idx[index], self.last_idx[index],
+                self.nicknames, None if self.nickname_idx is None else self.nickname_idx[index]
+            )
+
+        first = self.first_names[self.first_idx[index]]
+        last = self.last_names[self.last_idx[index]]
+        if self.nickname_idx is not None and self.nickname_idx[index] >= 0:
+            nickname = self.nicknames[self.nickname_idx[index]]
+            return f"{first} \"{nickname}\" {last}"
+        return f"{first} {last}"
+
+    def __iter__(self):
+        # Build strings in chunks so iteration stays cheap without materializing everything
+        chunk_size = 10000
+        for start in range(0, len(self), chunk_size):
+            yield from self[start:start + chunk_size].tolist()
+
+    def tolist(self) -> List[str]:
+        """
+        Materialize every name in the batch.
+
+        Returns:
+            List[str]: Formatted names
+        """
+        names = self.first_names[self.first_idx] + " " + self.last_names[self.last_idx]
+        if self.nickname_idx is not None:
+            has_nickname = self.nickname_idx >= 0
+            if has_nickname.any():
+                nicknames = self.nicknames[self.nickname_idx[has_nickname]]
+                names[has_nickname] = (self.first_names[self.first_idx[has_nickname]] + " \"" +
+                                       nicknames + "\" " + self.last_names[self.last_idx[has_nickname]])
+        return names.tolist()
@@ -0,0 +1,252 @@
+"""
+Pools of pre-generated names for small, unseeded requests.
+
+Each request type gets a bounded FIFO of names made ahead of time by a
+background thread. A small request takes its names off the front instead
+of generating them; when a pool falls below its low-water mark it is
+topped up again. Requests that need exact generation (a seed, a gender,
+more names than a pool serves) bypass the pools.
+
+Names are generated in blocks by the type's normal generate function. For
+types whose sets promise no repeats, like funny names (no first or last name
+twice) and baseball names (no nickname twice), a request is served from a
+single block so the promise still holds; the rest of a block too short for
+it is dropped.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+class NamePool:
+    """
+    Bounded FIFO of pre-generated names for one request type.
+    """
+
+    def __init__(self, produce: Callable[[int], List[str]], capacity: int = 1000,
+                 low_water: Optional[int] = None, block_size: int = 100, split_blocks: bool = True):
+        """
+        Initialize an empty pool.
+
+        Args:
+            produce (Callable[[int], List[str]]): Generates n names
+            capacity (int): Most names held
+            low_water (Optional[int]): Refill when fewer names are left, half the capacity by default
+            block_size (int): Names generated per call to produce
+            split_blocks (bool): Whether one request may take names from two blocks
+        """
+        self.produce = produce
+        self.capacity = capacity
+        self.low_water = capacity // 2 if low_water is None else low_water
+        self.block_size = block_size
+        self.split_blocks = split_blocks
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+        self._blocks = deque()
+        self._offset = 0
+        self._size = 0
+        # Bumped by clear(), so a refill already under way drops its stale block
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def needs_refill(self) -> bool:
+        """Check whether the pool is below its low-water mark."""
+        return self._size < self.low_water
+
+    def take(self, count: int) -> Optional[List[str]]:
+        """
+        Take names off the front of the pool.
+
+        Args:
+            count (int): Number of names
+
+        Returns:
+            Optional[List[str]]: The names, or None if the pool can't serve
+                the request and the caller should generate them
+        """
+        with self._lock:
+            if count > (self.capacity if self.split_blocks else self.block_size) or count > self._size:
+                self.misses += 1
+                return None
+
+            names = []
+            while len(names) < count:
+                block = self._blocks[0]
+                remaining = len(block) - self._offset
+                wanted = count - len(names)
+                if remaining < wanted and not self.split_blocks:
+                    self._drop_head(remaining)
+                    if count > self._size:
+                        self.misses += 1
+                        return None
+                    continue
+                part = block[self._offset:self._offset + wanted]
+                names.extend(part)
+                self._offset += len(part)
+                self._size -= len(part)
+                if self._offset == len(block):
+                    self._blocks.popleft()
+                    self._offset = 0
+
+            self.hits += 1
+            return names
+
+    def _drop_head(self, remaining: int):
+        """
+        Drop what is left of the first block. Must be called with the lock held.
+        """
+        self._blocks.popleft()
+        self._offset = 0
+        self._size -= remaining
+        self.dropped += remaining
+
+    def refill(self):
+        """
+        Generate blocks until the pool is full. Names are generated outside the lock.
+        """
+        while self._size + self.block_size <= self.capacity:
+            generation = self._generation
+            block = self.produce(self.block_size)
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                self._blocks.append(block)
+                self._size += len(block)
+
+    def clear(self):
+        """
+        Drop every pooled name, e.g. after the generator behind them is reloaded.
+        """
+        with self._lock:
+            self.dropped += self._size
+            self._blocks.clear()
+            self._offset = 0
+            self._size = 0
+            self._generation += 1
+
+    def status(self) -> Dict[str, int]:
+        """
+        Report the fill level and how requests were served.
+        """
+        return {
+            "size": self._size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped": self.dropped
+        }
+
+    def _reset_after_fork(self):
+        """
+        Drop the names made in the parent, so workers don't all serve the same
+        ones, and a lock that a thread in the parent may have been holding.
+        """
+        self._lock = threading.Lock()
+        self._blocks = deque()
+        self._offset = 0
+        self._size = 0
+
+class NamePools:
+    """
+    A set of name pools sharing one background refill thread.
+
+    The thread starts on first use, so a pool is never filled before
+    gunicorn forks its workers.
+    """
+
+    def __init__(self, pools: Dict[str, NamePool]):
+        """
+        Initialize the pools.
+
+        Args:
+            pools (Dict[str, NamePool]): Request type to pool
+        """
+        self.pools = pools
+        self._wake = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def take(self, kind: str, count: int) -> Optional[List[str]]:
+        """
+        Take names from a type's pool, scheduling a refill when it runs low.
+
+        Args:
+            kind (str): Request type
+            count (int): Number of names
+
+        Returns:
+            Optional[List[str]]: The names, or None if the caller should generate them
+        """
+        pool = self.pools.get(kind)
+        if pool is None:
+            return None
+        names = pool.take(count)
+        if pool.needs_refill():
+            self._start()
+            self._wake.set()
+        return names
+
+    def _start(self):
+        """
+        Start the refill thread if it isn't running.
+        """
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refill_loop, name="name-pool-refill", daemon=True)
+                self._thread.start()
+
+    def _refill_loop(self):
+        """
+        Top up every pool below its low-water mark, then wait to be woken.
+        """
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            for kind, pool in self.pools.items():
+                if pool.needs_refill():
+                    try:
+                        pool.refill()
+                    except Exception as e:
+                        print(f"Error refilling the {kind} name pool: {e}")
+
+    def clear(self, kinds: Iterable[str]):
+        """
+        Empty the pools of some request types and fill them again in the background.
+
+        Args:
+            kinds (Iterable[str]): Request types, those without a pool are skipped
+        """
+        cleared = False
+        for kind in kinds:
+            pool = self.pools.get(kind)
+            if pool is not None:
+                pool.clear()
+                cleared = True
+        if cleared:
+            self._start()
+            self._wake.set()
+
+    def status(self) -> Dict[str, Dict[str, int]]:
+        """
+        Report the fill level and hit rate of every pool.
+        """
+        return {kind: pool.status() for kind, pool in self.pools.items()}
+
+    def _after_fork(self):
+        """
+        Empty the pools in a forked child; its refill thread starts on first use.
+        """
+        self._wake = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        for pool in self.pools.values():
+            pool._reset_after_fork()
@@ -0,0 +1,268 @@
+"""
+Flat name tables that can be shared between processes.
+
+A NameTable keeps names and their weights in one contiguous buffer instead
+of lists of Python strings and tuples:
+
+    header   magic, version, flags, name count and pool size
+    offsets  int64[count + 1], where each name starts in the pool
+    weights  float64[count]
+    prob     float64[count], alias table acceptance probabilities
+    alias    int64[count], alias table indices
+    pool     UTF-8 bytes of every name, back to back
+
+Nothing in the buffer carries a reference count, so tables built before
+gunicorn forks its workers (--preload) stay on the same physical pages in
+every worker. Names are only decoded to str when they are read.
+
+The same layout is used for compiled dataset files: save() writes a table
+and load() maps it read-only, so loading needs no parsing at all. Arrays
+are stored in native byte order.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+from typing import List, Optional, Tuple
+from utils.samplers import build_alias_table
+
+MAGIC = b"NMTB"
+VERSION = 1
+# magic, version, flags, reserved, name count, pool size
+HEADER = struct.Struct("<4sIIIQQ")
+
+# Weights were whole numbers (counts) and are returned as ints
+FLAG_INTEGER_WEIGHTS = 1
+
+class NameTable(Sequence):
+    """
+    Read-only sequence of names backed by a flat buffer.
+
+    Indexing returns the name; pairs gives (name, weight) tuples, the same
+    shape as the lists the generators used to keep.
+    """
+
+    __slots__ = ("buffer", "flags", "offsets", "weights", "prob", "alias", "pool", "pairs")
+
+    def __init__(self, buffer):
+        """
+        Open a table over an existing buffer.
+
+        Args:
+            buffer: bytes, bytearray or mmap holding a packed table
+        """
+        view = memoryview(buffer)
+        magic, version, flags, _, count, pool_size = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Buffer does not hold a name table")
+        if version != VERSION:
+            raise ValueError(f"Unsupported name table version: {version}")
+
+        if len(view) < HEADER.size + (4 * count + 1) * 8 + pool_size:
+            raise ValueError("Name table is truncated")
+
+        self.buffer = buffer
+        self.flags = flags
+        start = HEADER.size
+        self.offsets, start = _section(view, start, count + 1, 'q')
+        self.weights, start = _section(view, start, count, 'd')
+        self.prob, start = _section(view, start, count, 'd')
+        self.alias, start = _section(view, start, count, 'q')
+        self.pool = view[start:start + pool_size]
+        self.pairs = NamePairs(self)
+
+    @classmethod
+    def from_pairs(cls, pairs: List[Tuple[str, float]], shared: bool = True) -> "NameTable":
+        """
+        Pack a list of (name, weight) tuples into a new table.
+
+        Args:
+            pairs (List[Tuple[str, float]]): Names with their weights, in the order to keep
+            shared (bool): Put the table in an anonymous shared mapping so
+                forked workers read the parent's pages
+
+        Returns:
+            NameTable: The packed table
+        """
+        return cls.from_columns([name for name, _ in pairs], [weight for _, weight in pairs], shared)
+
+    @classmethod
+    def from_columns(cls, names: Sequence, weights: Sequence, shared: bool = True) -> "NameTable":
+        """
+        Pack parallel name and weight columns into a new table.
+
+        Args:
+            names (Sequence): Names, in the order to keep
+            weights (Sequence): Weight of each name
+            shared (bool): Put the table in an anonymous shared mapping so
+                forked workers read the parent's pages
+
+        Returns:
+            NameTable: The packed table
+        """
+        data = pack_table(names, weights)
+        if not shared:
+            return cls(data)
+        buffer = mmap.mmap(-1, len(data))
+        buffer.write(data)
+        return cls(buffer)
+
+    @classmethod
+    def load(cls, path: str) -> "NameTable":
+        """
+        Map a compiled table file read-only.
+
+        Args:
+            path (str): Path written by save()
+
+        Returns:
+            NameTable: Table backed by the file's pages
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def save(self, path: str):
+        """
+        Write the table to a file, replacing any existing file atomically.
+
+        Args:
+            path (str): Output path
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(self.buffer)
+        os.replace(temp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("name table index out of range")
+        return str(self.pool[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def weight(self, index: int):
+        """
+        Get the weight of one name, as an int if the table was built from counts.
+        """
+        weight = self.weights[index]
+        return int(weight) if self.flags & FLAG_INTEGER_WEIGHTS else weight
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the packed table in bytes."""
+        return len(self.buffer)
+
+class NamePairs(Sequence):
+    """
+    (name, weight) view over a NameTable, built on access.
+    """
+
+    __slots__ = ("table",)
+
+    def __init__(self, table: NameTable):
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self.table[index], self.table.weight(index)
+
+class NameSubset(Sequence):
+    """
+    Read-only view of some of a table's names, in a given order.
+
+    Names are read from the table on access, so a subset costs one index
+    per name and no strings.
+    """
+
+    __slots__ = ("table", "indices")
+
+    def __init__(self, table: NameTable, indices: Sequence[int]):
+        """
+        Initialize the view.
+
+        Args:
+            table (NameTable): Table holding the names
+            indices (Sequence[int]): Table index of each name in the subset
+        """
+        self.table = table
+        self.indices = array('q', indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.table[self.indices[index]]
+
+def load_compiled_table(path: str, source_path: Optional[str] = None) -> Optional[NameTable]:
+    """
+    Load a compiled table if it exists and is at least as new as its source.
+
+    Args:
+        path (str): Compiled table path
+        source_path (Optional[str]): Source data file the table was compiled from
+
+    Returns:
+        Optional[NameTable]: The table, or None if it is missing, stale or unreadable
+    """
+    if not os.path.exists(path):
+        return None
+    if source_path and os.path.exists(source_path) and os.path.getmtime(source_path) > os.path.getmtime(path):
+        print(f"Compiled data is older than {source_path}, ignoring {path}")
+        return None
+    try:
+        return NameTable.load(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Error loading compiled data from {path}: {e}")
+        return None
+
+def pack_table(names: Sequence, weights: Sequence) -> bytes:
+    """
+    Pack name and weight columns into the flat table layout.
+
+    Args:
+        names (Sequence): Names
+        weights (Sequence): Weight of each name
+
+    Returns:
+        bytes: Packed table
+    """
+    if len(names) != len(weights):
+        raise ValueError("names and weights must have the same length")
+
+    flags = 0
+    if all(isinstance(weight, int) for weight in weights):
+        flags |= FLAG_INTEGER_WEIGHTS
+
+    encoded = [str(name).encode("utf-8") for name in names]
+    weights = array('d', (float(weight) for weight in weights))
+    prob, alias = build_alias_table(weights)
+    offsets = array('q', [0])
+    offsets.extend(accumulate(len(name) for name in encoded))
+    pool = b"".join(encoded)
+
+    header = HEADER.pack(MAGIC, VERSION, flags, 0, len(encoded), len(pool))
+    return b"".join([header, offsets.tobytes(), weights.tobytes(), prob.tobytes(), alias.tobytes(), pool])
+
+def _section(view: memoryview, start: int, count: int, fmt: str) -> Tuple[memoryview, int]:
+    """
+    Cast count 8-byte values starting at start, returning the view and where the next section starts.
+    """
+    stop = start + count * 8
+    return view[start:stop].cast(fmt), stop
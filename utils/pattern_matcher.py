@@ -0,0 +1,204 @@
+"""
+Multi-pattern matching for indexing names by sound patterns.
+"""
+
+import re
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# Patterns with more literal spellings than this are matched with their regex instead
+MAX_LITERAL_EXPANSIONS = 64
+
+def expand_literals(pattern: str) -> Optional[List[str]]:
+    """
+    Expand a simple regex into the lowercase literal strings it matches.
+
+    Handles literals, alternation, character sets and fixed repeats, which
+    covers patterns like "but|butt" and "b[o0]{2}b".
+
+    Args:
+        pattern (str): Regex pattern
+
+    Returns:
+        Optional[List[str]]: Literal strings, or None if the pattern is too complex
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+    literals = _expand_parsed(parsed)
+    if not literals or '' in literals:
+        return None
+    return sorted({literal.lower() for literal in literals})
+
+def _expand_parsed(parsed) -> Optional[List[str]]:
+    """
+    Expand a parsed regex sequence into literal strings.
+    """
+    results = ['']
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            options = [chr(av)]
+        elif op is sre_parse.IN:
+            options = []
+            for item_op, item_av in av:
+                if item_op is sre_parse.LITERAL:
+                    options.append(chr(item_av))
+                elif item_op is sre_parse.RANGE and item_av[1] - item_av[0] < MAX_LITERAL_EXPANSIONS:
+                    options.extend(chr(c) for c in range(item_av[0], item_av[1] + 1))
+                else:
+                    return None
+        elif op is sre_parse.BRANCH:
+            options = []
+            for branch in av[1]:
+                expanded = _expand_parsed(branch)
+                if expanded is None:
+                    return None
+                options.extend(expanded)
+        elif op is sre_parse.SUBPATTERN:
+            options = _expand_parsed(av[-1])
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            low, high, sub = av
+            if low != high:
+                return None
+            sub_options = _expand_parsed(sub)
+            if sub_options is None:
+                return None
+            options = ['']
+            for _ in range(low):
+                options = [a + b for a in options for b in sub_options]
+                if len(options) > MAX_LITERAL_EXPANSIONS:
+                    return None
+        else:
+            return None
+
+        if options is None:
+            return None
+        results = [a + b for a in results for b in options]
+        if len(results) > MAX_LITERAL_EXPANSIONS:
+            return None
+    return results
+
+class MultiPatternMatcher:
+    """
+    Match a dictionary of named patterns against a string in a single pass.
+
+    Patterns are expanded into literal strings and compiled into one
+    Aho-Corasick automaton. match_mask() returns a bitmask where bit i is set
+    when the i-th pattern matches anywhere in the string, ignoring case.
+    """
+
+    def __init__(self, patterns: Dict[str, str]):
+        """
+        Initialize the matcher.
+
+        Args:
+            patterns (Dict[str, str]): Pattern name to regex pattern
+        """
+        self.pattern_names = list(patterns)
+        self.bits = {name: 1 << i for i, name in enumerate(self.pattern_names)}
+
+        # Automaton state: transitions, failure links and the patterns ending at each state
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [0]
+        # Patterns that can't be written as literals keep using their regex
+        self._regexes = []
+
+        for name, pattern in patterns.items():
+            literals = expand_literals(pattern)
+            if literals is None:
+                self._regexes.append((self.bits[name], re.compile(pattern, re.IGNORECASE)))
+                continue
+            for literal in literals:
+                self._add_literal(literal, self.bits[name])
+        self._build_failure_links()
+
+    def _add_literal(self, literal: str, bit: int):
+        """
+        Add one literal string to the trie.
+        """
+        state = 0
+        for ch in literal:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(0)
+            state = nxt
+        self._output[state] |= bit
+
+    def _build_failure_links(self):
+        """
+        Link each state to its longest proper suffix in the trie.
+        """
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # A state also matches everything its suffix matches
+                self._output[nxt] |= self._output[self._fail[nxt]]
+
+    def match_mask(self, text: str) -> int:
+        """
+        Find every pattern that matches the text.
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            int: Bitmask of matched patterns
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        mask = 0
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            mask |= output[state]
+
+        for bit, regex in self._regexes:
+            if not mask & bit and regex.search(text):
+                mask |= bit
+        return mask
+
+    def match_masks(self, texts: Sequence[str]) -> List[int]:
+        """
+        Match every text, computing each distinct text only once.
+
+        Args:
+            texts (Sequence[str]): Texts to search
+
+        Returns:
+            List[int]: Bitmask of matched patterns for each text
+        """
+        cache = {}
+        masks = []
+        for text in texts:
+            mask = cache.get(text)
+            if mask is None:
+                mask = cache[text] = self.match_mask(text)
+            masks.append(mask)
+        return masks
+
+    def matched_names(self, mask: int) -> List[str]:
+        """
+        Get the names of the patterns in a bitmask.
+        """
+        return [name for name in self.pattern_names if mask & self.bits[name]]
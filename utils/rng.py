@@ -0,0 +1,71 @@
+"""
+Random number streams for name generation.
+
+Every generation method takes an optional rng, which can be:
+- None, to use the module-global random stream (the old behavior)
+- an int seed, to replay exactly the same names
+- a random.Random instance, or a NumPy Generator for batch methods
+"""
+
+import random
+from typing import Optional
+import numpy as np
+
+def get_random(rng=None):
+    """
+    Get a random.Random-style stream for scalar draws.
+
+    Args:
+        rng: None, an int seed, a random.Random or a NumPy Generator
+
+    Returns:
+        random.Random or the random module
+    """
+    if rng is None:
+        return random
+    if isinstance(rng, random.Random) or rng is random:
+        return rng
+    if isinstance(rng, np.random.Generator):
+        return random.Random(int(rng.integers(2 ** 63)))
+    return random.Random(rng)
+
+def get_numpy_rng(rng=None) -> np.random.Generator:
+    """
+    Get a NumPy Generator for vectorized draws.
+
+    Args:
+        rng: None, an int seed, a SeedSequence, a NumPy Generator or a random.Random
+
+    Returns:
+        np.random.Generator: PCG64-backed generator
+    """
+    if isinstance(rng, random.Random) or rng is random:
+        return np.random.default_rng(rng.getrandbits(128))
+    return np.random.default_rng(rng)
+
+def seed_sequence(seed: int, shard: Optional[int] = None) -> np.random.SeedSequence:
+    """
+    Get the SeedSequence for a seed, or for one shard of it.
+
+    Shard k is the same child that SeedSequence(seed).spawn(n)[k] returns,
+    so shards can be generated in any order, on any worker.
+    """
+    if shard is None:
+        return np.random.SeedSequence(seed)
+    return np.random.SeedSequence(seed, spawn_key=(shard,))
+
+def stream(seed: int, shard: Optional[int] = None) -> random.Random:
+    """
+    Create an independent random.Random stream for a seed and optional shard.
+
+    Args:
+        seed (int): Seed to replay
+        shard (Optional[int]): Shard number when a batch is split across workers
+
+    Returns:
+        random.Random: Seeded stream
+    """
+    if shard is None:
+        return random.Random(seed)
+    state = seed_sequence(seed, shard).generate_state(4)
+    return random.Random(int.from_bytes(state.tobytes(), "little"))
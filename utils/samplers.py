@@ -0,0 +1,423 @@
+"""
+Weighted samplers used by the name generators.
+"""
+
+import random
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+from utils.rng import get_numpy_rng
+
+def build_alias_table(weights: Sequence[float]) -> Tuple[array, array]:
+    """
+    Build a Walker/Vose alias table for a list of weights.
+
+    Args:
+        weights (Sequence[float]): Non-negative weight for each item
+
+    Returns:
+        Tuple[array, array]: Acceptance probabilities and alias indices
+    """
+    n = len(weights)
+    prob = array('d', [0.0]) * n
+    alias = array('q', [0]) * n
+    if n == 0:
+        return prob, alias
+
+    total = float(sum(weights))
+    if total <= 0:
+        raise ValueError("Weights must contain at least one positive value")
+
+    # Scale weights so the average bucket holds exactly 1.0
+    scaled = [float(w) * n / total for w in weights]
+    small = [i for i, w in enumerate(scaled) if w < 1.0]
+    large = [i for i, w in enumerate(scaled) if w >= 1.0]
+
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        # Move the leftover mass of the large bucket back into the pools
+        scaled[l] = (scaled[l] + scaled[s]) - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+
+    # Whatever is left is full up to floating point error
+    for i in large + small:
+        prob[i] = 1.0
+        alias[i] = i
+
+    return prob, alias
+
+class AliasSampler:
+    """
+    Weighted sampler that draws items in O(1) using an alias table.
+
+    Memory is one weight, one probability and one alias index per distinct
+    item, no matter how the weights are scaled.
+    """
+
+    __slots__ = ("items", "weights", "prob", "alias")
+
+    def __init__(self, items: Sequence[Any], weights: Iterable[float]):
+        """
+        Initialize the sampler.
+
+        Args:
+            items (Sequence[Any]): Distinct items to draw from
+            weights (Iterable[float]): Non-negative weight for each item
+        """
+        self.items = items
+        self.weights = array('d', weights)
+        if len(self.weights) != len(items):
+            raise ValueError("items and weights must have the same length")
+        self.prob, self.alias = build_alias_table(self.weights)
+
+    @classmethod
+    def from_pairs(cls, pairs: List[Tuple[Any, float]]) -> "AliasSampler":
+        """
+        Build a sampler from a list of (item, weight) tuples.
+
+        Args:
+            pairs (List[Tuple[Any, float]]): Items with their weights
+
+        Returns:
+            AliasSampler: Sampler over the items
+        """
+        return cls([item for item, _ in pairs], [float(weight) for _, weight in pairs])
+
+    @classmethod
+    def from_table(cls, table) -> "AliasSampler":
+        """
+        Build a sampler over a NameTable, reusing its precomputed alias table.
+
+        Args:
+            table (NameTable): Packed names, weights and alias table
+
+        Returns:
+            AliasSampler: Sampler whose arrays are views into the table's buffer
+        """
+        sampler = cls.__new__(cls)
+        sampler.items = table
+        sampler.weights = table.weights
+        sampler.prob = table.prob
+        sampler.alias = table.alias
+        return sampler
+
+    @classmethod
+    def by_label(cls, items: Sequence[Any], weights: Sequence[float], labels: Sequence[str]) -> Dict[str, "AliasSampler"]:
+        """
+        Build one sampler per label, e.g. per gender, over the same items.
+
+        Each sampler gives the items with other labels zero weight, so they
+        all share the items and return indices into them, and drawing from
+        one costs the same as drawing from a sampler over every item.
+
+        Args:
+            items (Sequence[Any]): Items shared by every sampler
+            weights (Sequence[float]): Weight of each item
+            labels (Sequence[str]): Label of each item
+
+        Returns:
+            Dict[str, AliasSampler]: Sampler for each label
+        """
+        if len(labels) != len(items):
+            raise ValueError("items and labels must have the same length")
+        return {label: cls(items, [w if l == label else 0.0 for w, l in zip(weights, labels)])
+                for label in dict.fromkeys(labels)}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __bool__(self) -> bool:
+        return len(self.items) > 0
+
+    def sample_index(self, rng=random) -> int:
+        """
+        Draw the index of a random item.
+
+        Args:
+            rng: Object with a random() method, the random module by default
+
+        Returns:
+            int: Index into items
+        """
+        n = len(self.prob)
+        u = rng.random() * n
+        i = int(u)
+        if i >= n:  # random() * n can round up to n for some sizes
+            i = n - 1
+        # Reuse the fractional part of the draw as the coin flip
+        return i if (u - i) < self.prob[i] else self.alias[i]
+
+    def sample(self, rng=random) -> Any:
+        """
+        Draw a random item, weighted by its weight.
+
+        Args:
+            rng: Object with a random() method, the random module by default
+
+        Returns:
+            Any: The selected item
+        """
+        return self.items[self.sample_index(rng)]
+
+    def sample_indices(self, count: int, rng=None) -> np.ndarray:
+        """
+        Draw many item indices at once with NumPy.
+
+        Args:
+            count (int): Number of indices to draw
+            rng: NumPy Generator, random.Random or seed, a fresh Generator by default
+
+        Returns:
+            np.ndarray: Array of int64 indices into items
+        """
+        rng = get_numpy_rng(rng)
+        n = len(self.prob)
+        # Views over the alias table, no copy is made
+        prob = np.frombuffer(self.prob, dtype=np.float64)
+        alias = np.frombuffer(self.alias, dtype=np.int64)
+
+        u = rng.random(count) * n
+        idx = u.astype(np.int64)
+        np.minimum(idx, n - 1, out=idx)
+        return np.where(u - idx < prob[idx], idx, alias[idx])
+
+class PrefixSumSampler:
+    """
+    Weighted sampler over a fixed item order using prefix sums.
+
+    Any contiguous window of items, given by rank or by percentile, can be
+    sampled in O(log n) without rebuilding anything.
+    """
+
+    __slots__ = ("items", "cumulative")
+
+    def __init__(self, items: Sequence[Any], weights: Iterable[float]):
+        """
+        Initialize the sampler.
+
+        Args:
+            items (Sequence[Any]): Items in rank order
+            weights (Iterable[float]): Non-negative weight for each item
+        """
+        self.items = items
+        self.cumulative = array('d', [0.0])
+        self.cumulative.extend(accumulate(float(w) for w in weights))
+        if len(self.cumulative) != len(items) + 1:
+            raise ValueError("items and weights must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __bool__(self) -> bool:
+        return len(self.items) > 0
+
+    def window_weight(self, start: int, stop: int) -> float:
+        """
+        Get the total weight of the items in [start, stop).
+        """
+        return self.cumulative[stop] - self.cumulative[start]
+
+    def percentile_window(self, low: float, high: float) -> Tuple[int, int]:
+        """
+        Convert a percentile window into a rank window.
+
+        Args:
+            low (float): Start of the window, from 0.0 to 1.0
+            high (float): End of the window, from 0.0 to 1.0
+
+        Returns:
+            Tuple[int, int]: Start and stop ranks
+        """
+        n = len(self.items)
+        return int(n * low), int(n * high)
+
+    def sample_index(self, start: int = 0, stop: int = None, rng=random) -> int:
+        """
+        Draw the index of a random item with rank in [start, stop).
+
+        Args:
+            start (int): First rank in the window
+            stop (int): Rank after the last one in the window, the end by default
+            rng: Object with a random() method, the random module by default
+
+        Returns:
+            int: Index into items
+        """
+        if stop is None:
+            stop = len(self.items)
+        if start >= stop:
+            raise ValueError(f"Empty window [{start}, {stop})")
+
+        total = self.window_weight(start, stop)
+        if total <= 0:
+            # Nothing to weight by, so every item in the window is equally likely
+            return min(start + int(rng.random() * (stop - start)), stop - 1)
+
+        target = self.cumulative[start] + rng.random() * total
+        i = bisect_right(self.cumulative, target, start, stop + 1) - 1
+        return min(max(i, start), stop - 1)
+
+    def sample(self, start: int = 0, stop: int = None, rng=random) -> Any:
+        """
+        Draw a random item with rank in [start, stop).
+        """
+        return self.items[self.sample_index(start, stop, rng)]
+
+    def sample_percentile(self, low: float, high: float, rng=random) -> Any:
+        """
+        Draw a random item from a percentile window, e.g. 0.6 to 0.9.
+        """
+        start, stop = self.percentile_window(low, high)
+        return self.sample(start, stop, rng)
+
+class FenwickSampler:
+    """
+    Weighted sampler that supports drawing without replacement.
+
+    Weights live in a Fenwick (binary indexed) tree, so drawing an item,
+    removing it or changing its weight are all O(log n).
+    """
+
+    __slots__ = ("items", "weights", "tree", "remaining")
+
+    def __init__(self, items: Sequence[Any], weights: Iterable[float]):
+        """
+        Initialize the sampler.
+
+        Args:
+            items (Sequence[Any]): Distinct items to draw from
+            weights (Iterable[float]): Non-negative weight for each item
+        """
+        self.items = items
+        self.weights = array('d', weights)
+        n = len(self.weights)
+        if n != len(items):
+            raise ValueError("items and weights must have the same length")
+
+        # Build the tree in O(n) by pushing each node's sum up to its parent
+        self.tree = array('d', [0.0])
+        self.tree.extend(self.weights)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+        self.remaining = sum(1 for w in self.weights if w > 0)
+
+    @classmethod
+    def from_pairs(cls, pairs: List[Tuple[Any, float]]) -> "FenwickSampler":
+        """
+        Build a sampler from a list of (item, weight) tuples.
+        """
+        return cls([item for item, _ in pairs], [float(weight) for _, weight in pairs])
+
+    def copy(self) -> "FenwickSampler":
+        """
+        Copy the sampler so items can be removed without touching the original.
+
+        Returns:
+            FenwickSampler: Independent sampler sharing the same items
+        """
+        clone = FenwickSampler.__new__(FenwickSampler)
+        clone.items = self.items
+        clone.weights = array('d', self.weights)
+        clone.tree = array('d', self.tree)
+        clone.remaining = self.remaining
+        return clone
+
+    def __len__(self) -> int:
+        """Number of items that can still be drawn."""
+        return self.remaining
+
+    def __bool__(self) -> bool:
+        return self.remaining > 0
+
+    def total(self) -> float:
+        """
+        Get the total weight of the items that can still be drawn.
+        """
+        i = len(self.weights)
+        total = 0.0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def update(self, index: int, weight: float):
+        """
+        Set the weight of one item.
+
+        Args:
+            index (int): Index into items
+            weight (float): New non-negative weight
+        """
+        old = self.weights[index]
+        if old > 0 and weight <= 0:
+            self.remaining -= 1
+        elif old <= 0 and weight > 0:
+            self.remaining += 1
+        self.weights[index] = weight
+
+        delta = weight - old
+        n = len(self.weights)
+        i = index + 1
+        while i <= n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def remove(self, index: int):
+        """
+        Remove an item so it can't be drawn again.
+        """
+        self.update(index, 0.0)
+
+    def sample_index(self, rng=random) -> int:
+        """
+        Draw the index of a random item, weighted by its weight.
+
+        Args:
+            rng: Object with a random() method, the random module by default
+
+        Returns:
+            int: Index into items
+        """
+        if not self.remaining:
+            raise IndexError("No items left to draw")
+
+        n = len(self.weights)
+        top_bit = 1 << (n.bit_length() - 1)
+        while True:
+            target = rng.random() * self.total()
+            # Walk down the tree to the first index whose prefix sum passes the target
+            pos = 0
+            bit = top_bit
+            while bit:
+                nxt = pos + bit
+                if nxt <= n and self.tree[nxt] <= target:
+                    target -= self.tree[nxt]
+                    pos = nxt
+                bit >>= 1
+            # Rounding can land on a removed item at the very end, so draw again
+            if pos < n and self.weights[pos] > 0:
+                return pos
+
+    def pop(self, rng=random) -> Any:
+        """
+        Draw a random item and remove it.
+
+        Args:
+            rng: Object with a random() method, the random module by default
+
+        Returns:
+            Any: The selected item
+        """
+        index = self.sample_index(rng)
+        self.remove(index)
+        return self.items[index]
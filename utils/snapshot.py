@@ -0,0 +1,224 @@
+"""
+Warm-start snapshots of fully built generator indexes.
+
+A snapshot is a pickle (protocol 5) of a generator's derived state, with
+every array stored out of band:
+
+    header    magic, version, buffer count, key (SHA-256) and pickle size
+    lengths   uint64[buffer count]
+    pickle    the state, with arrays replaced by buffer references
+    buffers   the raw array data, each aligned to 8 bytes
+
+Loading maps the file read-only and hands the buffers to pickle, so arrays
+come back as read-only memoryviews (or numpy arrays) over the file's pages
+without being copied, and forked workers share them.
+
+Snapshots are keyed by a hash of everything the state was derived from:
+the data files, the generator's settings and the code that builds it. A
+snapshot whose key doesn't match is ignored and rebuilt.
+"""
+
+import copyreg
+import hashlib
+import io
+import json
+import mmap
+import os
+import pickle
+import struct
+from array import array
+from typing import Any, Dict, Iterable, Optional
+
+MAGIC = b"NGSS"
+VERSION = 1
+# magic, version, buffer count, key, pickle size
+HEADER = struct.Struct("<4sII32sQ")
+ALIGNMENT = 8
+
+# Directory snapshots are written to; set to an empty string to turn snapshots off
+SNAPSHOT_DIR_ENV_VAR = "GENERATOR_SNAPSHOT_DIR"
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+
+def snapshot_path(name: str) -> Optional[str]:
+    """
+    Get the snapshot file for a generator.
+
+    Args:
+        name (str): Snapshot name, e.g. "funny"
+
+    Returns:
+        Optional[str]: Path in the snapshot directory, or None if snapshots are off
+    """
+    directory = os.environ.get(SNAPSHOT_DIR_ENV_VAR, DEFAULT_SNAPSHOT_DIR)
+    if not directory:
+        return None
+    return os.path.join(directory, f"{name}.snapshot")
+
+def snapshot_key(*parts: Any) -> str:
+    """
+    Hash the inputs a snapshot was derived from.
+
+    Args:
+        *parts: JSON-serializable values, e.g. file digests and pattern dictionaries
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(f"snapshot-v{VERSION}".encode())
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=sorted).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _restore_array(typecode: str, buffer) -> memoryview:
+    """
+    Rebuild an array as a read-only view over its out-of-band buffer.
+    """
+    return memoryview(buffer).cast('B').cast(typecode)
+
+def _reduce_array(value):
+    """
+    Pickle an array or memoryview's data out of band.
+    """
+    typecode = value.typecode if isinstance(value, array) else value.format
+    return _restore_array, (typecode, pickle.PickleBuffer(value))
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Pickler that stores arrays out of band and shared objects by reference.
+    """
+
+    def __init__(self, file, buffers: list, shared: Dict[str, Any]):
+        super().__init__(file, protocol=5, buffer_callback=buffers.append)
+        self.dispatch_table = copyreg.dispatch_table.copy()
+        self.dispatch_table[array] = _reduce_array
+        self.dispatch_table[memoryview] = _reduce_array
+        self._shared_ids = {id(obj): name for name, obj in shared.items()}
+
+    def persistent_id(self, obj):
+        return self._shared_ids.get(id(obj))
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """
+    Unpickler that puts shared objects back by reference.
+    """
+
+    def __init__(self, file, buffers: Iterable, shared: Dict[str, Any]):
+        super().__init__(file, buffers=buffers)
+        self._shared = shared
+
+    def persistent_load(self, pid):
+        return self._shared[pid]
+
+def save_snapshot(path: str, key: str, state: Any, shared: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Write a snapshot, replacing any existing file atomically.
+
+    Args:
+        path (str): Snapshot file
+        key (str): Hex key from snapshot_key()
+        state (Any): Picklable state
+        shared (Optional[Dict[str, Any]]): Objects the state refers to but
+            that are loaded separately, such as name tables; they are stored
+            by name and must be passed to load_snapshot() again
+
+    Returns:
+        bool: True if the snapshot was written
+    """
+    buffers = []
+    payload = io.BytesIO()
+    try:
+        _SnapshotPickler(payload, buffers, shared or {}).dump(state)
+        raws = [buffer.raw() for buffer in buffers]
+    except Exception as e:
+        print(f"Error pickling snapshot {path}: {e}")
+        return False
+
+    payload = payload.getvalue()
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(raws), bytes.fromhex(key), len(payload)))
+            f.write(struct.pack(f"<{len(raws)}Q", *(raw.nbytes for raw in raws)))
+            f.write(payload)
+            for raw in raws:
+                f.write(b"\0" * (-f.tell() % ALIGNMENT))
+                f.write(raw)
+        os.replace(temp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error writing snapshot {path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+def load_snapshot(path: Optional[str], key: str, shared: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+    """
+    Map a snapshot file and unpickle its state, if it was built from the same inputs.
+
+    Args:
+        path (Optional[str]): Snapshot file
+        key (str): Hex key the state must have been saved with
+        shared (Optional[Dict[str, Any]]): The shared objects passed to save_snapshot()
+
+    Returns:
+        Optional[Any]: The state, or None if the file is missing, stale or unreadable
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+        magic, version, count, stored_key, payload_size = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION or stored_key != bytes.fromhex(key):
+            return None
+
+        start = HEADER.size
+        lengths = struct.unpack_from(f"<{count}Q", view, start)
+        start += 8 * count
+        payload = view[start:start + payload_size]
+        start += payload_size
+        buffers = []
+        for length in lengths:
+            start += -start % ALIGNMENT
+            buffers.append(view[start:start + length])
+            start += length
+        if start > len(view):
+            raise ValueError("Snapshot is truncated")
+
+        return _SnapshotUnpickler(io.BytesIO(payload), buffers, shared or {}).load()
+    except Exception as e:
+        print(f"Error loading snapshot {path}: {e}")
+        return None
+
+def restore_or_build(obj: Any, name: str, key: Optional[str], attributes: Iterable[str],
+                     build, shared: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Set an object's derived attributes from its snapshot, or build and snapshot them.
+
+    Args:
+        obj (Any): Object owning the attributes, e.g. a generator
+        name (str): Snapshot name
+        key (Optional[str]): Key from snapshot_key(), None to build without a snapshot
+        attributes (Iterable[str]): Attributes that build() sets
+        build (Callable[[], None]): Derives the attributes from scratch
+        shared (Optional[Dict[str, Any]]): Objects stored by reference, see save_snapshot()
+
+    Returns:
+        bool: True if the attributes came from the snapshot
+    """
+    attributes = list(attributes)
+    path = snapshot_path(name) if key else None
+    state = load_snapshot(path, key, shared) if path else None
+    if isinstance(state, dict) and set(state) == set(attributes):
+        for attribute, value in state.items():
+            setattr(obj, attribute, value)
+        return True
+
+    build()
+    if path:
+        save_snapshot(path, key, {attribute: getattr(obj, attribute) for attribute in attributes}, shared)
+    return False
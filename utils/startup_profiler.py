@@ -0,0 +1,171 @@
+"""
+Opt-in profiling of generator startup: time and memory of each load phase.
+"""
+
+import argparse
+import json
+import os
+import platform
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Set to a report path (or 1 for the default path) to profile startup
+PROFILE_ENV_VAR = "PROFILE_STARTUP"
+DEFAULT_REPORT_PATH = "startup_profile.json"
+
+def report_path(argv: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Find where startup profiling should write its report, if it is enabled.
+
+    A --profile-startup [PATH] flag in argv wins over the PROFILE_STARTUP
+    environment variable. Other arguments are ignored.
+
+    Args:
+        argv (Optional[List[str]]): Command line arguments
+
+    Returns:
+        Optional[str]: Report path, or None when profiling is off
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile-startup", nargs="?", const=DEFAULT_REPORT_PATH)
+    args, _ = parser.parse_known_args(argv or [])
+    if args.profile_startup:
+        return args.profile_startup
+
+    value = os.environ.get(PROFILE_ENV_VAR, "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return None
+    if value.lower() in ("1", "true", "yes", "on"):
+        return DEFAULT_REPORT_PATH
+    return value
+
+class StartupProfiler:
+    """
+    Records the wall time and traced memory of nested startup phases.
+
+    Phases are named by their nesting, e.g. "census/census_surnames.csv/parse",
+    so reports from two releases can be diffed phase by phase. Memory comes
+    from tracemalloc, which is only running while the profiler is enabled;
+    when it is disabled, phase() does nothing.
+
+    Peak memory is traced per process, so phases running at the same time
+    on different threads see each other's allocations.
+    """
+
+    def __init__(self):
+        """Initialize a disabled profiler."""
+        self.enabled = False
+        self.phases: List[Dict[str, Any]] = []
+        self._local = threading.local()
+        self._started_tracing = False
+
+    def enable(self):
+        """Start recording phases and tracing memory allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording phases, and stop tracemalloc if enable() started it."""
+        self.enabled = False
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a startup phase, nested inside any phase already open on this thread.
+
+        Args:
+            name (str): Phase name, e.g. a generator name or "parse"
+        """
+        if not self.enabled:
+            yield
+            return
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # Keep the enclosing phase's peak before this phase resets it
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+
+        record = {
+            "phase": "/".join([frame["record"]["name"] for frame in stack] + [name]),
+            "name": name,
+            "depth": len(stack),
+        }
+        self.phases.append(record)
+        frame = {"record": record, "memory": current, "peak": current}
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(frame["peak"], peak)
+            record["seconds"] = round(seconds, 6)
+            record["memory_bytes"] = current - frame["memory"]
+            record["peak_memory_bytes"] = peak - frame["memory"]
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the recorded phases.
+
+        Returns:
+            Dict[str, Any]: Environment, a per-generator summary of the
+                top-level phases, and every phase in the order it started
+        """
+        finished = [record for record in self.phases if "seconds" in record]
+        top_level = [record for record in finished if record["depth"] == 0]
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "total_seconds": round(sum(record["seconds"] for record in top_level), 6),
+            "peak_memory_bytes": max((record["peak_memory_bytes"] for record in top_level), default=0),
+            "generators": {
+                record["name"]: {
+                    "seconds": record["seconds"],
+                    "memory_bytes": record["memory_bytes"],
+                    "peak_memory_bytes": record["peak_memory_bytes"]
+                }
+                for record in top_level
+            },
+            "phases": finished
+        }
+
+    def write(self, path: str) -> Dict[str, Any]:
+        """
+        Write the report as JSON.
+
+        Args:
+            path (str): Report file
+
+        Returns:
+            Dict[str, Any]: The report that was written
+        """
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        return report
+
+    def clear(self):
+        """Forget the recorded phases."""
+        self.phases = []
+
+# Shared by every generator in the process; disabled unless profiling was asked for
+startup_profiler = StartupProfiler()